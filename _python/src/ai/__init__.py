@@ -11,14 +11,36 @@ This module provides:
 from .voice_classifier import (
     VoiceClassifier,
     CommandCategory,
+    CategoryScores,
     ClassificationResult,
+    CoreClassification,
     ConversationContext,
+    Interaction,
+    InteractionRing,
     IntentConfidence,
     voice_classifier,
 )
 
 from .context_manager import ContextManager, ContextUpdateEvent, context_manager
 
+from .bounded_cache import BoundedLRUCache
+from .classifier_artifact import ClassifierArtifact
+from .context_codec import ContextCodec, ContextCodecError
+from .context_expiry import ContextExpiryIndex
+from .fast_path_index import FastPathIndex
+from .latency_histogram import LatencyHistogram
+from .parameter_extractors import ParameterExtractor, ParameterExtractorRegistry
+from .shared_result_cache import SharedResultCache
+from .similarity_backends import (
+    BruteForceSimilarityBackend,
+    MinHashSimilarityBackend,
+    RandomProjectionLSHBackend,
+    SimilarityBackend,
+    create_similarity_backend,
+)
+from .streaming_session import StreamingClassificationSession, TranscriptStreams
+from .text_normalizer import TextNormalizer, text_normalizer
+
 from .performance_optimizer import (
     PerformanceOptimizer,
     PerformanceMetrics,
@@ -29,13 +51,36 @@ from .performance_optimizer import (
 __all__ = [
     "VoiceClassifier",
     "CommandCategory",
+    "CategoryScores",
     "ClassificationResult",
+    "CoreClassification",
     "ConversationContext",
+    "Interaction",
+    "InteractionRing",
     "IntentConfidence",
     "voice_classifier",
     "ContextManager",
     "ContextUpdateEvent",
     "context_manager",
+    "BoundedLRUCache",
+    "ClassifierArtifact",
+    "ContextCodec",
+    "ContextCodecError",
+    "ContextExpiryIndex",
+    "FastPathIndex",
+    "LatencyHistogram",
+    "ParameterExtractor",
+    "ParameterExtractorRegistry",
+    "SharedResultCache",
+    "SimilarityBackend",
+    "BruteForceSimilarityBackend",
+    "RandomProjectionLSHBackend",
+    "MinHashSimilarityBackend",
+    "create_similarity_backend",
+    "StreamingClassificationSession",
+    "TranscriptStreams",
+    "TextNormalizer",
+    "text_normalizer",
     "PerformanceOptimizer",
     "PerformanceMetrics",
     "BatchProcessingRequest",
@@ -0,0 +1,217 @@
+"""
+* Purpose: Bounded LRU/TTL cache with memory accounting for classifier and context caches
+* Issues & Complexity Summary: O(1) recency tracking with entry/byte budgets and per-entry expiry
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~150
+  - Core Algorithm Complexity: Medium (LRU ordering, TTL, size accounting)
+  - Dependencies: collections.OrderedDict
+  - State Management Complexity: Medium (eviction counters, byte totals)
+  - Novelty/Uncertainty Factor: Low (standard LRU design)
+* AI Pre-Task Self-Assessment: 92%
+* Problem Estimate: 85%
+* Initial Code Complexity Estimate: 80%
+* Final Code Complexity: 82%
+* Overall Result Score: 90%
+* Key Variances/Learnings: Size estimates are approximate but bounded per entry
+* Last Updated: 2026-10-16
+"""
+
+import logging
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """Approximate deep size in bytes of common cache values"""
+    if _seen is None:
+        _seen = set()
+
+    if isinstance(obj, Enum):
+        return 0  # Enum members are shared singletons
+
+    obj_id = id(obj)
+    if obj_id in _seen:
+        return 0
+    _seen.add(obj_id)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_size(key, _seen) + estimate_size(value, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += estimate_size(item, _seen)
+    elif is_dataclass(obj):
+        for dataclass_field in fields(obj):
+            size += estimate_size(getattr(obj, dataclass_field.name, None), _seen)
+    elif hasattr(obj, "__dict__"):
+        size += estimate_size(vars(obj), _seen)
+    elif type(obj).__sizeof__ is object.__sizeof__:
+        # Slotted classes that do not report their own contents
+        for cls in type(obj).__mro__:
+            slots = getattr(cls, "__slots__", ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                size += estimate_size(getattr(obj, name, None), _seen)
+
+    return size
+
+
+@dataclass
+class CacheEntry:
+    """Cached value with its insert timestamp and estimated size"""
+
+    value: Any
+    inserted_at: float
+    size_bytes: int
+
+
+class BoundedLRUCache:
+    """LRU cache bounded by entry count and estimated bytes, with optional TTL"""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.total_bytes = 0
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Membership test that neither refreshes recency nor counts a lookup"""
+        entry = self._entries.get(key)
+        return entry is not None and not self._is_expired(entry)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries.keys()))
+
+    def _is_expired(self, entry: CacheEntry) -> bool:
+        return (
+            self.ttl_seconds is not None
+            and self.clock() - entry.inserted_at >= self.ttl_seconds
+        )
+
+    def _remove(self, key: Hashable) -> CacheEntry:
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size_bytes
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value and mark it most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if self._is_expired(entry):
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value without touching recency or statistics"""
+        entry = self._entries.get(key)
+        if entry is None or self._is_expired(entry):
+            return default
+        return entry.value
+
+    def put(self, key: Hashable, value: Any):
+        """Insert or replace a value, evicting least recently used entries"""
+        if key in self._entries:
+            self._remove(key)
+
+        entry = CacheEntry(
+            value=value, inserted_at=self.clock(), size_bytes=self.sizeof(value)
+        )
+        self._entries[key] = entry
+        self.total_bytes += entry.size_bytes
+
+        self._evict_to_budget()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return a value"""
+        if key not in self._entries:
+            return default
+        return self._remove(key).value
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Iterate over a snapshot of (key, value) pairs, oldest first"""
+        return iter([(key, entry.value) for key, entry in self._entries.items()])
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _evict_to_budget(self):
+        # A single value larger than max_bytes is dropped rather than kept
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes
+        ):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def purge_expired(self) -> int:
+        """Remove expired entries, returning how many were dropped"""
+        if self.ttl_seconds is None:
+            return 0
+
+        expired_keys = [
+            key for key, entry in self._entries.items() if self._is_expired(entry)
+        ]
+        for key in expired_keys:
+            self._remove(key)
+
+        self.expirations += len(expired_keys)
+        return len(expired_keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups > 0 else 0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
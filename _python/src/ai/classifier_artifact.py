@@ -0,0 +1,347 @@
+"""
+* Purpose: Versioned on-disk artifact of the trained voice classifier for warm starts
+* Issues & Complexity Summary: Serialize vocabulary, IDF, example matrix and pattern table; mmap on load
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~230
+  - Core Algorithm Complexity: Low (array serialization, content hashing)
+  - Dependencies: numpy, scipy.sparse, scikit-learn
+  - State Management Complexity: Medium (atomic manifest swap, stale file cleanup)
+  - Novelty/Uncertainty Factor: Low (rebuilt vectorizer reproduces the fitted one)
+* AI Pre-Task Self-Assessment: 90%
+* Problem Estimate: 85%
+* Initial Code Complexity Estimate: 80%
+* Final Code Complexity: 81%
+* Overall Result Score: 90%
+* Key Variances/Learnings: Content-hash versions make identical builds byte-identical
+* Last Updated: 2026-10-16
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; training updates are then unserialized
+    fcntl = None
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+# Manifest reads per load; a retry covers arrays removed by two quick saves
+ARTIFACT_LOAD_ATTEMPTS = 3
+
+# In a shared tables directory: the latest trained tables, and the lock that
+# serializes training updates across workers
+TABLES_POINTER_FILE = "current.json"
+TABLES_LOCK_FILE = ".training.lock"
+
+# Vectorizer settings that change how text is tokenized or weighted
+VECTORIZER_PARAMS = [
+    "lowercase",
+    "stop_words",
+    "token_pattern",
+    "ngram_range",
+    "max_features",
+    "norm",
+    "use_idf",
+    "smooth_idf",
+    "sublinear_tf",
+]
+
+
+@dataclass
+class ClassifierArtifact:
+    """Trained classifier tables loaded from an artifact directory"""
+
+    version: str
+    path: str
+    command_patterns: Dict[str, List[Dict[str, Any]]]  # Keyed by category value
+    vectorizer: TfidfVectorizer
+    example_matrix: csr_matrix
+    category_order: List[str]
+    category_offsets: List[int]
+    created_at: Optional[str] = None
+
+
+def _content_version(body: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> str:
+    """Hash of manifest content and array bytes, independent of build time"""
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8"))
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode("utf-8"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _write_atomically(path: str, write: Callable[[BinaryIO], Any]):
+    """Write to a private temp file and rename, so readers never see partial files"""
+    directory, file_name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{file_name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as tmp_file:
+        write(tmp_file)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(artifact_path: str) -> Dict[str, Any]:
+    with open(os.path.join(artifact_path, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _rebuild_vectorizer(
+    params: Dict[str, Any], vocabulary: Sequence[str], idf: np.ndarray
+) -> TfidfVectorizer:
+    """Fitted-equivalent TfidfVectorizer without calling fit"""
+    params = dict(params)
+    if params.get("ngram_range") is not None:
+        params["ngram_range"] = tuple(params["ngram_range"])
+
+    vectorizer = TfidfVectorizer(**params)
+    vectorizer.vocabulary_ = {term: index for index, term in enumerate(vocabulary)}
+    vectorizer.idf_ = idf
+    return vectorizer
+
+
+def _artifact_contents(
+    command_patterns: Dict[Any, List[Dict[str, Any]]],
+    vectorizer: TfidfVectorizer,
+    example_matrix: csr_matrix,
+    category_order: Sequence[Any],
+    category_offsets: Sequence[int],
+) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Manifest body and arrays that together define the classifier tables"""
+    vocabulary = [None] * len(vectorizer.vocabulary_)
+    for term, index in vectorizer.vocabulary_.items():
+        vocabulary[index] = term
+
+    vectorizer_params = vectorizer.get_params()
+    example_matrix = example_matrix.tocsr()
+    body = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "vectorizer_params": {
+            name: (
+                list(vectorizer_params[name])
+                if isinstance(vectorizer_params[name], tuple)
+                else vectorizer_params[name]
+            )
+            for name in VECTORIZER_PARAMS
+        },
+        "vocabulary": vocabulary,
+        "command_patterns": {
+            getattr(category, "value", category): pattern_groups
+            for category, pattern_groups in command_patterns.items()
+        },
+        "category_order": [
+            getattr(category, "value", category) for category in category_order
+        ],
+        "category_offsets": [int(offset) for offset in category_offsets],
+        "example_shape": list(example_matrix.shape),
+    }
+    arrays = {
+        "idf": np.asarray(vectorizer.idf_, dtype=np.float64),
+        "example_data": np.asarray(example_matrix.data, dtype=np.float64),
+        "example_indices": np.asarray(example_matrix.indices, dtype=np.int32),
+        "example_indptr": np.asarray(example_matrix.indptr, dtype=np.int32),
+    }
+    return body, arrays
+
+
+def compute_tables_version(
+    command_patterns: Dict[Any, List[Dict[str, Any]]],
+    vectorizer: TfidfVectorizer,
+    example_matrix: csr_matrix,
+    category_order: Sequence[Any],
+    category_offsets: Sequence[int],
+) -> str:
+    """Version the tables would have as an artifact, without writing it"""
+    return _content_version(
+        *_artifact_contents(
+            command_patterns,
+            vectorizer,
+            example_matrix,
+            category_order,
+            category_offsets,
+        )
+    )
+
+
+def save_classifier_artifact(
+    artifact_path: str,
+    command_patterns: Dict[Any, List[Dict[str, Any]]],
+    vectorizer: TfidfVectorizer,
+    example_matrix: csr_matrix,
+    category_order: Sequence[Any],
+    category_offsets: Sequence[int],
+) -> str:
+    """Write a versioned artifact directory and return its version"""
+    body, arrays = _artifact_contents(
+        command_patterns, vectorizer, example_matrix, category_order, category_offsets
+    )
+    version = _content_version(body, arrays)
+
+    os.makedirs(artifact_path, exist_ok=True)
+    try:
+        previous_files = set(_read_manifest(artifact_path)["arrays"].values())
+    except (OSError, ValueError, KeyError):
+        previous_files = set()
+    array_files = {}
+    for name, array in arrays.items():
+        # Version-prefixed names let readers of the previous manifest keep working
+        array_files[name] = f"{version}.{name}.npy"
+        _write_atomically(
+            os.path.join(artifact_path, array_files[name]),
+            lambda array_file, array=array: np.save(array_file, array),
+        )
+
+    manifest = {
+        **body,
+        "version": version,
+        "created_at": datetime.now().isoformat(),
+        "arrays": array_files,
+    }
+    _write_atomically(
+        os.path.join(artifact_path, MANIFEST_FILE),
+        lambda manifest_file: manifest_file.write(
+            json.dumps(manifest, sort_keys=True).encode("utf-8")
+        ),
+    )
+
+    # Drop arrays of earlier builds; open memory maps stay valid after unlink.
+    # The previous build's arrays stay until the next save, for loaders that
+    # read its manifest just before the swap
+    keep = previous_files | set(array_files.values())
+    for file_name in os.listdir(artifact_path):
+        if file_name.endswith(".npy") and file_name not in keep:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(artifact_path, file_name))
+
+    logger.info(f"Saved classifier artifact {version} to {artifact_path}")
+    return version
+
+
+def load_classifier_artifact(
+    artifact_path: str, verify: bool = True
+) -> ClassifierArtifact:
+    """Load an artifact with its arrays memory-mapped read-only"""
+    for attempt in range(ARTIFACT_LOAD_ATTEMPTS):
+        manifest = _read_manifest(artifact_path)
+        if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported classifier artifact format "
+                f"{manifest.get('format_version')}"
+            )
+
+        try:
+            arrays = {
+                name: np.load(os.path.join(artifact_path, file_name), mmap_mode="r")
+                for name, file_name in manifest["arrays"].items()
+            }
+            break
+        except FileNotFoundError:
+            # Saves replaced this manifest's arrays; the new manifest is in place
+            if attempt == ARTIFACT_LOAD_ATTEMPTS - 1:
+                raise
+            logger.warning(f"Artifact {artifact_path} changed while loading, retrying")
+
+    if verify:
+        body = {
+            key: value
+            for key, value in manifest.items()
+            if key not in ("version", "created_at", "arrays")
+        }
+        if _content_version(body, arrays) != manifest["version"]:
+            raise ValueError(f"Classifier artifact {artifact_path} failed verification")
+
+    example_matrix = csr_matrix(
+        (arrays["example_data"], arrays["example_indices"], arrays["example_indptr"]),
+        shape=tuple(manifest["example_shape"]),
+        copy=False,
+    )
+
+    return ClassifierArtifact(
+        version=manifest["version"],
+        path=artifact_path,
+        command_patterns=manifest["command_patterns"],
+        vectorizer=_rebuild_vectorizer(
+            manifest["vectorizer_params"], manifest["vocabulary"], arrays["idf"]
+        ),
+        example_matrix=example_matrix,
+        category_order=manifest["category_order"],
+        category_offsets=manifest["category_offsets"],
+        created_at=manifest.get("created_at"),
+    )
+
+
+def publish_tables_pointer(shared_dir: str, base_version: str, version: str):
+    """Point every worker sharing shared_dir at the tables in shared_dir/version
+
+    base_version is the version of the tables before any online training, so
+    workers started from different built-in patterns ignore the pointer.
+    """
+    pointer = {"base_version": base_version, "version": version}
+    _write_atomically(
+        os.path.join(shared_dir, TABLES_POINTER_FILE),
+        lambda pointer_file: pointer_file.write(
+            json.dumps(pointer, sort_keys=True).encode("utf-8")
+        ),
+    )
+
+
+def read_tables_pointer(shared_dir: str) -> Optional[Dict[str, str]]:
+    """The latest published pointer, or None if nothing was published"""
+    try:
+        with open(
+            os.path.join(shared_dir, TABLES_POINTER_FILE), encoding="utf-8"
+        ) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def acquire_tables_lock(shared_dir: str) -> BinaryIO:
+    """Block until this process holds the training lock for shared_dir"""
+    os.makedirs(shared_dir, exist_ok=True)
+    lock_file = open(os.path.join(shared_dir, TABLES_LOCK_FILE), "ab")
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+    return lock_file
+
+
+def release_tables_lock(lock_file: BinaryIO):
+    """Release a lock taken with acquire_tables_lock"""
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    lock_file.close()
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Build the classifier artifact: python -m src.ai.classifier_artifact <dir>"""
+    parser = argparse.ArgumentParser(
+        description="Build the versioned voice classifier artifact"
+    )
+    parser.add_argument("output", help="Artifact directory to write")
+    args = parser.parse_args(argv)
+
+    from .voice_classifier import VoiceClassifier
+
+    classifier = VoiceClassifier()
+    classifier._fit_examples()
+    version = classifier.save_artifact(args.output)
+    print(f"Built classifier artifact {version} in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,716 @@
+"""
+* Purpose: Compact, schema-versioned binary encoding of conversation contexts for Redis
+* Issues & Complexity Summary: Struct-packed columnar contexts with a deduplicated string table and optional compression
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~300
+  - Core Algorithm Complexity: Medium (columnar layout, tagged values, string table)
+  - Dependencies: struct, zlib; zstandard and lz4 when installed
+  - State Management Complexity: Low (stateless codec plus counters)
+  - Novelty/Uncertainty Factor: Medium (contexts already stored as pickle must still load)
+* AI Pre-Task Self-Assessment: 88%
+* Problem Estimate: 82%
+* Initial Code Complexity Estimate: 76%
+* Final Code Complexity: 78%
+* Overall Result Score: 89%
+* Key Variances/Learnings: Decoding whole columns instead of field by field keeps decode time close to pickle
+* Last Updated: 2026-10-16
+"""
+
+import io
+import logging
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .voice_classifier import (
+    CATEGORIES,
+    CATEGORY_ORDER,
+    CommandCategory,
+    ConversationContext,
+    Interaction,
+    InteractionRing,
+)
+
+try:
+    import zstandard
+except ImportError:  # Optional; zlib is used instead
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # Optional; zlib is used instead
+    lz4_frame = None
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CONTEXT_CODEC_MAGIC = b"JC"
+CONTEXT_CODEC_VERSION = 1
+PICKLE_PROTOCOL_PREFIX = 0x80  # First byte of pickle protocol 2+ payloads
+
+# Header flags: compression used for the body
+COMPRESSION_NONE = 0
+COMPRESSION_IDS = {"zlib": 1, "zstd": 2, "lz4": 3}
+COMPRESSION_NAMES = {
+    compression_id: name for name, compression_id in COMPRESSION_IDS.items()
+}
+
+# Value tags in the integer column
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_LIST = 6
+TAG_DICT = 7
+TAG_UNSET = 8
+TAG_TUPLE = 9  # Extractors return tuples, such as regex group matches
+
+# Integer column element types, narrowest first
+INT_TYPECODES = ("B", "H", "I", "Q")
+
+# String table layouts
+STRINGS_JOINED = 0  # NUL-separated UTF-8
+STRINGS_LENGTHS = 1  # Byte lengths lead the integer column; a string has a NUL
+
+# Stored category strings by enum position
+CATEGORY_VALUES = tuple(category.value for category in CATEGORIES)
+
+_HEADER = struct.Struct("<2sBB")
+_BODY = struct.Struct("<cB")  # Integer typecode, string table layout
+
+
+class ContextCodecError(ValueError):
+    """Raised for payloads or values the context codec cannot handle"""
+
+
+class _Unset:
+    """Marks a parameter that was absent, as opposed to one set to None"""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "UNSET"
+
+
+UNSET = _Unset()
+
+# Globals a pickled context may reference besides the classifier's own types
+PICKLE_ALLOWED_GLOBALS = {
+    ("datetime", "datetime"),
+    ("datetime", "date"),
+    ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+    ("builtins", "set"),
+    ("builtins", "frozenset"),
+    ("_codecs", "encode"),  # Bytes in protocol 2 pickles
+}
+_PICKLE_CLASSES = {
+    cls.__name__: cls
+    for cls in (ConversationContext, CommandCategory, Interaction, InteractionRing)
+}
+
+
+class _ContextUnpickler(pickle.Unpickler):
+    """Unpickler limited to the types a pickled context contains
+
+    Classifier types match by name in any voice_classifier module, so
+    pickles written under another import path still load; older layouts
+    are converted by ConversationContext.__setstate__.
+    """
+
+    def find_class(self, module: str, name: str) -> Any:
+        classifier_module = module.rpartition(".")[2] == "voice_classifier"
+        if classifier_module and name in _PICKLE_CLASSES:
+            return _PICKLE_CLASSES[name]
+        if (module, name) in PICKLE_ALLOWED_GLOBALS:
+            return super().find_class(module, name)
+        raise ContextCodecError(f"Pickled context references {module}.{name}")
+
+
+def _compressors() -> Dict[str, Tuple[Callable, Callable]]:
+    """(compress, decompress) for each compression library installed"""
+    compressors = {"zlib": (zlib.compress, zlib.decompress)}
+    if zstandard is not None:
+        compressors["zstd"] = (
+            zstandard.ZstdCompressor(level=3).compress,
+            zstandard.ZstdDecompressor().decompress,
+        )
+    if lz4_frame is not None:
+        compressors["lz4"] = (lz4_frame.compress, lz4_frame.decompress)
+    return compressors
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """Value and the position after it"""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _column_bytes(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(typecode: str, data: bytes, position: int, count: int):
+    """Little-endian array of count items at position, and the position after it"""
+    column = array(typecode)
+    end = position + count * column.itemsize
+    if end > len(data):
+        raise ContextCodecError("Context payload is truncated")
+    column.frombytes(data[position:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, end
+
+
+class _Columns:
+    """Context fields split into integer, float and string columns
+
+    Structure (tags, counts, string references) goes to the integer column
+    and floats to the double column, so decoding reads two arrays and one
+    string table instead of parsing a byte stream field by field. Each
+    distinct string is stored once.
+    """
+
+    __slots__ = ("ints", "doubles", "strings")
+
+    def __init__(self):
+        self.ints: List[int] = []
+        self.doubles: List[float] = []
+        self.strings: Dict[str, int] = {}
+
+    def string(self, value: str) -> int:
+        if not isinstance(value, str):
+            raise ContextCodecError(
+                f"Expected a string in context, got {type(value).__name__}"
+            )
+        strings = self.strings
+        return strings.setdefault(value, len(strings))
+
+    def value(self, value: Any):
+        ints = self.ints
+        if type(value) is str:  # Most parameter values
+            strings = self.strings
+            ints += (TAG_STR, strings.setdefault(value, len(strings)))
+        elif value is None:
+            ints.append(TAG_NONE)
+        elif value is True:
+            ints.append(TAG_TRUE)
+        elif value is False:
+            ints.append(TAG_FALSE)
+        elif isinstance(value, int):
+            # Zigzag so negative numbers stay unsigned
+            ints += (TAG_INT, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            ints.append(TAG_FLOAT)
+            self.doubles.append(value)
+        elif isinstance(value, str):
+            ints += (TAG_STR, self.string(value))
+        elif isinstance(value, list):
+            ints += (TAG_LIST, len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, tuple):
+            ints += (TAG_TUPLE, len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, dict):
+            ints.append(TAG_DICT)
+            self.mapping(value)
+        elif value is UNSET:
+            ints.append(TAG_UNSET)
+        else:
+            raise ContextCodecError(
+                f"Cannot encode context value of type {type(value).__name__}"
+            )
+
+    def mapping(self, value: Dict[str, Any]):
+        self.ints.append(len(value))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise ContextCodecError("Context mapping keys must be strings")
+            self.ints.append(self.string(key))
+            self.value(item)
+
+    def interactions(self, interactions: Iterable[Interaction]):
+        ints = self.ints
+        strings = self.strings
+        doubles = self.doubles
+        value = self.value
+        for interaction in interactions:
+            if not isinstance(interaction.user_input, str) or not isinstance(
+                interaction.bot_response, str
+            ):
+                raise ContextCodecError(
+                    "Interaction user_input and bot_response must be strings"
+                )
+            doubles.append(interaction.timestamp)
+            params = interaction.params or ()
+            ints += (
+                strings.setdefault(interaction.user_input, len(strings)),
+                strings.setdefault(interaction.bot_response, len(strings)),
+                strings.setdefault(
+                    CATEGORY_VALUES[interaction.category_index], len(strings)
+                ),
+                len(params) >> 1,
+            )
+            for index in range(0, len(params), 2):
+                if not isinstance(params[index], str):
+                    raise ContextCodecError("Parameter names must be strings")
+                ints.append(strings.setdefault(params[index], len(strings)))
+                value(params[index + 1])
+
+    def pack(self) -> bytes:
+        strings = list(self.strings)
+        ints = self.ints
+        joined = "\x00".join(strings)
+        if joined.count("\x00") == max(len(strings) - 1, 0):
+            layout = STRINGS_JOINED
+            blob = joined.encode("utf-8")
+        else:
+            layout = STRINGS_LENGTHS
+            encoded = [string.encode("utf-8") for string in strings]
+            ints = [len(string) for string in encoded] + ints
+            blob = b"".join(encoded)
+
+        largest = max(ints, default=0)
+        for typecode in INT_TYPECODES:
+            if largest < 1 << (8 * array(typecode).itemsize):
+                break
+        else:
+            raise ContextCodecError("Context integer is too large to encode")
+
+        body = bytearray(_BODY.pack(typecode.encode("ascii"), layout))
+        _write_varint(body, len(strings))
+        _write_varint(body, len(ints))
+        _write_varint(body, len(self.doubles))
+        body += _column_bytes(array(typecode, ints))
+        body += _column_bytes(array("d", self.doubles))
+        body += blob
+        return bytes(body)
+
+
+def _category(value: str) -> CommandCategory:
+    try:
+        return CommandCategory(value)
+    except ValueError:
+        raise ContextCodecError(f"Unknown command category {value!r}") from None
+
+
+class _ColumnReader:
+    """Columns of a body, read back in the order _Columns wrote them"""
+
+    __slots__ = ("strings", "take", "double", "value", "mapping", "_remaining")
+
+    def __init__(self, body: bytes):
+        typecode, layout = _BODY.unpack_from(body)
+        string_count, position = _read_varint(body, _BODY.size)
+        int_count, position = _read_varint(body, position)
+        double_count, position = _read_varint(body, position)
+        ints, position = _read_column(
+            typecode.decode("ascii"), body, position, int_count
+        )
+        doubles, position = _read_column("d", body, position, double_count)
+
+        blob = body[position:]
+        ints = ints.tolist()
+        if layout == STRINGS_JOINED:
+            strings = blob.decode("utf-8").split("\x00") if string_count else []
+        elif layout == STRINGS_LENGTHS:
+            strings = []
+            offset = 0
+            for length in ints[:string_count]:
+                strings.append(blob[offset : offset + length].decode("utf-8"))
+                offset += length
+            del ints[:string_count]
+        else:
+            raise ContextCodecError(f"Unknown string table layout {layout}")
+        if len(strings) != string_count:
+            raise ContextCodecError("String table does not match its count")
+
+        self.strings = strings
+        self._remaining = iter(ints)
+        self.take = take = self._remaining.__next__
+        self.double = double = iter(doubles.tolist()).__next__
+        intern = sys.intern
+
+        # Closures over the column iterators; cheaper than method lookups
+        def value() -> Any:
+            tag = take()
+            if tag == TAG_STR:
+                return strings[take()]
+            if tag == TAG_NONE:
+                return None
+            if tag == TAG_TRUE:
+                return True
+            if tag == TAG_FALSE:
+                return False
+            if tag == TAG_INT:
+                zigzag = take()
+                return zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+            if tag == TAG_FLOAT:
+                return double()
+            if tag == TAG_LIST:
+                return [value() for _ in range(take())]
+            if tag == TAG_TUPLE:
+                return tuple([value() for _ in range(take())])
+            if tag == TAG_DICT:
+                return mapping()
+            if tag == TAG_UNSET:
+                return UNSET
+            raise ContextCodecError(f"Unknown context value tag {tag}")
+
+        def mapping() -> Dict[str, Any]:
+            result = {}
+            for _ in range(take()):
+                key = intern(strings[take()])
+                result[key] = value()
+            return result
+
+        self.value = value
+        self.mapping = mapping
+
+    def interactions(self, count: int) -> List[Interaction]:
+        take = self.take
+        double = self.double
+        value = self.value
+        strings = self.strings
+        intern = sys.intern
+        category_indexes: Dict[int, int] = {}
+        interactions = []
+        for _ in range(count):
+            timestamp = double()
+            user_input = strings[take()]
+            bot_response = strings[take()]
+            category_string = take()
+            category_index = category_indexes.get(category_string)
+            if category_index is None:
+                category_index = CATEGORY_ORDER[_category(strings[category_string])]
+                category_indexes[category_string] = category_index
+            interaction = Interaction(
+                timestamp, user_input, bot_response, category_index
+            )
+            param_count = take()
+            if param_count:
+                params = []
+                for _ in range(param_count):
+                    params.append(intern(strings[take()]))
+                    params.append(value())
+                interaction.params = tuple(params)
+            interactions.append(interaction)
+        return interactions
+
+    def finish(self):
+        if next(self._remaining, None) is not None:
+            raise ContextCodecError("Trailing data after context payload")
+
+
+def _encode_context_v1(context: ConversationContext) -> bytes:
+    """Schema 1 context body
+
+    Categories are stored by value, not enum position, so reordering
+    CommandCategory never changes what a stored context means.
+    """
+    columns = _Columns()
+    ints = columns.ints
+    string = columns.string
+    ints.append(string(context.user_id))
+    ints.append(string(context.session_id))
+    columns.value(context.current_topic)
+    columns.value(
+        context.last_command_category.value
+        if context.last_command_category is not None
+        else None
+    )
+    columns.doubles.append(context.last_activity)
+    columns.mapping(context.active_parameters)
+    columns.mapping(context.preferences)
+
+    history = context.conversation_history
+    ints.append(len(history))
+    columns.interactions(history)
+    return columns.pack()
+
+
+def _decode_context_v1(body: bytes) -> ConversationContext:
+    reader = _ColumnReader(body)
+    take = reader.take
+    user_id = reader.strings[take()]
+    session_id = reader.strings[take()]
+    current_topic = reader.value()
+    last_command_category = reader.value()
+    last_activity = reader.double()
+    active_parameters = reader.mapping()
+    preferences = reader.mapping()
+    history = InteractionRing(reader.interactions(take()))
+    reader.finish()
+
+    return ConversationContext(
+        user_id=user_id,
+        session_id=session_id,
+        conversation_history=history,
+        current_topic=current_topic,
+        last_command_category=(
+            _category(last_command_category)
+            if last_command_category is not None
+            else None
+        ),
+        active_parameters=active_parameters,
+        last_activity=last_activity,
+        preferences=preferences,
+    )
+
+
+def _encode_history_entry_v1(entry: Tuple[Interaction, Dict[str, Any]]) -> bytes:
+    """An interaction whose parameters are replaced by the given mapping"""
+    interaction, parameters = entry
+    columns = _Columns()
+    columns.interactions(
+        (
+            Interaction(
+                interaction.timestamp,
+                interaction.user_input,
+                interaction.bot_response,
+                interaction.category_index,
+                parameters,
+            ),
+        )
+    )
+    return columns.pack()
+
+
+def _decode_history_entry_v1(body: bytes) -> Tuple[Interaction, Dict[str, Any]]:
+    reader = _ColumnReader(body)
+    interaction = reader.interactions(1)[0]
+    reader.finish()
+    parameters = interaction.parameters
+    interaction.params = None
+    return interaction, parameters
+
+
+def _encode_value_v1(value: Any) -> bytes:
+    columns = _Columns()
+    columns.value(value)
+    return columns.pack()
+
+
+def _decode_value_v1(body: bytes) -> Any:
+    reader = _ColumnReader(body)
+    value = reader.value()
+    reader.finish()
+    return value
+
+
+def _encode_mapping_v1(mapping: Dict[str, Any]) -> bytes:
+    columns = _Columns()
+    columns.mapping(mapping)
+    return columns.pack()
+
+
+def _decode_mapping_v1(body: bytes) -> Dict[str, Any]:
+    reader = _ColumnReader(body)
+    mapping = reader.mapping()
+    reader.finish()
+    return mapping
+
+
+# Payload kinds each schema version can encode
+SCHEMA_ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    "context": _encode_context_v1,
+    "history_entry": _encode_history_entry_v1,
+    "mapping": _encode_mapping_v1,
+    "value": _encode_value_v1,
+}
+
+# Decoders for every schema version still readable; encoding writes the latest
+SCHEMA_DECODERS: Dict[int, Dict[str, Callable[[bytes], Any]]] = {
+    1: {
+        "context": _decode_context_v1,
+        "history_entry": _decode_history_entry_v1,
+        "mapping": _decode_mapping_v1,
+        "value": _decode_value_v1,
+    }
+}
+
+
+class ContextCodec:
+    """Encode conversation contexts for Redis without pickle
+
+    Whole contexts, history entries, mappings and single values (for the
+    context manager's lists and hash fields) share one payload format: a 4-byte header
+    (magic, schema version, compression id) and a columnar body. Bodies of
+    at least compress_threshold bytes are compressed with zstd, lz4 or
+    zlib, whichever is preferred and installed, and kept compressed only if
+    that saves space. Pickled contexts written before the codec existed are
+    still decoded while allow_pickle is set.
+    """
+
+    def __init__(
+        self,
+        compression: Optional[str] = "auto",
+        compress_threshold: int = 256,
+        allow_pickle: bool = True,
+    ):
+        available = _compressors()
+        if compression == "auto":
+            compression = next(
+                name for name in ("zstd", "lz4", "zlib") if name in available
+            )
+        elif compression is not None and compression not in available:
+            raise ValueError(
+                f"Context compression {compression!r} is not available; "
+                f"expected one of {sorted(available)} or None"
+            )
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.allow_pickle = allow_pickle
+        self._compressors = available
+
+        # Codec statistics
+        self.encoded = 0
+        self.decoded = 0
+        self.compressed = 0
+        self.legacy_decoded = 0
+        self.encoded_bytes = 0
+
+    def _encode(self, kind: str, value: Any) -> bytes:
+        body = SCHEMA_ENCODERS[kind](value)
+        compression_id = COMPRESSION_NONE
+        if self.compression is not None and len(body) >= self.compress_threshold:
+            compressed = self._compressors[self.compression][0](body)
+            if len(compressed) < len(body):
+                compression_id = COMPRESSION_IDS[self.compression]
+                body = compressed
+                self.compressed += 1
+
+        data = (
+            _HEADER.pack(CONTEXT_CODEC_MAGIC, CONTEXT_CODEC_VERSION, compression_id)
+            + body
+        )
+        self.encoded += 1
+        self.encoded_bytes += len(data)
+        return data
+
+    def _decode(self, kind: str, data: bytes) -> Any:
+        if len(data) < _HEADER.size:
+            raise ContextCodecError("Context payload is too short")
+        magic, version, compression_id = _HEADER.unpack_from(data)
+        if magic != CONTEXT_CODEC_MAGIC:
+            raise ContextCodecError("Not a context codec payload")
+        decoders = SCHEMA_DECODERS.get(version)
+        if decoders is None:
+            raise ContextCodecError(f"Unsupported context schema version {version}")
+
+        body = data[_HEADER.size :]
+        if compression_id != COMPRESSION_NONE:
+            name = COMPRESSION_NAMES.get(compression_id)
+            if name not in self._compressors:
+                raise ContextCodecError(
+                    f"Context payload needs {name or compression_id} decompression, "
+                    "which is not installed"
+                )
+            body = self._compressors[name][1](body)
+
+        try:
+            value = decoders[kind](body)
+        except ContextCodecError:
+            raise
+        except (
+            IndexError,
+            StopIteration,
+            UnicodeDecodeError,
+            ValueError,
+            struct.error,
+        ) as e:
+            raise ContextCodecError(f"Corrupt context payload: {e}") from e
+        self.decoded += 1
+        return value
+
+    def encode(self, context: ConversationContext) -> bytes:
+        """Serialize a whole context with the latest schema"""
+        return self._encode("context", context)
+
+    def decode(self, data: bytes) -> ConversationContext:
+        """Deserialize a context written by any supported schema version"""
+        if data[:1] == bytes([PICKLE_PROTOCOL_PREFIX]):
+            if not self.allow_pickle:
+                raise ContextCodecError("Pickled context payloads are disabled")
+            try:
+                context = _ContextUnpickler(io.BytesIO(data)).load()
+            except ContextCodecError:
+                raise
+            except Exception as e:
+                raise ContextCodecError(f"Corrupt pickled context: {e}") from e
+            if not isinstance(context, ConversationContext):
+                raise ContextCodecError("Pickled payload is not a ConversationContext")
+            self.legacy_decoded += 1
+            self.decoded += 1
+            return context
+        return self._decode("context", data)
+
+    def encode_history_entry(
+        self, interaction: Interaction, parameters: Dict[str, Any]
+    ) -> bytes:
+        """Serialize an interaction with the given parameters instead of its own
+
+        Parameter values may be UNSET; the context manager stores what
+        changed rather than every interaction's full parameter snapshot.
+        """
+        return self._encode("history_entry", (interaction, parameters))
+
+    def decode_history_entry(self, data: bytes) -> Tuple[Interaction, Dict[str, Any]]:
+        """Deserialize a history entry as (interaction without parameters, parameters)"""
+        return self._decode("history_entry", data)
+
+    def encode_mapping(self, mapping: Dict[str, Any]) -> bytes:
+        """Serialize parameters or preferences"""
+        return self._encode("mapping", mapping)
+
+    def decode_mapping(self, data: bytes) -> Dict[str, Any]:
+        """Deserialize parameters or preferences"""
+        return self._decode("mapping", data)
+
+    def encode_value(self, value: Any) -> bytes:
+        """Serialize a single parameter value"""
+        return self._encode("value", value)
+
+    def decode_value(self, data: bytes) -> Any:
+        """Deserialize a single parameter value"""
+        return self._decode("value", data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get codec statistics"""
+        return {
+            "schema_version": CONTEXT_CODEC_VERSION,
+            "compression": self.compression,
+            "compress_threshold": self.compress_threshold,
+            "encoded": self.encoded,
+            "decoded": self.decoded,
+            "compressed": self.compressed,
+            "legacy_pickle_decoded": self.legacy_decoded,
+            "average_encoded_bytes": (
+                self.encoded_bytes / self.encoded if self.encoded > 0 else 0
+            ),
+        }
+
@@ -0,0 +1,118 @@
+"""
+* Purpose: Min-heap expiry index for in-memory conversation contexts
+* Issues & Complexity Summary: Expire or evict only the oldest contexts without scanning the cache
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~120
+  - Core Algorithm Complexity: Low (binary heap with lazy invalidation)
+  - Dependencies: heapq
+  - State Management Complexity: Medium (one heap entry per tracked key, refreshed on pop)
+  - Novelty/Uncertainty Factor: Low (standard lazy-deletion priority queue)
+* AI Pre-Task Self-Assessment: 92%
+* Problem Estimate: 80%
+* Initial Code Complexity Estimate: 70%
+* Final Code Complexity: 72%
+* Overall Result Score: 91%
+* Key Variances/Learnings: Activity updates stay O(1); stale entries are fixed when they surface
+* Last Updated: 2026-10-16
+"""
+
+import heapq
+import logging
+from typing import Any, Callable, Dict, Hashable, List, MutableMapping, Optional, Tuple
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class ContextExpiryIndex:
+    """Min-heap of context keys ordered by last activity
+
+    Each tracked key has exactly one heap entry holding the activity time it
+    was pushed with. Recording activity does not touch the heap: when an entry
+    reaches the top and its context has been active since, it is pushed back
+    with the newer time, and entries for removed keys are dropped. Expiring k
+    contexts therefore costs O((k + refreshed) log n) instead of a full scan.
+    """
+
+    def __init__(self, activity: Callable[[Any], float]):
+        self.activity = activity  # Context -> last activity as a POSIX timestamp
+        self._heap: List[Tuple[float, Hashable]] = []
+        self._tracked: Dict[Hashable, None] = {}
+
+        # Index statistics
+        self.expired = 0
+        self.evicted = 0
+        self.refreshed = 0
+
+    def __len__(self) -> int:
+        return len(self._tracked)
+
+    def track(self, key: Hashable, context: Any):
+        """Start tracking a context; already tracked keys keep their entry"""
+        if key not in self._tracked:
+            self._tracked[key] = None
+            heapq.heappush(self._heap, (self.activity(context), key))
+
+    def _pop_oldest(
+        self, contexts: MutableMapping[Hashable, Any], cutoff: Optional[float]
+    ) -> Optional[Hashable]:
+        """Remove and return the least recently active key, or None
+
+        With a cutoff, stops at the first live context active at or after it.
+        """
+        while self._heap:
+            timestamp, key = self._heap[0]
+            if cutoff is not None and timestamp >= cutoff:
+                return None
+
+            context = contexts.get(key)
+            if context is None:
+                # Cleared elsewhere; drop the stale entry
+                heapq.heappop(self._heap)
+                del self._tracked[key]
+                continue
+
+            last_activity = self.activity(context)
+            if last_activity > timestamp:
+                heapq.heapreplace(self._heap, (last_activity, key))
+                self.refreshed += 1
+                continue
+
+            heapq.heappop(self._heap)
+            del self._tracked[key]
+            del contexts[key]
+            return key
+        return None
+
+    def expire(
+        self,
+        contexts: MutableMapping[Hashable, Any],
+        cutoff: float,
+        limit: Optional[int] = None,
+    ) -> int:
+        """Remove contexts last active before cutoff, at most limit of them"""
+        removed = 0
+        while limit is None or removed < limit:
+            if self._pop_oldest(contexts, cutoff) is None:
+                break
+            removed += 1
+        self.expired += removed
+        return removed
+
+    def evict(self, contexts: MutableMapping[Hashable, Any], count: int) -> int:
+        """Remove the count least recently active contexts regardless of age"""
+        removed = 0
+        while removed < count and self._pop_oldest(contexts, None) is not None:
+            removed += 1
+        self.evicted += removed
+        return removed
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index statistics"""
+        return {
+            "tracked": len(self._tracked),
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "refreshed": self.refreshed,
+        }
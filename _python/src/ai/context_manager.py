@@ -19,19 +19,43 @@
 import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Sequence, Set, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import redis.asyncio as redis
-import pickle
 import hashlib
+import re
+import sys
+import time
 
-from .voice_classifier import ConversationContext, CommandCategory
+from .bounded_cache import BoundedLRUCache, estimate_size
+from .context_codec import UNSET, ContextCodec, ContextCodecError
+from .latency_histogram import LatencyHistogram
+from .voice_classifier import (
+    CommandCategory,
+    ConversationContext,
+    Interaction,
+    InteractionRing,
+)
 
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Hash fields of a stored context, besides one field per active parameter;
+# history is kept in a separate capped list
+CONTEXT_STATE_FIELDS = ("topic", "category", "last_activity", "preferences")
+PARAMETER_FIELD_PREFIX = "param:"
+
+
+def _parameter_undo(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Values that turn parameters after back into before; UNSET removes a name"""
+    return {
+        name: before.get(name, UNSET)
+        for name in [*after, *(name for name in before if name not in after)]
+        if before.get(name, UNSET) != after.get(name, UNSET)
+    }
+
 
 @dataclass
 class ContextUpdateEvent:
@@ -44,24 +68,88 @@ class ContextUpdateEvent:
     timestamp: datetime
 
 
+@dataclass
+class PendingContextWrite:
+    """Context changes held back to be written with other updates"""
+
+    context: ConversationContext
+    changed_fields: Set[str] = field(default_factory=set)
+    appended: int = 0  # Interactions added since the last write
+
+
+def _unsized(value: Any) -> int:
+    return 0
+
+
 class ContextManager:
     """Advanced context management with Redis persistence"""
 
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        codec: Optional[ContextCodec] = None,
+        write_coalesce_window: float = 0.0,
+        max_local_cache_entries: int = 10000,
+        max_local_cache_bytes: Optional[int] = None,
+    ):
         self.redis_url = redis_url
+        self.codec = codec or ContextCodec()  # Redis wire format for contexts
+        # Seconds interaction updates wait to share one pipeline; 0 writes each now
+        self.write_coalesce_window = write_coalesce_window
+        self._pending_writes: Dict[str, PendingContextWrite] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()  # Keeps pipelines in submission order
         self.redis_client: Optional[redis.Redis] = None
-        self.local_cache: Dict[str, ConversationContext] = {}
+        self.local_cache = self._create_local_cache(
+            max_local_cache_entries, max_local_cache_bytes
+        )
         self.context_ttl = 3600 * 24  # 24 hours
-        self.cache_sync_interval = 300  # 5 minutes
-        self.max_local_cache_size = 100
+        # Seconds between write-behind flushes. Dirty contexts are ones whose
+        # write failed, so this bounds how long Redis holds a stale copy while
+        # retrying a struggling Redis at most this often
+        self.cache_sync_interval = 5
+        self.cleanup_interval = 300  # 5 minutes between expired-context sweeps
+        self.write_behind_batch_size = 100  # Contexts per MULTI/EXEC
+        self.write_behind_batch_interval = 0.05  # Pause between batches
+        # Contexts whose Redis copy is stale, oldest first, awaiting a rewrite
+        self._dirty_contexts: Dict[str, ConversationContext] = {}
+        self._sync_task: Optional[asyncio.Task] = None
 
         # Performance tracking
         self.cache_hits = 0
         self.cache_misses = 0
         self.redis_operations = 0
+        self.redis_bytes_written = 0
+        self.decode_failures = 0  # Stored contexts left as is, unreadable
+        self.coalesced_writes = 0
+        self.write_flushes = 0
+        self.write_behind_flushed = 0
+        self.write_behind_batches = 0
+        self.write_behind_failures = 0
+        self.unencodable_contexts = 0  # Dropped instead of retried forever
+        self.write_behind_latency = LatencyHistogram()
 
         logger.info("ContextManager initialized")
 
+    @staticmethod
+    def _create_local_cache(
+        max_entries: int, max_bytes: Optional[int]
+    ) -> BoundedLRUCache:
+        """Least recently used contexts are evicted past either budget"""
+        # Estimating a full context's size costs more than the rest of a turn
+        return BoundedLRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            sizeof=estimate_size if max_bytes is not None else _unsized,
+        )
+
+    def configure_local_cache(self, max_entries: int, max_bytes: Optional[int] = None):
+        """Change the local cache budgets, keeping the most recent contexts"""
+        local_cache = self._create_local_cache(max_entries, max_bytes)
+        for context_key, context in self.local_cache.items():
+            local_cache.put(context_key, context)
+        self.local_cache = local_cache
+
     async def initialize(self):
         """Initialize Redis connection"""
         try:
@@ -70,16 +158,25 @@ class ContextManager:
             logger.info("Redis connection established")
 
             # Start background cache sync task
-            asyncio.create_task(self._background_cache_sync())
+            if self._sync_task is None:
+                self._sync_task = asyncio.create_task(self._background_cache_sync())
 
         except Exception as e:
             logger.warning(f"Redis connection failed: {e}. Using local cache only.")
             self.redis_client = None
 
     def _get_context_key(self, user_id: str, session_id: str) -> str:
-        """Generate context key for storage"""
+        """Generate the legacy whole-context key, read only to migrate contexts"""
         return f"context:{user_id}:{session_id}"
 
+    def _get_context_state_key(self, user_id: str, session_id: str) -> str:
+        """Generate the hash key holding a context's scalar fields"""
+        return f"context_state:{user_id}:{session_id}"
+
+    def _get_context_history_key(self, user_id: str, session_id: str) -> str:
+        """Generate the capped list key holding a context's interactions"""
+        return f"context_history:{user_id}:{session_id}"
+
     def _get_user_sessions_key(self, user_id: str) -> str:
         """Generate user sessions key"""
         return f"user_sessions:{user_id}"
@@ -88,73 +185,460 @@ class ContextManager:
         self, user_id: str, session_id: str, create_if_missing: bool = True
     ) -> Optional[ConversationContext]:
         """Get conversation context with Redis fallback"""
-        context_key = f"{user_id}_{session_id}"
+        return (
+            await self.get_contexts_many([(user_id, session_id)], create_if_missing)
+        )[0]
 
-        # Check local cache first
-        if context_key in self.local_cache:
-            self.cache_hits += 1
-            context = self.local_cache[context_key]
+    async def get_contexts_many(
+        self,
+        sessions: Sequence[Tuple[str, str]],
+        create_if_missing: bool = True,
+    ) -> List[Optional[ConversationContext]]:
+        """Get contexts for several (user_id, session_id) pairs
+
+        Contexts missing from the local cache are read from Redis in one
+        pipeline, and new or migrated contexts are saved in another. A session
+        whose stored payload cannot be decoded gets None and its keys are left
+        alone; if Redis cannot be read at all, contexts are created in memory
+        only, so nothing stored is overwritten.
+        """
+        contexts: List[Optional[ConversationContext]] = [None] * len(sessions)
+        missing: List[int] = []
 
-            # Check if context is expired
-            if not context.is_context_expired():
-                return context
-            else:
+        # Check local cache first
+        for index, (user_id, session_id) in enumerate(sessions):
+            context_key = f"{user_id}_{session_id}"
+            context = self.local_cache.get(context_key)
+            if context is not None:
+                self.cache_hits += 1
+
+                # Check if context is expired
+                if not context.is_context_expired():
+                    contexts[index] = context
+                    continue
                 # Remove expired context
-                del self.local_cache[context_key]
+                self.local_cache.pop(context_key)
+            missing.append(index)
 
         # Try Redis if available
-        if self.redis_client:
+        rewrites: List[ConversationContext] = []
+        unreadable: Set[int] = set()
+        read_failed = False
+        if missing and self.redis_client:
             try:
-                redis_key = self._get_context_key(user_id, session_id)
-                data = await self.redis_client.get(redis_key)
-                self.redis_operations += 1
-
-                if data:
-                    context = pickle.loads(data)
-                    # Update local cache
-                    self.local_cache[context_key] = context
-                    self._manage_cache_size()
-                    return context
-
+                loaded, rewrites, undecoded = await self._read_contexts(
+                    [sessions[i] for i in missing]
+                )
+                unreadable = {missing[i] for i in undecoded}
+                for index, context in zip(missing, loaded):
+                    if context is not None:
+                        # Update local cache
+                        contexts[index] = context
+                        self.local_cache.put(
+                            f"{context.user_id}_{context.session_id}", context
+                        )
             except Exception as e:
                 logger.error(f"Redis get context failed: {e}")
+                read_failed = True
+
+        for index in missing:
+            if contexts[index] is not None or index in unreadable:
+                continue
+            self.cache_misses += 1
+
+            # Create new context if requested
+            if create_if_missing:
+                user_id, session_id = sessions[index]
+                contexts[index] = ConversationContext(
+                    user_id=user_id, session_id=session_id
+                )
+                if not read_failed:
+                    rewrites.append(contexts[index])
+        if rewrites:
+            await self.save_contexts(rewrites)
 
-        self.cache_misses += 1
-
-        # Create new context if requested
-        if create_if_missing:
-            context = ConversationContext(user_id=user_id, session_id=session_id)
-            await self.save_context(context)
-            return context
-
-        return None
+        return contexts
 
     async def save_context(self, context: ConversationContext):
         """Save conversation context to both local cache and Redis"""
-        context_key = f"{context.user_id}_{context.session_id}"
+        await self.save_contexts([context])
 
-        # Update local cache
-        self.local_cache[context_key] = context
-        self._manage_cache_size()
+    async def save_contexts(self, contexts: Sequence[ConversationContext]):
+        """Save contexts to the local cache and rewrite them in Redis in one pipeline"""
+        for context in contexts:
+            # Update local cache
+            self.local_cache.put(f"{context.user_id}_{context.session_id}", context)
 
         # Save to Redis if available
-        if self.redis_client:
+        if self.redis_client and contexts:
+            await self._rewrite_contexts(contexts)
+
+    async def _rewrite_contexts(
+        self, contexts: Sequence[ConversationContext]
+    ) -> Optional[int]:
+        """Rewrite contexts in one MULTI/EXEC, queueing them again if it fails
+
+        A context that cannot be encoded is logged and dropped rather than
+        queued, since retrying cannot succeed; the others are still written.
+        Returns how many contexts were written, or None if Redis failed.
+        """
+        for context in contexts:
+            context_key = f"{context.user_id}_{context.session_id}"
+
+            # A full rewrite supersedes coalesced and write-behind updates
+            self._pending_writes.pop(context_key, None)
+            self._dirty_contexts.pop(context_key, None)
+        try:
+            await self._write_contexts([(context, None, 0) for context in contexts])
+            return len(contexts)
+        except (ContextCodecError, TypeError) as e:
+            if len(contexts) > 1:
+                # Nothing was sent; find the bad contexts one by one
+                written = [await self._rewrite_contexts([c]) for c in contexts]
+                if None in written:
+                    return None
+                return sum(written)
+            self.unencodable_contexts += 1
+            logger.error(
+                f"Dropping context {contexts[0].user_id}/{contexts[0].session_id}"
+                f" that cannot be encoded: {e}"
+            )
+            return 0
+        except asyncio.CancelledError:
+            # Shutdown writes whatever a cancelled sync did not
+            for context in contexts:
+                self._mark_dirty(context)
+            raise
+        except Exception as e:
+            logger.error(f"Redis save context failed: {e}")
+            for context in contexts:
+                self._mark_dirty(context)
+            return None
+
+    def _mark_dirty(self, context: ConversationContext):
+        """Queue a context whose Redis write failed for a full rewrite"""
+        self._dirty_contexts[f"{context.user_id}_{context.session_id}"] = context
+
+    async def flush_dirty_contexts(self, batch_interval: Optional[float] = None) -> int:
+        """Rewrite dirty contexts oldest first, one MULTI/EXEC per batch
+
+        Batches are spaced batch_interval seconds apart (the configured
+        write_behind_batch_interval by default) so a large backlog does not
+        reach Redis as one burst. Each context queued when the flush starts
+        is tried once; a failed batch goes back on the queue without holding
+        up the batches after it. Returns how many contexts were written.
+        """
+        if not self.redis_client:
+            return 0
+        if batch_interval is None:
+            batch_interval = self.write_behind_batch_interval
+
+        flushed = 0
+        queued = list(self._dirty_contexts)
+        batch_size = self.write_behind_batch_size
+        for start in range(0, len(queued), batch_size):
+            if start:
+                await asyncio.sleep(batch_interval)
+            # Contexts rewritten since the flush started have left the queue
+            batch = [
+                self._dirty_contexts[context_key]
+                for context_key in queued[start : start + batch_size]
+                if context_key in self._dirty_contexts
+            ]
+            if not batch:
+                continue
+            flush_start = time.perf_counter()
+            written = await self._rewrite_contexts(batch)
+            if written is None:
+                self.write_behind_failures += 1
+                continue
+            self.write_behind_latency.record(time.perf_counter() - flush_start)
+            self.write_behind_batches += 1
+            self.write_behind_flushed += written
+            flushed += written
+        return flushed
+
+    async def _read_contexts(
+        self, sessions: Sequence[Tuple[str, str]]
+    ) -> Tuple[
+        List[Optional[ConversationContext]], List[ConversationContext], List[int]
+    ]:
+        """Load contexts' hashes and history lists in one round trip
+
+        Also returns the contexts found in the legacy layout, which the caller
+        saves to move them to the new one, and the indices of sessions whose
+        stored payload could not be decoded.
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        for user_id, session_id in sessions:
+            pipe.hgetall(self._get_context_state_key(user_id, session_id))
+            pipe.lrange(self._get_context_history_key(user_id, session_id), 0, -1)
+        replies = await pipe.execute()
+        self.redis_operations += 1
+
+        contexts: List[Optional[ConversationContext]] = [None] * len(sessions)
+        legacy: List[int] = []
+        undecoded: List[int] = []
+        for index, (user_id, session_id) in enumerate(sessions):
+            state, history = replies[2 * index], replies[2 * index + 1]
+            if not state:
+                legacy.append(index)
+                continue
+            try:
+                contexts[index] = self._context_from_redis(
+                    user_id, session_id, state, history
+                )
+            except Exception as e:
+                self._record_decode_failure(user_id, session_id, e)
+                undecoded.append(index)
+        if not legacy:
+            return contexts, [], undecoded
+
+        # Contexts written as one value by earlier releases move to the new layout
+        pipe = self.redis_client.pipeline(transaction=False)
+        for index in legacy:
+            pipe.get(self._get_context_key(*sessions[index]))
+        replies = await pipe.execute()
+        self.redis_operations += 1
+        migrated = []
+        for index, data in zip(legacy, replies):
+            if not data:
+                continue
             try:
-                redis_key = self._get_context_key(context.user_id, context.session_id)
-                data = pickle.dumps(context)
+                contexts[index] = self.codec.decode(data)
+            except Exception as e:
+                self._record_decode_failure(*sessions[index], e)
+                undecoded.append(index)
+                continue
+            migrated.append(contexts[index])
+        return contexts, migrated, undecoded
+
+    def _record_decode_failure(self, user_id: str, session_id: str, error: Exception):
+        """Count and log a stored context that could not be decoded"""
+        self.decode_failures += 1
+        logger.error(f"Stored context {user_id}/{session_id} is unreadable: {error}")
+
+    def _context_from_redis(
+        self,
+        user_id: str,
+        session_id: str,
+        state: Dict[bytes, bytes],
+        history: List[bytes],
+    ) -> ConversationContext:
+        """Rebuild a context from its hash fields and history entries"""
+        prefix = PARAMETER_FIELD_PREFIX.encode("ascii")
+        parameters = {
+            sys.intern(field[len(prefix) :].decode("utf-8")): self.codec.decode_value(
+                value
+            )
+            for field, value in state.items()
+            if field.startswith(prefix)
+        }
 
-                # Save with TTL
-                await self.redis_client.setex(redis_key, self.context_ttl, data)
+        # Each entry holds what its turn changed; undo from the newest back
+        snapshot = dict(parameters)
+        interactions = []
+        for entry in reversed(history):
+            interaction, undo = self.codec.decode_history_entry(entry)
+            for name, value in undo.items():
+                if value is UNSET:
+                    snapshot.pop(name, None)
+                else:
+                    snapshot[name] = value
+            interactions.append(
+                Interaction(
+                    interaction.timestamp,
+                    interaction.user_input,
+                    interaction.bot_response,
+                    interaction.category_index,
+                    snapshot,
+                )
+            )
+        interactions.reverse()
+
+        topic = state.get(b"topic")
+        category = state.get(b"category")
+        preferences = state.get(b"preferences")
+        return ConversationContext(
+            user_id=user_id,
+            session_id=session_id,
+            conversation_history=InteractionRing(interactions),
+            current_topic=topic.decode("utf-8") if topic is not None else None,
+            last_command_category=(
+                CommandCategory(category.decode("utf-8"))
+                if category is not None
+                else None
+            ),
+            active_parameters=parameters,
+            last_activity=float(state[b"last_activity"]),
+            preferences=self.codec.decode_mapping(preferences) if preferences else {},
+        )
 
-                # Track user sessions
-                user_sessions_key = self._get_user_sessions_key(context.user_id)
-                await self.redis_client.sadd(user_sessions_key, context.session_id)
-                await self.redis_client.expire(user_sessions_key, self.context_ttl)
+    def _encode_state_field(
+        self, context: ConversationContext, field: str
+    ) -> Optional[bytes]:
+        """Hash value of one context field; None means the field is unset"""
+        if field.startswith(PARAMETER_FIELD_PREFIX):
+            value = context.active_parameters.get(
+                field[len(PARAMETER_FIELD_PREFIX) :], UNSET
+            )
+            return self.codec.encode_value(value) if value is not UNSET else None
+        if field == "topic":
+            topic = context.current_topic
+            return topic.encode("utf-8") if topic is not None else None
+        if field == "category":
+            category = context.last_command_category
+            return category.value.encode("utf-8") if category is not None else None
+        if field == "last_activity":
+            return repr(context.last_activity).encode("ascii")
+        if field == "preferences":
+            return self.codec.encode_mapping(context.preferences)
+        raise ValueError(f"Unknown context field {field!r}")
+
+    async def _write_contexts(
+        self,
+        writes: Sequence[
+            Tuple[ConversationContext, Optional[Sequence[str]], int]
+        ],
+    ):
+        """Persist (context, changed_fields, appended) writes in one MULTI/EXEC"""
+        async with self._flush_lock:
+            pipe = self.redis_client.pipeline(transaction=True)
+            written = sum(
+                self._queue_context_write(pipe, context, changed_fields, appended)
+                for context, changed_fields, appended in writes
+            )
+            await pipe.execute()
+        self.redis_operations += 1
+        self.redis_bytes_written += written
+
+    def _encode_history_entries(
+        self, interactions: Sequence[Interaction], active_parameters: Dict[str, Any]
+    ) -> List[bytes]:
+        """Entries holding the parameters that differ from the next state"""
+        snapshots = [interaction.parameters for interaction in interactions]
+        snapshots.append(active_parameters)
+        return [
+            self.codec.encode_history_entry(
+                interaction, _parameter_undo(snapshots[index], snapshots[index + 1])
+            )
+            for index, interaction in enumerate(interactions)
+        ]
 
-                self.redis_operations += 1
+    def _queue_context_write(
+        self,
+        pipe,
+        context: ConversationContext,
+        changed_fields: Optional[Sequence[str]],
+        appended: int,
+    ) -> int:
+        """Queue one context's write on a pipeline; returns the bytes written
+
+        With changed_fields, only the newest appended interactions are pushed
+        onto the capped history list, and only those hash fields and the
+        parameters that changed are written. This relies on the previous
+        write having stored the parameters those interactions started from,
+        which holds while contexts change through update_context_interaction
+        or save_context. Without changed_fields the context is rewritten in
+        full.
+        """
+        user_id, session_id = context.user_id, context.session_id
+        state_key = self._get_context_state_key(user_id, session_id)
+        history_key = self._get_context_history_key(user_id, session_id)
+        active_parameters = context.active_parameters
+        history = context.conversation_history
+
+        if changed_fields is not None:
+            # Interactions that already fell out of the ring would be trimmed anyway
+            newest = history[len(history) - min(appended, len(history)) :]
+            entries = self._encode_history_entries(newest, active_parameters)
+            changed_parameters = (
+                _parameter_undo(newest[0].parameters, active_parameters)
+                if newest
+                else {}
+            )
+            fields = [
+                *changed_fields,
+                *(PARAMETER_FIELD_PREFIX + name for name in changed_parameters),
+            ]
+            if entries:
+                pipe.rpush(history_key, *entries)
+                pipe.ltrim(history_key, -InteractionRing.maxlen, -1)
+        else:
+            entries = self._encode_history_entries(history, active_parameters)
+            fields = [
+                *CONTEXT_STATE_FIELDS,
+                *(PARAMETER_FIELD_PREFIX + name for name in active_parameters),
+            ]
+            pipe.delete(
+                state_key, history_key, self._get_context_key(user_id, session_id)
+            )
+            if entries:
+                pipe.rpush(history_key, *entries)
+
+        values: Dict[str, bytes] = {}
+        unset: List[str] = []
+        for field in fields:
+            value = self._encode_state_field(context, field)
+            if value is None:
+                unset.append(field)
+            else:
+                values[field] = value
+        if values:
+            pipe.hset(state_key, mapping=values)
+        if unset and changed_fields is not None:
+            pipe.hdel(state_key, *unset)
+        pipe.expire(state_key, self.context_ttl)
+        pipe.expire(history_key, self.context_ttl)
+
+        # Track user sessions
+        user_sessions_key = self._get_user_sessions_key(user_id)
+        pipe.sadd(user_sessions_key, session_id)
+        pipe.expire(user_sessions_key, self.context_ttl)
+        return sum(len(entry) for entry in entries) + sum(
+            len(value) for value in values.values()
+        )
 
-            except Exception as e:
-                logger.error(f"Redis save context failed: {e}")
+    def _queue_pending_write(
+        self, context: ConversationContext, changed_fields: Sequence[str]
+    ):
+        """Hold an interaction update for the coalescing window"""
+        context_key = f"{context.user_id}_{context.session_id}"
+        pending = self._pending_writes.get(context_key)
+        if pending is None:
+            pending = self._pending_writes[context_key] = PendingContextWrite(context)
+        else:
+            self.coalesced_writes += 1
+        pending.context = context
+        pending.changed_fields.update(changed_fields)
+        pending.appended += 1
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.write_coalesce_window)
+        # Updates arriving during the flush start the next window
+        self._flush_task = None
+        await self.flush_pending_writes()
+
+    async def flush_pending_writes(self):
+        """Write every coalesced interaction update in one round trip"""
+        if not self._pending_writes or not self.redis_client:
+            return
+        pending, self._pending_writes = self._pending_writes, {}
+        try:
+            await self._write_contexts(
+                [
+                    (write.context, sorted(write.changed_fields), write.appended)
+                    for write in pending.values()
+                ]
+            )
+            self.write_flushes += 1
+        except Exception as e:
+            logger.error(f"Redis coalesced context write failed: {e}")
+            for write in pending.values():
+                self._mark_dirty(write.context)
 
     async def update_context_interaction(
         self,
@@ -172,22 +656,37 @@ class ContextManager:
 
         # Add interaction to history
         context.add_interaction(user_input, bot_response, category)
+        changed_fields = ["last_activity"]
 
         # Update active parameters
         if parameters:
-            context.active_parameters.update(parameters)
+            context.update_parameters(parameters)
 
         # Update current topic if it's a significant change
         if category != CommandCategory.GENERAL_CONVERSATION:
             context.current_topic = self._extract_topic_from_interaction(
                 user_input, category
             )
+            changed_fields.append("topic")
 
         # Update timestamp
-        context.context_timestamp = datetime.now()
+        context.last_activity = time.time()
 
-        # Save updated context
-        await self.save_context(context)
+        # Append the interaction rather than rewriting the whole context
+        context_key = f"{user_id}_{session_id}"
+        self.local_cache.put(context_key, context)
+        if self.redis_client:
+            if context_key in self._dirty_contexts:
+                # An append builds on the stored copy, which is stale
+                await self._rewrite_contexts([context])
+            elif self.write_coalesce_window > 0:
+                self._queue_pending_write(context, changed_fields)
+            else:
+                try:
+                    await self._write_contexts([(context, changed_fields, 1)])
+                except Exception as e:
+                    logger.error(f"Redis append interaction failed: {e}")
+                    self._mark_dirty(context)
 
         logger.debug(f"Updated context for {user_id}/{session_id}")
 
@@ -198,8 +697,6 @@ class ContextManager:
         # Simple topic extraction based on category
         if category == CommandCategory.DOCUMENT_GENERATION:
             # Look for "about X" or "on X"
-            import re
-
             patterns = [
                 r"about\s+(.+?)(?:\s+in|\s+for|$)",
                 r"on\s+(.+?)(?:\s+in|\s+for|$)",
@@ -236,7 +733,7 @@ class ContextManager:
 
         # Fallback to local cache
         sessions = []
-        for key in self.local_cache.keys():
+        for key in self.local_cache:
             if key.startswith(f"{user_id}_"):
                 session_id = key.split("_", 1)[1]
                 sessions.append(session_id)
@@ -245,38 +742,54 @@ class ContextManager:
 
     async def clear_context(self, user_id: str, session_id: str):
         """Clear specific context"""
-        context_key = f"{user_id}_{session_id}"
+        await self._clear_sessions(user_id, [session_id])
+        logger.info(f"Cleared context for {user_id}/{session_id}")
 
-        # Remove from local cache
-        if context_key in self.local_cache:
-            del self.local_cache[context_key]
+    async def clear_user_contexts(self, user_id: str):
+        """Clear all contexts for a user"""
+        sessions = await self.get_user_sessions(user_id)
+        await self._clear_sessions(user_id, sessions, drop_session_set=True)
+        logger.info(f"Cleared all contexts for user {user_id}")
+
+    async def _clear_sessions(
+        self, user_id: str, session_ids: Sequence[str], drop_session_set: bool = False
+    ):
+        """Remove sessions locally and from Redis in one pipeline"""
+        for session_id in session_ids:
+            context_key = f"{user_id}_{session_id}"
+
+            # Remove from local cache
+            self.local_cache.pop(context_key, None)
+            self._pending_writes.pop(context_key, None)
+            self._dirty_contexts.pop(context_key, None)
 
         # Remove from Redis
-        if self.redis_client:
+        if self.redis_client and (session_ids or drop_session_set):
             try:
-                redis_key = self._get_context_key(user_id, session_id)
-                await self.redis_client.delete(redis_key)
+                user_sessions_key = self._get_user_sessions_key(user_id)
+                pipe = self.redis_client.pipeline(transaction=True)
+                keys = []
+                for session_id in session_ids:
+                    keys += (
+                        self._get_context_state_key(user_id, session_id),
+                        self._get_context_history_key(user_id, session_id),
+                        self._get_context_key(user_id, session_id),
+                    )
+                if keys:
+                    pipe.delete(*keys)
 
                 # Remove from user sessions
-                user_sessions_key = self._get_user_sessions_key(user_id)
-                await self.redis_client.srem(user_sessions_key, session_id)
+                if drop_session_set:
+                    pipe.delete(user_sessions_key)
+                else:
+                    pipe.srem(user_sessions_key, *session_ids)
+                await pipe.execute()
 
                 self.redis_operations += 1
 
             except Exception as e:
                 logger.error(f"Redis clear context failed: {e}")
 
-        logger.info(f"Cleared context for {user_id}/{session_id}")
-
-    async def clear_user_contexts(self, user_id: str):
-        """Clear all contexts for a user"""
-        sessions = await self.get_user_sessions(user_id)
-
-        for session_id in sessions:
-            await self.clear_context(user_id, session_id)
-
-        logger.info(f"Cleared all contexts for user {user_id}")
-
     async def get_context_summary(
         self, user_id: str, session_id: str
     ) -> Dict[str, Any]:
@@ -383,41 +896,41 @@ class ContextManager:
         unique_suggestions = list(dict.fromkeys(suggestions))
         return unique_suggestions[:5]
 
-    def _manage_cache_size(self):
-        """Manage local cache size to prevent memory issues"""
-        if len(self.local_cache) > self.max_local_cache_size:
-            # Remove oldest contexts (simple LRU)
-            sorted_contexts = sorted(
-                self.local_cache.items(), key=lambda x: x[1].context_timestamp
-            )
-
-            # Remove oldest 20% of contexts
-            to_remove = len(sorted_contexts) // 5
-            for i in range(to_remove):
-                del self.local_cache[sorted_contexts[i][0]]
-
-            logger.debug(f"Cleaned {to_remove} contexts from local cache")
-
     async def _background_cache_sync(self):
-        """Background task to sync cache with Redis"""
+        """Background task writing dirty contexts behind and sweeping expired ones"""
+        last_cleanup = time.monotonic()
         while True:
             try:
                 await asyncio.sleep(self.cache_sync_interval)
 
-                if self.redis_client:
-                    # Sync contexts that have been updated recently
-                    for context_key, context in list(self.local_cache.items()):
-                        if (
-                            datetime.now() - context.context_timestamp
-                        ).seconds < 600:  # 10 minutes
-                            await self.save_context(context)
+                # Only contexts changed since their last write reach Redis
+                await self.flush_dirty_contexts()
 
                 # Clean expired contexts
-                await self.cleanup_expired_contexts()
+                if time.monotonic() - last_cleanup >= self.cleanup_interval:
+                    last_cleanup = time.monotonic()
+                    await self.cleanup_expired_contexts()
 
             except Exception as e:
                 logger.error(f"Background cache sync error: {e}")
 
+    async def shutdown(self):
+        """Stop background writes and flush every queued context change"""
+        if self._sync_task is not None:
+            sync_task, self._sync_task = self._sync_task, None
+            sync_task.cancel()
+            try:
+                await sync_task
+            except asyncio.CancelledError:
+                pass
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        await self.flush_pending_writes()
+        await self.flush_dirty_contexts(batch_interval=0)
+        logger.info("ContextManager shut down")
+
     async def cleanup_expired_contexts(self):
         """Clean up expired contexts from both local cache and Redis"""
         expired_keys = []
@@ -428,7 +941,7 @@ class ContextManager:
                 expired_keys.append(key)
 
         for key in expired_keys:
-            del self.local_cache[key]
+            self.local_cache.pop(key)
 
         if expired_keys:
             logger.info(
@@ -450,8 +963,23 @@ class ContextManager:
             "cache_misses": self.cache_misses,
             "cache_hit_rate": cache_hit_rate,
             "redis_operations": self.redis_operations,
+            "redis_bytes_written": self.redis_bytes_written,
+            "decode_failures": self.decode_failures,
+            "pending_writes": len(self._pending_writes),
+            "coalesced_writes": self.coalesced_writes,
+            "write_flushes": self.write_flushes,
+            "write_behind": {
+                "queue_depth": len(self._dirty_contexts),
+                "flushed": self.write_behind_flushed,
+                "batches": self.write_behind_batches,
+                "failures": self.write_behind_failures,
+                "dropped": self.unencodable_contexts,
+                "flush_latency": self.write_behind_latency.snapshot(),
+            },
             "local_cache_size": len(self.local_cache),
+            "local_cache": self.local_cache.get_stats(),
             "redis_connected": self.redis_client is not None,
+            "codec": self.codec.get_stats(),
         }
 
 
@@ -0,0 +1,110 @@
+"""
+* Purpose: Fixed-memory latency histograms for classifier performance metrics
+* Issues & Complexity Summary: Log-bucketed recording with constant-time percentile snapshots
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~110
+  - Core Algorithm Complexity: Low (logarithmic bucket index, cumulative counts)
+  - Dependencies: math, numpy
+  - State Management Complexity: Low (fixed bucket array plus running totals)
+  - Novelty/Uncertainty Factor: Low (HDR-style relative-precision buckets)
+* AI Pre-Task Self-Assessment: 93%
+* Problem Estimate: 80%
+* Initial Code Complexity Estimate: 70%
+* Final Code Complexity: 72%
+* Overall Result Score: 92%
+* Key Variances/Learnings: Percentiles are bucket upper bounds, within the configured precision
+* Last Updated: 2026-10-16
+"""
+
+import logging
+import math
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram with bounded memory and O(buckets) snapshots
+
+    Bucket 0 holds values below lowest_value; bucket i covers
+    [lowest_value * base**(i - 1), lowest_value * base**i) with
+    base = 1 + precision. Values above highest_value land in the last bucket.
+    """
+
+    def __init__(
+        self,
+        lowest_value: float = 1e-6,
+        highest_value: float = 60.0,
+        precision: float = 0.01,
+    ):
+        if lowest_value <= 0 or highest_value <= lowest_value or precision <= 0:
+            raise ValueError("Invalid histogram range or precision")
+
+        self.lowest_value = lowest_value
+        self.highest_value = highest_value
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        bucket_count = (
+            math.ceil(math.log(highest_value / lowest_value) / self._log_base) + 2
+        )
+        self._upper_bounds = lowest_value * np.power(
+            1.0 + precision, np.arange(bucket_count, dtype=np.float64)
+        )
+        self._counts = [0] * bucket_count  # A list keeps record() cheap
+        self.reset()
+
+    def reset(self):
+        """Drop every recorded value"""
+        self._counts[:] = [0] * len(self._counts)
+        self.count = 0
+        self.total = 0.0
+        self.max_value = 0.0
+
+    def _bucket_index(self, value: float) -> int:
+        if value < self.lowest_value:
+            return 0
+        index = int(math.log(value / self.lowest_value) / self._log_base) + 1
+        return min(index, len(self._counts) - 1)
+
+    def record(self, value: float):
+        """Record one latency in seconds"""
+        value = max(value, 0.0)
+        self._counts[self._bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max_value:
+            self.max_value = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def percentiles(self, quantiles: Iterable[float]) -> Dict[float, float]:
+        """Value at or below which each quantile of recordings falls"""
+        quantiles = list(quantiles)
+        if self.count == 0:
+            return {quantile: 0.0 for quantile in quantiles}
+
+        cumulative = np.cumsum(np.asarray(self._counts, dtype=np.int64))
+        results = {}
+        for quantile in quantiles:
+            rank = max(1, math.ceil(quantile * self.count))
+            index = int(np.searchsorted(cumulative, rank))
+            results[quantile] = min(float(self._upper_bounds[index]), self.max_value)
+        return results
+
+    def snapshot(self) -> Dict[str, float]:
+        """Count, mean, p50/p90/p99 and max in seconds"""
+        p50, p90, p99 = self.percentiles((0.5, 0.9, 0.99)).values()
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "max": self.max_value,
+        }
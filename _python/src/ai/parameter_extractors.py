@@ -0,0 +1,233 @@
+"""
+* Purpose: Precompiled, category-dispatched parameter extractors for voice commands
+* Issues & Complexity Summary: One extractor object per category with regexes compiled once
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~200
+  - Core Algorithm Complexity: Low (ordered regex lookups)
+  - Dependencies: re, latency histograms
+  - State Management Complexity: Low (registry plus per-extractor timings)
+  - Novelty/Uncertainty Factor: Low (same patterns as the original if/elif chain)
+* AI Pre-Task Self-Assessment: 93%
+* Problem Estimate: 80%
+* Initial Code Complexity Estimate: 70%
+* Final Code Complexity: 72%
+* Overall Result Score: 92%
+* Key Variances/Learnings: Ordered pattern lists keep first-listed-match semantics
+* Last Updated: 2026-10-16
+"""
+
+import hashlib
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence
+
+from .latency_histogram import LatencyHistogram
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _compile_all(
+    patterns: Sequence[str], flags: int = re.IGNORECASE
+) -> List[re.Pattern]:
+    return [re.compile(pattern, flags) for pattern in patterns]
+
+
+def _first_group(patterns: Sequence[re.Pattern], text: str) -> Optional[str]:
+    """Group 1 of the first listed pattern that matches anywhere in text"""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+class ParameterExtractor(ABC):
+    """Extracts command parameters for a single category"""
+
+    @abstractmethod
+    def extract(self, text: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class EmailParameterExtractor(ParameterExtractor):
+    """Recipient address and subject hints"""
+
+    def __init__(self):
+        self.email_pattern = re.compile(
+            r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+        )
+        self.subject_patterns = _compile_all(
+            [
+                r"about\s+(.+?)(?:\s+to|\s+for|$)",
+                r"regarding\s+(.+?)(?:\s+to|\s+for|$)",
+                r"subject\s+(.+?)(?:\s+to|\s+for|$)",
+            ]
+        )
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        parameters = {}
+
+        # Extract email addresses
+        email_match = self.email_pattern.search(text)
+        if email_match:
+            parameters["recipient"] = email_match.group(0)
+
+        # Extract subject hints
+        subject = _first_group(self.subject_patterns, text)
+        if subject is not None:
+            parameters["subject"] = subject
+
+        return parameters
+
+
+class DocumentParameterExtractor(ParameterExtractor):
+    """Document format and topic"""
+
+    def __init__(self):
+        self.format_pattern = re.compile(
+            r"\b(pdf|doc|docx|txt|markdown)\b", re.IGNORECASE
+        )
+        self.topic_patterns = _compile_all(
+            [
+                r"about\s+(.+?)(?:\s+in|\s+for|$)",
+                r"on\s+(.+?)(?:\s+in|\s+for|$)",
+                r"document\s+(.+?)(?:\s+in|\s+for|$)",
+            ]
+        )
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        parameters = {}
+
+        # Extract document format
+        format_match = self.format_pattern.search(text)
+        if format_match:
+            parameters["format"] = format_match.group(1).lower()
+
+        # Extract topic
+        topic = _first_group(self.topic_patterns, text)
+        if topic is not None:
+            parameters["content_topic"] = topic
+
+        return parameters
+
+
+class CalendarParameterExtractor(ParameterExtractor):
+    """Date/time mentions and attendees"""
+
+    def __init__(self):
+        self.time_patterns = _compile_all(
+            [
+                r"\b(tomorrow|today|next\s+week|next\s+month)\b",
+                r"\b(\d{1,2}:\d{2})\s*(am|pm)?\b",
+                r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
+                r"\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}\b",
+            ]
+        )
+        self.with_pattern = re.compile(
+            r"with\s+(.+?)(?:\s+at|\s+on|\s+for|$)", re.IGNORECASE
+        )
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        parameters = {}
+
+        # Extract date/time information
+        for pattern in self.time_patterns:
+            matches = pattern.findall(text)
+            if matches:
+                parameters["date_time"] = matches
+                break
+
+        # Extract attendees
+        with_match = self.with_pattern.search(text)
+        if with_match:
+            parameters["attendees"] = with_match.group(1).strip()
+
+        return parameters
+
+
+class WebSearchParameterExtractor(ParameterExtractor):
+    """Search query"""
+
+    def __init__(self):
+        self.search_patterns = _compile_all(
+            [
+                r"search\s+for\s+(.+?)$",
+                r"find\s+(.+?)$",
+                r"look\s+up\s+(.+?)$",
+                r"what\s+is\s+(.+?)$",
+                r"tell\s+me\s+about\s+(.+?)$",
+            ]
+        )
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        query = _first_group(self.search_patterns, text)
+        return {"query": query} if query is not None else {}
+
+
+class CalculationParameterExtractor(ParameterExtractor):
+    """Mathematical expression"""
+
+    def __init__(self):
+        self.math_pattern = re.compile(r"[\d\+\-\*\/\(\)\.\s]+")
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        math_matches = self.math_pattern.findall(text)
+        if math_matches:
+            return {"expression": " ".join(math_matches).strip()}
+        return {}
+
+
+class ParameterExtractorRegistry:
+    """Category -> extractor dispatch with per-extractor latency histograms"""
+
+    def __init__(
+        self, extractors: Optional[Mapping[Hashable, ParameterExtractor]] = None
+    ):
+        self.extractors: Dict[Hashable, ParameterExtractor] = {}
+        self.latency: Dict[Hashable, LatencyHistogram] = {}
+        self.version = ""
+        for key, extractor in (extractors or {}).items():
+            self.register(key, extractor)
+
+    def register(self, key: Hashable, extractor: ParameterExtractor):
+        """Add or replace the extractor for a category"""
+        self.extractors[key] = extractor
+        self.latency[key] = LatencyHistogram()
+        self.version = self._compute_version()
+
+    def _compute_version(self) -> str:
+        """Digest of which extractor class serves each category"""
+        layout = sorted(
+            f"{getattr(key, 'value', key)}={type(extractor).__module__}."
+            f"{type(extractor).__qualname__}"
+            for key, extractor in self.extractors.items()
+        )
+        return hashlib.blake2b(
+            "\n".join(layout).encode("utf-8"), digest_size=4
+        ).hexdigest()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.extractors
+
+    def extract(self, text: str, key: Hashable) -> Dict[str, Any]:
+        """Run the category's extractor; categories without one have no parameters"""
+        extractor = self.extractors.get(key)
+        if extractor is None:
+            return {}
+        return extractor.extract(text)
+
+    def record(self, key: Hashable, seconds: float):
+        """Record how long one extraction for a category took"""
+        histogram = self.latency.get(key)
+        if histogram is not None:
+            histogram.record(seconds)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Latency snapshot per registered extractor"""
+        return {
+            getattr(key, "value", str(key)): histogram.snapshot()
+            for key, histogram in self.latency.items()
+        }
@@ -0,0 +1,96 @@
+"""
+* Purpose: Reject caller-supplied command patterns prone to catastrophic backtracking
+* Issues & Complexity Summary: Restricted regex syntax checked on the parsed pattern tree
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~90
+  - Core Algorithm Complexity: Low (one walk over the parsed pattern)
+  - Dependencies: re parser internals (re._parser, sre_parse before 3.11)
+  - State Management Complexity: None (pure function)
+  - Novelty/Uncertainty Factor: Medium (conservative rules, not a full ReDoS analysis)
+* AI Pre-Task Self-Assessment: 88%
+* Problem Estimate: 75%
+* Initial Code Complexity Estimate: 65%
+* Final Code Complexity: 66%
+* Overall Result Score: 89%
+* Key Variances/Learnings: Every built-in command pattern fits the restricted syntax
+* Last Updated: 2026-10-16
+"""
+
+import re
+from typing import Any
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python 3.10
+    import sre_constants
+    import sre_parse
+
+
+# Unbounded repeats of "." allowed in one pattern; each extra one multiplies
+# the work a failed search can do over the input
+MAX_WILDCARD_REPEATS = 2
+
+_REPEATS = tuple(
+    getattr(sre_constants, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, name)
+)
+_ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)
+
+
+class UnsafePatternError(ValueError):
+    """Raised for patterns outside the restricted syntax"""
+
+
+def _check(subpattern: Any, inside_repeat: bool) -> int:
+    """Raise on unsafe constructs; return the number of wildcard repeats"""
+    wildcard_repeats = 0
+    for op, av in subpattern:
+        if op in _REPEATS:
+            _, max_count, body = av
+            repeats = max_count > 1
+            if repeats and inside_repeat:
+                raise UnsafePatternError("nested quantifiers are not allowed")
+            if max_count == sre_constants.MAXREPEAT and any(
+                item_op is sre_constants.ANY for item_op, _ in body
+            ):
+                wildcard_repeats += 1
+            wildcard_repeats += _check(body, inside_repeat or repeats)
+        elif op is sre_constants.SUBPATTERN:
+            wildcard_repeats += _check(av[-1], inside_repeat)
+        elif op is sre_constants.BRANCH:
+            if inside_repeat:
+                raise UnsafePatternError("alternation inside a repeat is not allowed")
+            wildcard_repeats += max(_check(branch, inside_repeat) for branch in av[1])
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            wildcard_repeats += _check(av[1], inside_repeat)
+        elif op is _ATOMIC_GROUP:
+            wildcard_repeats += _check(av, inside_repeat)
+        elif op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            raise UnsafePatternError("backreferences are not allowed")
+    return wildcard_repeats
+
+
+def check_pattern_safety(pattern: str):
+    """Raise UnsafePatternError unless pattern compiles and fits the restricted syntax
+
+    Rejected: nested quantifiers such as (a+)+, alternation inside a repeat
+    such as (a|ab)*, backreferences, and more than MAX_WILDCARD_REPEATS
+    unbounded repeats of ".".
+    """
+    try:
+        re.compile(pattern)
+        parsed = sre_parse.parse(pattern)
+    except re.error as e:
+        raise UnsafePatternError(f"Invalid regex pattern {pattern!r}: {e}")
+
+    try:
+        wildcard_repeats = _check(parsed, inside_repeat=False)
+    except UnsafePatternError as e:
+        raise UnsafePatternError(f"Unsafe regex pattern {pattern!r}: {e}")
+    if wildcard_repeats > MAX_WILDCARD_REPEATS:
+        raise UnsafePatternError(
+            f"Unsafe regex pattern {pattern!r}: more than "
+            f"{MAX_WILDCARD_REPEATS} unbounded wildcard repeats"
+        )
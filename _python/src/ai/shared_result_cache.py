@@ -0,0 +1,128 @@
+"""
+* Purpose: Redis-backed classification result cache shared by every API worker
+* Issues & Complexity Summary: Version-scoped JSON entries with batched reads/writes and fail-open errors
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~130
+  - Core Algorithm Complexity: Low (key hashing, MGET, pipelined SETEX)
+  - Dependencies: redis.asyncio client (injected)
+  - State Management Complexity: Low (hit/miss/error counters)
+  - Novelty/Uncertainty Factor: Low (cache-aside pattern)
+* AI Pre-Task Self-Assessment: 91%
+* Problem Estimate: 80%
+* Initial Code Complexity Estimate: 70%
+* Final Code Complexity: 72%
+* Overall Result Score: 90%
+* Key Variances/Learnings: Keys include the table version so retrained tables never read stale results
+* Last Updated: 2026-10-16
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SharedResultCache:
+    """Cross-worker cache of context-free classification payloads in Redis
+
+    Entries are JSON documents keyed by the classifier table version and a
+    digest of the normalized text. Redis failures are logged and treated as
+    misses so classification never depends on Redis being available.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        namespace: str = "jarvis:voice:core",
+        ttl_seconds: int = 3600,
+    ):
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def _key(self, version: str, normalized_text: str) -> str:
+        digest = hashlib.blake2b(
+            normalized_text.encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return f"{self.namespace}:{version}:{digest}"
+
+    def _decode(self, data: Any) -> Optional[Dict[str, Any]]:
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(data)
+
+    async def get(self, version: str, normalized_text: str) -> Optional[Dict[str, Any]]:
+        """Cached payload for normalized text, or None"""
+        try:
+            data = await self.redis_client.get(self._key(version, normalized_text))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared result cache read failed: {e}")
+            return None
+        return self._decode(data)
+
+    async def get_many(
+        self, version: str, normalized_texts: Sequence[str]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Cached payloads for several texts with a single MGET"""
+        if not normalized_texts:
+            return []
+
+        try:
+            values = await self.redis_client.mget(
+                [self._key(version, text) for text in normalized_texts]
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared result cache batch read failed: {e}")
+            return [None] * len(normalized_texts)
+        return [self._decode(data) for data in values]
+
+    async def set(self, version: str, normalized_text: str, payload: Dict[str, Any]):
+        """Store one payload"""
+        await self.set_many(version, [(normalized_text, payload)])
+
+    async def set_many(
+        self, version: str, entries: Sequence[Tuple[str, Dict[str, Any]]]
+    ):
+        """Store several payloads in one pipelined round trip"""
+        if not entries:
+            return
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for normalized_text, payload in entries:
+                pipe.setex(
+                    self._key(version, normalized_text),
+                    self.ttl_seconds,
+                    json.dumps(payload),
+                )
+            await pipe.execute()
+            self.writes += len(entries)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared result cache write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups > 0 else 0,
+            "writes": self.writes,
+            "errors": self.errors,
+            "ttl_seconds": self.ttl_seconds,
+        }
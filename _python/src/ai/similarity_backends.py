@@ -0,0 +1,387 @@
+"""
+* Purpose: Pluggable example-similarity backends for the voice classifier
+* Issues & Complexity Summary: Brute-force sparse cosine plus LSH and MinHash candidate indexes with exact reranking
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~330
+  - Core Algorithm Complexity: Medium (random-hyperplane LSH, MinHash banding)
+  - Dependencies: numpy, scipy.sparse
+  - State Management Complexity: Medium (bucket tables rebuilt with the example matrix)
+  - Novelty/Uncertainty Factor: Medium (recall depends on bits/tables/bands settings)
+* AI Pre-Task Self-Assessment: 88%
+* Problem Estimate: 85%
+* Initial Code Complexity Estimate: 82%
+* Final Code Complexity: 84%
+* Overall Result Score: 89%
+* Key Variances/Learnings: Reranking candidates exactly keeps approximate scores at or below the exact ones
+* Last Updated: 2026-10-16
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Mersenne prime modulus for MinHash permutations
+MINHASH_PRIME = (1 << 31) - 1
+
+
+class SimilarityBackend(ABC):
+    """Max cosine similarity between an input vector and each category's examples
+
+    Example rows are L2-normalised TF-IDF vectors stored contiguously per
+    category. Backends never report more than the exact similarity, which the
+    classifier's pruning bounds rely on.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def build(self, example_matrix: csr_matrix, category_matrices: List[csr_matrix]):
+        """Index the example rows; category_matrices are the per-category row blocks"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def category_similarity(
+        self, category_index: int, input_vector: np.ndarray
+    ) -> float:
+        """Max similarity of a dense normalised vector to one category's examples"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def max_similarity_by_category(self, input_vectors: csr_matrix) -> np.ndarray:
+        """Max similarity per category for each row of input_vectors"""
+        raise NotImplementedError
+
+    def get_params(self) -> Dict[str, Any]:
+        """Constructor arguments, used to rebuild the backend in pool workers"""
+        return {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        return {"name": self.name, **self.get_params()}
+
+
+class BruteForceSimilarityBackend(SimilarityBackend):
+    """Exact sparse cosine against every example"""
+
+    name = "brute"
+
+    def __init__(self):
+        self.example_matrix: Optional[csr_matrix] = None
+        self.category_matrices: List[csr_matrix] = []
+        self.category_offsets = np.zeros(0, dtype=np.intp)
+
+    def build(self, example_matrix: csr_matrix, category_matrices: List[csr_matrix]):
+        self.example_matrix = example_matrix
+        self.category_matrices = category_matrices
+        self.category_offsets = _category_offsets(category_matrices)
+
+    def category_similarity(
+        self, category_index: int, input_vector: np.ndarray
+    ) -> float:
+        return float((self.category_matrices[category_index] @ input_vector).max())
+
+    def max_similarity_by_category(self, input_vectors: csr_matrix) -> np.ndarray:
+        similarities = (input_vectors @ self.example_matrix.T).toarray()
+        return np.maximum.reduceat(similarities, self.category_offsets, axis=1)
+
+
+class CandidateSimilarityBackend(SimilarityBackend):
+    """Approximate backend: retrieve candidate rows, then rerank them exactly
+
+    Categories with fewer than exact_below examples are always reranked in
+    full, so ANN only trades recall for latency where a category is large.
+    """
+
+    def __init__(self, exact_below: int = 256):
+        self.exact_below = exact_below
+        self.example_matrix: Optional[csr_matrix] = None
+        self.category_offsets = np.zeros(0, dtype=np.intp)
+        self.always_rows = np.zeros(0, dtype=np.intp)
+
+        # The classifier asks for several categories of one vector in turn
+        self._last_vector: Optional[np.ndarray] = None
+        self._last_similarities: Optional[np.ndarray] = None
+
+        # Backend statistics
+        self.queries = 0
+        self.candidates_reranked = 0
+
+    def build(self, example_matrix: csr_matrix, category_matrices: List[csr_matrix]):
+        self.example_matrix = example_matrix.tocsr()
+        self.category_offsets = _category_offsets(category_matrices)
+        row_bounds = list(self.category_offsets) + [example_matrix.shape[0]]
+        self.always_rows = np.concatenate(
+            [np.zeros(0, dtype=np.intp)]
+            + [
+                np.arange(start, end, dtype=np.intp)
+                for start, end in zip(row_bounds[:-1], row_bounds[1:])
+                if end - start < self.exact_below
+            ]
+        )
+        self._last_vector = None
+        self._last_similarities = None
+        self._build_index()
+
+    @abstractmethod
+    def _build_index(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _candidates(
+        self, term_indices: np.ndarray, input_vector: np.ndarray
+    ) -> List[np.ndarray]:
+        """Candidate row arrays for an input vector with the given nonzero terms"""
+        raise NotImplementedError
+
+    def _similarities(self, input_vector: np.ndarray) -> np.ndarray:
+        """Approximate max similarity for every category"""
+        similarities = np.zeros(len(self.category_offsets))
+        term_indices = np.flatnonzero(input_vector)
+        self.queries += 1
+        if term_indices.size == 0:
+            return similarities
+
+        selected = np.zeros(self.example_matrix.shape[0], dtype=bool)
+        selected[self.always_rows] = True
+        for rows in self._candidates(term_indices, input_vector):
+            selected[rows] = True
+        candidates = np.flatnonzero(selected)
+        if candidates.size:
+            scores = self.example_matrix[candidates] @ input_vector
+            categories = (
+                np.searchsorted(self.category_offsets, candidates, side="right") - 1
+            )
+            np.maximum.at(similarities, categories, scores)
+            self.candidates_reranked += int(candidates.size)
+        return similarities
+
+    def category_similarity(
+        self, category_index: int, input_vector: np.ndarray
+    ) -> float:
+        if input_vector is not self._last_vector:
+            self._last_similarities = self._similarities(input_vector)
+            self._last_vector = input_vector
+        return float(self._last_similarities[category_index])
+
+    def max_similarity_by_category(self, input_vectors: csr_matrix) -> np.ndarray:
+        return (
+            np.vstack(
+                [
+                    self._similarities(input_vectors[row].toarray().ravel())
+                    for row in range(input_vectors.shape[0])
+                ]
+            )
+            if input_vectors.shape[0]
+            else np.zeros((0, len(self.category_offsets)))
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **super().get_stats(),
+            "indexed_rows": (
+                self.example_matrix.shape[0] if self.example_matrix is not None else 0
+            ),
+            "queries": self.queries,
+            "average_candidates": (
+                self.candidates_reranked / self.queries if self.queries > 0 else 0
+            ),
+        }
+
+
+class RandomProjectionLSHBackend(CandidateSimilarityBackend):
+    """Random-hyperplane LSH for cosine similarity, with one-bit multi-probe
+
+    Each of n_tables tables hashes a vector to the signs of n_bits random
+    projections. A query probes its own bucket and every bucket one bit away.
+    Buckets of all tables are laid out CSR-style (bucket_starts into
+    bucket_rows) so a query gathers every probed bucket in one numpy pass.
+    """
+
+    name = "lsh"
+
+    def __init__(
+        self,
+        n_bits: int = 14,
+        n_tables: int = 24,
+        exact_below: int = 256,
+        seed: int = 0,
+    ):
+        if not 1 <= n_bits <= 20:
+            raise ValueError("n_bits must be between 1 and 20")
+        super().__init__(exact_below)
+        self.n_bits = n_bits
+        self.n_tables = n_tables
+        self.seed = seed
+        self.planes = None
+        self.bucket_starts = np.zeros(1, dtype=np.intp)
+        self.bucket_rows = np.zeros(0, dtype=np.intp)
+        self._bit_values = 1 << np.arange(n_bits, dtype=np.int64)
+        self._probe_masks = np.concatenate([[0], self._bit_values])
+        self._table_offsets = np.arange(n_tables, dtype=np.int64) << n_bits
+
+    def _bucket_keys(self, projections: np.ndarray) -> np.ndarray:
+        """Bucket per table for each row of projections, offset by table"""
+        bits = projections.reshape(-1, self.n_tables, self.n_bits) > 0
+        return bits @ self._bit_values + self._table_offsets
+
+    def _build_index(self):
+        rng = np.random.default_rng(self.seed)
+        self.planes = rng.standard_normal(
+            (self.example_matrix.shape[1], self.n_tables * self.n_bits)
+        )
+        keys = self._bucket_keys(np.asarray(self.example_matrix @ self.planes))
+        keys = keys.ravel()
+        counts = np.bincount(keys, minlength=self.n_tables << self.n_bits)
+        self.bucket_starts = np.concatenate([[0], np.cumsum(counts)]).astype(np.intp)
+        self.bucket_rows = (np.argsort(keys, kind="stable") // self.n_tables).astype(
+            np.intp
+        )
+
+    def _candidates(
+        self, term_indices: np.ndarray, input_vector: np.ndarray
+    ) -> List[np.ndarray]:
+        projection = input_vector[term_indices] @ self.planes[term_indices]
+        probes = (self._bucket_keys(projection)[0][:, None] ^ self._probe_masks).ravel()
+        return [
+            _gather_ranges(
+                self.bucket_rows,
+                self.bucket_starts[probes],
+                self.bucket_starts[probes + 1],
+            )
+        ]
+
+    def get_params(self) -> Dict[str, Any]:
+        return {
+            "n_bits": self.n_bits,
+            "n_tables": self.n_tables,
+            "exact_below": self.exact_below,
+            "seed": self.seed,
+        }
+
+
+class MinHashSimilarityBackend(CandidateSimilarityBackend):
+    """MinHash banding over example term sets, suited to short utterances
+
+    Rows whose term sets agree with the query on every hash of at least one
+    band become candidates; Jaccard overlap of a few words is enough. Bands
+    are hashed to int64 keys kept in one sorted array. Key collisions only
+    add candidates, which the exact rerank discards.
+    """
+
+    name = "minhash"
+
+    def __init__(
+        self,
+        num_perm: int = 32,
+        bands: int = 32,
+        exact_below: int = 256,
+        seed: int = 0,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        super().__init__(exact_below)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MINHASH_PRIME, size=(num_perm, 1), dtype=np.int64)
+        self._b = rng.integers(0, MINHASH_PRIME, size=(num_perm, 1), dtype=np.int64)
+        self._band_multipliers = rng.integers(
+            1, MINHASH_PRIME, size=num_perm // bands, dtype=np.int64
+        )
+        self._band_salts = rng.integers(0, 1 << 62, size=bands, dtype=np.int64)
+        self.band_keys = np.zeros(0, dtype=np.int64)
+        self.band_rows = np.zeros(0, dtype=np.intp)
+
+    def _hashes(self, term_indices: np.ndarray) -> np.ndarray:
+        """num_perm x len(term_indices) permuted term hashes"""
+        return (self._a * term_indices.astype(np.int64) + self._b) % MINHASH_PRIME
+
+    def _keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Band keys (rows x bands) for a rows x num_perm signature matrix"""
+        bands = signatures.reshape(signatures.shape[0], self.bands, -1)
+        return bands @ self._band_multipliers + self._band_salts
+
+    def _build_index(self):
+        matrix = self.example_matrix
+        rows = np.flatnonzero(np.diff(matrix.indptr))
+        if rows.size == 0:
+            self.band_keys = np.zeros(0, dtype=np.int64)
+            self.band_rows = np.zeros(0, dtype=np.intp)
+            return
+
+        # Empty rows span no entries, so each nonempty row reduces its own terms
+        signatures = np.minimum.reduceat(
+            self._hashes(matrix.indices[: matrix.indptr[-1]]),
+            matrix.indptr[rows],
+            axis=1,
+        ).T
+        keys = self._keys(signatures).ravel()
+        order = np.argsort(keys, kind="stable")
+        self.band_keys = keys[order]
+        self.band_rows = rows[order // self.bands].astype(np.intp)
+
+    def _candidates(
+        self, term_indices: np.ndarray, input_vector: np.ndarray
+    ) -> List[np.ndarray]:
+        signature = self._hashes(term_indices).min(axis=1)
+        keys = self._keys(signature[None, :])[0]
+        return [
+            _gather_ranges(
+                self.band_rows,
+                np.searchsorted(self.band_keys, keys, side="left"),
+                np.searchsorted(self.band_keys, keys, side="right"),
+            )
+        ]
+
+    def get_params(self) -> Dict[str, Any]:
+        return {
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "exact_below": self.exact_below,
+            "seed": self.seed,
+        }
+
+
+def _category_offsets(category_matrices: Sequence[csr_matrix]) -> np.ndarray:
+    """First row of each category block in the stacked example matrix"""
+    sizes = [matrix.shape[0] for matrix in category_matrices]
+    return np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+
+
+def _gather_ranges(values: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """Concatenation of values[start:end] for each range, without a Python loop"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return values[:0]
+    offsets = np.cumsum(lengths) - lengths
+    return values[np.repeat(starts - offsets, lengths) + np.arange(total)]
+
+
+SIMILARITY_BACKENDS = {
+    backend.name: backend
+    for backend in (
+        BruteForceSimilarityBackend,
+        RandomProjectionLSHBackend,
+        MinHashSimilarityBackend,
+    )
+}
+
+
+def create_similarity_backend(name: str, **params) -> SimilarityBackend:
+    """Instantiate a registered backend by name"""
+    backend_class = SIMILARITY_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(
+            f"Unknown similarity backend {name!r}; "
+            f"expected one of {sorted(SIMILARITY_BACKENDS)}"
+        )
+    return backend_class(**params)
@@ -0,0 +1,433 @@
+"""
+* Purpose: Incremental classification of live partial transcripts
+* Issues & Complexity Summary: Provisional intents from text deltas without rescoring the whole utterance
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~260
+  - Core Algorithm Complexity: Medium (prefix-stable token, TF-IDF and pattern state)
+  - Dependencies: re, numpy
+  - State Management Complexity: Medium (state rolled back to the unchanged prefix on revisions)
+  - Novelty/Uncertainty Factor: Medium (speech recognizers revise earlier words)
+* AI Pre-Task Self-Assessment: 88%
+* Problem Estimate: 82%
+* Initial Code Complexity Estimate: 78%
+* Final Code Complexity: 80%
+* Overall Result Score: 88%
+* Key Variances/Learnings: Rolling back to the common prefix handles both appends and revisions
+* Last Updated: 2026-10-16
+"""
+
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from .voice_classifier import (
+    ClassificationResult,
+    CommandCategory,
+    CoreClassification,
+    VoiceClassifier,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _common_prefix_length(previous: str, current: str) -> int:
+    """Length of the longest common prefix of two strings"""
+    if current.startswith(previous):
+        return len(previous)
+    limit = min(len(previous), len(current))
+    for index in range(limit):
+        if previous[index] != current[index]:
+            return index
+    return limit
+
+
+class StreamingClassificationSession:
+    """Classify an utterance while it is still being transcribed
+
+    Text arrives as deltas (append) or as a revised transcript (revise), as
+    speech recognizers send both. Each update keeps the state derived from
+    the longest prefix of the normalized text that did not change, and only
+    reprocesses the rest:
+
+    - vocabulary tokens ending before the changed suffix keep their counts,
+      and the TF-IDF weights of changed terms are updated in place
+    - a pattern match is kept while the prefix covers it and the character
+      after it, so patterns must not look further ahead than \\b does
+    - similarity is rescored only when term counts or pattern hits change
+
+    finalize() reuses the last provisional result when the final text adds
+    nothing, so the committed classification costs an update, not a rescore.
+    """
+
+    def __init__(
+        self,
+        classifier: VoiceClassifier,
+        user_id: str = "default",
+        session_id: str = "default",
+        use_context: bool = True,
+    ):
+        self.classifier = classifier
+        self.user_id = user_id
+        self.session_id = session_id
+        self.use_context = use_context
+        self.raw_text = ""
+        self.finalized = False
+
+        # Session statistics
+        self.updates = 0
+        self.rescores = 0
+
+        self._reset_state()
+
+    def _reset_state(self):
+        """Start over against the classifier's current tables"""
+        classifier = self.classifier
+        self.tables_version = classifier.tables_version
+        self.normalized_text = ""
+        self.core: Optional[CoreClassification] = None
+
+        vectorizer = classifier.vectorizer
+        trained = classifier.example_matrix is not None
+        self._vocabulary: Dict[str, int] = vectorizer.vocabulary_ if trained else {}
+        self._idf = vectorizer.idf_ if trained else np.zeros(0)
+        # Token offsets are only tracked for plain unigram word analysis
+        self._token_pattern = (
+            re.compile(vectorizer.token_pattern)
+            if vectorizer.analyzer == "word"
+            and vectorizer.ngram_range == (1, 1)
+            and vectorizer.tokenizer is None
+            and vectorizer.preprocessor is None
+            and vectorizer.strip_accents is None
+            else None
+        )
+
+        self._tokens: List[Tuple[int, int]] = []  # (end offset, term index)
+        self.term_counts: Dict[int, int] = {}
+        self._weights = np.zeros(len(self._vocabulary))  # Unnormalised TF-IDF
+        self._pattern_ends: Dict[CommandCategory, int] = {}  # Latched match ends
+        self._pattern_hits: FrozenSet[CommandCategory] = frozenset()
+        self._similarity: Optional[
+            Tuple[Dict[CommandCategory, float], Dict[CommandCategory, float]]
+        ] = None
+
+    def _count(self, term_deltas: Dict[int, int]) -> bool:
+        """Apply net term count changes; True if any count changed"""
+        changed = False
+        for term, delta in term_deltas.items():
+            if delta == 0:
+                continue
+            count = self.term_counts.get(term, 0) + delta
+            if count:
+                self.term_counts[term] = count
+            else:
+                del self.term_counts[term]
+            self._weights[term] = count * self._idf[term]
+            changed = True
+        return changed
+
+    def _update_terms(self, normalized_text: str, prefix: int) -> bool:
+        """Recount vocabulary tokens after the unchanged prefix"""
+        if self._token_pattern is None:
+            term_counts = (
+                self.classifier._vocabulary_term_counts(normalized_text)
+                if self._vocabulary
+                else {}
+            )
+            term_deltas = {
+                term: term_counts.get(term, 0) - self.term_counts.get(term, 0)
+                for term in term_counts.keys() | self.term_counts.keys()
+            }
+            return self._count(term_deltas)
+
+        term_deltas: Dict[int, int] = {}
+        # A token is stable only if the character after it is unchanged too
+        while self._tokens and self._tokens[-1][0] >= prefix:
+            term = self._tokens.pop()[1]
+            term_deltas[term] = term_deltas.get(term, 0) - 1
+
+        resume = self._tokens[-1][0] if self._tokens else 0
+        group = 1 if self._token_pattern.groups == 1 else 0
+        for match in self._token_pattern.finditer(normalized_text, resume):
+            term = self._vocabulary.get(match.group(group))
+            if term is not None:
+                self._tokens.append((match.end(), term))
+                term_deltas[term] = term_deltas.get(term, 0) + 1
+        return self._count(term_deltas)
+
+    def _update_patterns(self, normalized_text: str, prefix: int) -> bool:
+        """Re-search only categories without a match inside the unchanged prefix"""
+        for category, end in list(self._pattern_ends.items()):
+            if end >= prefix:
+                del self._pattern_ends[category]
+
+        hits = set(self._pattern_ends)
+        for category, matcher in self.classifier.compiled_patterns.items():
+            if category in hits:
+                continue
+            match = matcher.search(normalized_text)
+            if match is not None:
+                hits.add(category)
+                # A match at the very end may not survive the next word
+                if match.end() < len(normalized_text):
+                    self._pattern_ends[category] = match.end()
+
+        changed = hits != self._pattern_hits
+        self._pattern_hits = frozenset(hits)
+        return changed
+
+    def _input_vector(self) -> np.ndarray:
+        """Normalised TF-IDF vector of the current term counts"""
+        norm = np.linalg.norm(self._weights)
+        return self._weights / norm if norm > 0 else self._weights.copy()
+
+    def _advance(self, normalized_text: str) -> CoreClassification:
+        """Bring the incremental state up to normalized_text and score it"""
+        classifier = self.classifier
+        if self.tables_version != classifier.tables_version:
+            self._reset_state()
+        if self.core is not None and normalized_text == self.normalized_text:
+            return self.core
+
+        classification_start = time.time()
+        prefix = _common_prefix_length(self.normalized_text, normalized_text)
+        terms_changed = self._update_terms(normalized_text, prefix)
+        hits_changed = self._update_patterns(normalized_text, prefix)
+        self.normalized_text = normalized_text
+
+        pattern_scores = {
+            category: 0.8 if category in self._pattern_hits else 0.0
+            for category in classifier.compiled_patterns
+        }
+        if self._similarity is None or terms_changed or hits_changed:
+            self._similarity = (
+                classifier._pruned_similarities(
+                    self.term_counts, pattern_scores, self._input_vector
+                )
+                if classifier.example_matrix is not None
+                else ({}, {})
+            )
+            self.rescores += 1
+            classifier.stream_rescores += 1
+            self.core = classifier._build_core(
+                normalized_text, pattern_scores, *self._similarity, classification_start
+            )
+        else:
+            self.core = self._rebase_core(normalized_text, classification_start)
+        return self.core
+
+    def _rebase_core(
+        self, normalized_text: str, classification_start: float
+    ) -> CoreClassification:
+        """Previous core with unchanged scores and parameters for the new text"""
+        previous = self.core
+        extraction_start = time.time()
+        parameters = (
+            self.classifier.extract_parameters(normalized_text, previous.best_category)
+            if previous.best_category != CommandCategory.UNKNOWN
+            else {}
+        )
+        extraction_time = time.time() - extraction_start
+        return CoreClassification(
+            normalized_text=normalized_text,
+            category_scores=previous.category_scores.copy(),
+            best_category=previous.best_category,
+            best_confidence=previous.best_confidence,
+            parameters=parameters,
+            classification_time=time.time() - classification_start,
+            extraction_time=extraction_time,
+            pruned_upper_bounds=dict(previous.pruned_upper_bounds),
+            categories_pruned=previous.categories_pruned,
+        )
+
+    def append(self, delta: str) -> ClassificationResult:
+        """Add newly transcribed text and return the provisional classification"""
+        return self.revise(self.raw_text + delta)
+
+    def revise(self, transcript: str) -> ClassificationResult:
+        """Replace the transcript so far and return the provisional classification"""
+        if self.finalized:
+            raise RuntimeError("Streaming session is already finalized")
+
+        preprocessing_start = time.time()
+        # Partial transcripts are one-off strings; keep them out of the memo
+        normalized_text = self.classifier.text_normalizer.normalize(
+            transcript, memoize=False
+        )
+        preprocessing_time = time.time() - preprocessing_start
+
+        self.raw_text = transcript
+        core = self._advance(normalized_text)
+        self.updates += 1
+        self.classifier.stream_updates += 1
+
+        context = (
+            self.classifier.get_context(self.user_id, self.session_id)
+            if self.use_context
+            else None
+        )
+        best_category, best_confidence, parameters = (
+            self.classifier._apply_context_boost(core, context)
+        )
+        return ClassificationResult(
+            category=best_category,
+            intent=f"{best_category.value}_intent",
+            confidence=best_confidence,
+            parameters=parameters,
+            context_used=self.use_context,
+            preprocessing_time=preprocessing_time,
+            classification_time=core.classification_time,
+            categories_pruned=core.categories_pruned,
+            raw_text=transcript,
+            normalized_text=normalized_text,
+        )
+
+    async def finalize(self, transcript: Optional[str] = None) -> ClassificationResult:
+        """Commit the utterance: cache the result and update the conversation
+
+        Returns what classify_command would for the same text.
+        """
+        if self.finalized:
+            raise RuntimeError("Streaming session is already finalized")
+        if transcript is not None:
+            self.raw_text = transcript
+
+        classifier = self.classifier
+        preprocessing_start = time.time()
+        normalized_text = classifier.preprocess_text(self.raw_text)
+        preprocessing_time = time.time() - preprocessing_start
+
+        scoring_start = time.time()
+        core = classifier._get_precomputed_core(normalized_text)
+        if core is not None:
+            classifier.cache_hits += 1
+        else:
+            if (
+                self.core is None
+                or self.core.normalized_text != normalized_text
+                or self.tables_version != classifier.tables_version
+            ):
+                core = self._advance(normalized_text)
+            else:
+                core = self.core
+            classifier._record_core(core)
+            classifier.classification_cache.put(normalized_text, core)
+            if classifier.shared_cache is not None:
+                await classifier.shared_cache.set(
+                    classifier.results_version, normalized_text, core.to_payload()
+                )
+        scoring_time = time.time() - scoring_start
+
+        self.finalized = True
+        classifier.streams_finalized += 1
+        context = classifier._get_or_create_context(self.user_id, self.session_id)
+        return classifier._finalize_classification(
+            self.raw_text,
+            core,
+            context,
+            self.use_context,
+            preprocessing_time,
+            scoring_time,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session statistics"""
+        return {
+            "updates": self.updates,
+            "rescores": self.rescores,
+            "tracked_tokens": len(self._tokens),
+            "finalized": self.finalized,
+        }
+
+
+# An open stream and when it was last used
+_StreamEntry = Tuple[StreamingClassificationSession, float]
+
+
+class TranscriptStreams:
+    """Open transcript streams of one connection, capped and expired when idle
+
+    Streams normally leave when finalized, but each one holds a
+    vocabulary-sized weight vector, so a client that never finalizes must
+    not grow the table until it disconnects. Opening a stream past
+    max_streams evicts the least recently used one.
+    """
+
+    def __init__(
+        self,
+        max_streams: int = 8,
+        idle_ttl_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_streams <= 0:
+            raise ValueError("max_streams must be positive")
+
+        self.max_streams = max_streams
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.clock = clock
+        # Stream id -> (session, last use), least recently used first
+        self._streams: "OrderedDict[str, _StreamEntry]" = OrderedDict()
+
+        # Table statistics
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def __contains__(self, stream_id: str) -> bool:
+        return stream_id in self._streams
+
+    def purge_expired(self) -> int:
+        """Drop streams idle for idle_ttl_seconds, returning how many"""
+        cutoff = self.clock() - self.idle_ttl_seconds
+        expired = 0
+        while self._streams:
+            stream_id, (_, last_used) = next(iter(self._streams.items()))
+            if last_used > cutoff:
+                break
+            del self._streams[stream_id]
+            expired += 1
+
+        if expired:
+            self.expirations += expired
+            logger.debug(f"Expired {expired} idle transcript streams")
+        return expired
+
+    def get(self, stream_id: str) -> Optional[StreamingClassificationSession]:
+        """The open stream and mark it used, or None"""
+        self.purge_expired()
+        entry = self._streams.get(stream_id)
+        if entry is None:
+            return None
+        self._streams[stream_id] = (entry[0], self.clock())
+        self._streams.move_to_end(stream_id)
+        return entry[0]
+
+    def add(self, stream_id: str, stream: StreamingClassificationSession):
+        """Open a stream, evicting the least recently used one at the cap"""
+        self.purge_expired()
+        self._streams.pop(stream_id, None)
+        while len(self._streams) >= self.max_streams:
+            evicted_id, _ = self._streams.popitem(last=False)
+            self.evictions += 1
+            logger.info(f"Evicted transcript stream {evicted_id}: too many open")
+        self._streams[stream_id] = (stream, self.clock())
+
+    def pop(self, stream_id: str) -> Optional[StreamingClassificationSession]:
+        """Close a stream, returning it if it was open"""
+        entry = self._streams.pop(stream_id, None)
+        return entry[0] if entry is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get table statistics"""
+        return {
+            "open": len(self._streams),
+            "max_streams": self.max_streams,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,126 @@
+"""
+* Purpose: Shared single-pass text normalization for voice command processing
+* Issues & Complexity Summary: Precompiled filler/contraction rewriting with optional memoization
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~120
+  - Core Algorithm Complexity: Low (compiled regex alternations)
+  - Dependencies: re, bounded cache
+  - State Management Complexity: Low (bounded memo of normalized forms)
+  - Novelty/Uncertainty Factor: Low (equivalent to sequential substitutions)
+* AI Pre-Task Self-Assessment: 93%
+* Problem Estimate: 80%
+* Initial Code Complexity Estimate: 75%
+* Final Code Complexity: 76%
+* Overall Result Score: 91%
+* Key Variances/Learnings: Longest-first alternations keep single-pass output identical
+* Last Updated: 2026-10-16
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from .bounded_cache import BoundedLRUCache
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+# Filler words and hesitations removed from voice transcripts
+FILLER_WORDS = [
+    "um",
+    "uh",
+    "ah",
+    "like",
+    "you know",
+    "well",
+    "so",
+    "actually",
+    "basically",
+    "totally",
+    "literally",
+    "right",
+    "okay",
+    "alright",
+]
+
+# Contraction expansions applied after filler removal
+CONTRACTIONS = {
+    "won't": "will not",
+    "can't": "cannot",
+    "n't": " not",
+    "'re": " are",
+    "'ve": " have",
+    "'ll": " will",
+    "'d": " would",
+    "'m": " am",
+    "it's": "it is",
+    "that's": "that is",
+}
+
+
+def _longest_first(words: Iterable[str]) -> str:
+    """Build an alternation that prefers the longest literal at each position"""
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+class TextNormalizer:
+    """Normalization engine compiled once and shared across voice components"""
+
+    def __init__(
+        self,
+        filler_words: Iterable[str] = FILLER_WORDS,
+        contractions: Optional[Dict[str, str]] = None,
+        memo_size: int = 4096,
+    ):
+        self.contractions = dict(CONTRACTIONS if contractions is None else contractions)
+        self._filler_pattern = re.compile(rf"\b(?:{_longest_first(filler_words)})\b")
+        self._contraction_pattern = re.compile(_longest_first(self.contractions))
+        self._whitespace_pattern = re.compile(r"\s+")
+        self._memo = (
+            BoundedLRUCache(max_entries=memo_size, sizeof=len)
+            if memo_size > 0
+            else None
+        )
+
+    def _expand_contraction(self, match: re.Match) -> str:
+        return self.contractions[match.group(0)]
+
+    def _normalize_uncached(self, text: str) -> str:
+        # Basic cleaning
+        text = text.lower().strip()
+
+        # Remove filler words and hesitations in one pass
+        text = self._filler_pattern.sub("", text)
+
+        # Normalize contractions in one pass
+        text = self._contraction_pattern.sub(self._expand_contraction, text)
+
+        # Remove extra whitespace
+        return self._whitespace_pattern.sub(" ", text).strip()
+
+    def normalize(self, text: str, memoize: bool = True) -> str:
+        """Lowercase, strip fillers, expand contractions and collapse whitespace
+
+        Pass memoize=False for one-off texts such as partial transcripts so they
+        do not displace memoized commands.
+        """
+        if self._memo is None or not memoize:
+            return self._normalize_uncached(text)
+
+        normalized = self._memo.get(text)
+        if normalized is None:
+            normalized = self._normalize_uncached(text)
+            self._memo.put(text, normalized)
+        return normalized
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memoization statistics"""
+        if self._memo is None:
+            return {"memoization": False}
+        return {"memoization": True, **self._memo.get_stats()}
+
+
+# Global normalizer shared by the classifier, voice processor and context manager
+text_normalizer = TextNormalizer()
@@ -19,21 +19,78 @@
 import re
 import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple, Any, Union
-from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Any,
+    Union,
+)
+from dataclasses import MISSING, dataclass, field, fields
 from enum import Enum
 import json
+import math
+import multiprocessing
+import operator
+import os
+import sys
 import time
+from array import array
+from collections.abc import Mapping as MappingABC, MutableMapping
+from collections.abc import Sequence as SequenceABC
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-import hashlib
 
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy.sparse import csr_matrix, vstack
+from sklearn.base import clone
+from sklearn.feature_extraction.text import (
+    CountVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
 import numpy as np
 
 # Custom imports
 from ..api.models import AIProvider
+from .bounded_cache import BoundedLRUCache
+from .classifier_artifact import (
+    MANIFEST_FILE,
+    acquire_tables_lock,
+    compute_tables_version,
+    load_classifier_artifact,
+    publish_tables_pointer,
+    read_tables_pointer,
+    release_tables_lock,
+    save_classifier_artifact,
+)
+from .context_expiry import ContextExpiryIndex
+from .fast_path_index import FastPathIndex
+from .latency_histogram import LatencyHistogram
+from .parameter_extractors import (
+    CalculationParameterExtractor,
+    CalendarParameterExtractor,
+    DocumentParameterExtractor,
+    EmailParameterExtractor,
+    ParameterExtractor,
+    ParameterExtractorRegistry,
+    WebSearchParameterExtractor,
+)
+from .pattern_safety import check_pattern_safety
+from .shared_result_cache import SharedResultCache
+from .similarity_backends import SimilarityBackend, create_similarity_backend
+from .text_normalizer import TextNormalizer, text_normalizer
+
+if TYPE_CHECKING:
+    from .streaming_session import StreamingClassificationSession
 
 
 # Configure logging
@@ -59,6 +116,33 @@ class CommandCategory(str, Enum):
     UNKNOWN = "unknown"
 
 
+# Trained pipeline components in the en_core_web_* models
+SPACY_PIPELINE_COMPONENTS = [
+    "tok2vec",
+    "tagger",
+    "parser",
+    "attribute_ruler",
+    "lemmatizer",
+    "ner",
+    "senter",
+]
+
+# Components that listen to or build on other components
+SPACY_COMPONENT_DEPENDENCIES = {
+    "tagger": ["tok2vec"],
+    "parser": ["tok2vec"],
+    "ner": ["tok2vec"],
+    "lemmatizer": ["tagger", "attribute_ruler"],
+}
+
+# Enum position of each category, used to break score ties deterministically
+CATEGORY_ORDER = {category: index for index, category in enumerate(CommandCategory)}
+CATEGORIES = tuple(CommandCategory)  # Enum position -> category
+
+# Interactions kept per conversation; older ones fall out of the ring
+MAX_CONVERSATION_HISTORY = 20
+
+
 class IntentConfidence(str, Enum):
     """Intent confidence levels"""
 
@@ -68,7 +152,7 @@ class IntentConfidence(str, Enum):
     VERY_LOW = "very_low"  # <0.3
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassificationResult:
     """Voice command classification result"""
 
@@ -82,6 +166,7 @@ class ClassificationResult:
     suggestions: List[str] = field(default_factory=list)
     raw_text: str = ""
     normalized_text: str = ""
+    categories_pruned: int = 0
 
     @property
     def confidence_level(self) -> IntentConfidence:
@@ -101,88 +186,570 @@ class ClassificationResult:
         return self.confidence < 0.7 or self.category == CommandCategory.UNKNOWN
 
 
-@dataclass
+class CategoryScores(MutableMapping):
+    """Category -> score mapping stored as a float array indexed by enum position
+
+    Cached core results hold one of these instead of a dict of boxed floats,
+    which is about a quarter of the size. Missing categories are NaN.
+    """
+
+    __slots__ = ("_scores",)
+
+    def __init__(self, scores: Optional[Mapping[CommandCategory, float]] = None):
+        self._scores = array("d", [math.nan]) * len(CATEGORIES)
+        if scores:
+            self.update(scores)
+
+    def _index(self, category: Any) -> int:
+        index = CATEGORY_ORDER.get(category)
+        if index is None:
+            raise KeyError(category)
+        return index
+
+    def __getitem__(self, category: CommandCategory) -> float:
+        score = self._scores[self._index(category)]
+        if math.isnan(score):
+            raise KeyError(category)
+        return score
+
+    def __setitem__(self, category: CommandCategory, score: float):
+        self._scores[self._index(category)] = score
+
+    def __delitem__(self, category: CommandCategory):
+        self[category]  # KeyError when absent
+        self._scores[self._index(category)] = math.nan
+
+    def __iter__(self) -> Iterator[CommandCategory]:
+        for index, score in enumerate(self._scores):
+            if not math.isnan(score):
+                yield CATEGORIES[index]
+
+    def __len__(self) -> int:
+        return sum(1 for score in self._scores if not math.isnan(score))
+
+    def copy(self) -> "CategoryScores":
+        """Copy without going through the mapping interface"""
+        scores = CategoryScores()
+        scores._scores = array("d", self._scores)
+        return scores
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self._scores)
+
+    def __reduce__(self):
+        return (CategoryScores, (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"CategoryScores({dict(self)!r})"
+
+
+def _to_json_value(value: Any) -> Any:
+    """Tag tuples so a JSON round trip does not turn them into lists"""
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_json_value(item) for item in value]}
+    if isinstance(value, list):
+        return [_to_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json_value(item) for key, item in value.items()}
+    return value
+
+
+def _from_json_value(value: Any) -> Any:
+    """Inverse of _to_json_value"""
+    if isinstance(value, list):
+        return [_from_json_value(item) for item in value]
+    if isinstance(value, dict):
+        if value.keys() == {"__tuple__"}:
+            return tuple(_from_json_value(item) for item in value["__tuple__"])
+        return {key: _from_json_value(item) for key, item in value.items()}
+    return value
+
+
+@dataclass(slots=True)
+class CoreClassification:
+    """Context-independent classification of normalized text, shared across users"""
+
+    normalized_text: str
+    category_scores: Dict[CommandCategory, float]
+    best_category: CommandCategory
+    best_confidence: float
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    classification_time: float = 0.0
+    extraction_time: float = 0.0
+    # Upper bounds of categories whose similarity scoring was skipped;
+    # their category_scores hold the pattern-only lower bound
+    pruned_upper_bounds: Dict[CommandCategory, float] = field(default_factory=dict)
+    categories_pruned: int = 0
+
+    def __post_init__(self):
+        if not isinstance(self.category_scores, CategoryScores):
+            self.category_scores = CategoryScores(self.category_scores)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """JSON-safe form for the cross-worker result cache"""
+        return {
+            "normalized_text": self.normalized_text,
+            "category_scores": {
+                category.value: score
+                for category, score in self.category_scores.items()
+            },
+            "best_category": self.best_category.value,
+            "best_confidence": self.best_confidence,
+            "parameters": _to_json_value(self.parameters),
+            "classification_time": self.classification_time,
+            "extraction_time": self.extraction_time,
+            "pruned_upper_bounds": {
+                category.value: bound
+                for category, bound in self.pruned_upper_bounds.items()
+            },
+            "categories_pruned": self.categories_pruned,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "CoreClassification":
+        """Rebuild a core result from to_payload() output"""
+        return cls(
+            normalized_text=payload["normalized_text"],
+            category_scores={
+                CommandCategory(category): score
+                for category, score in payload["category_scores"].items()
+            },
+            best_category=CommandCategory(payload["best_category"]),
+            best_confidence=payload["best_confidence"],
+            parameters={
+                sys.intern(name): _from_json_value(value)
+                for name, value in payload["parameters"].items()
+            },
+            classification_time=payload["classification_time"],
+            extraction_time=payload["extraction_time"],
+            pruned_upper_bounds={
+                CommandCategory(category): bound
+                for category, bound in payload["pruned_upper_bounds"].items()
+            },
+            categories_pruned=payload["categories_pruned"],
+        )
+
+
+class Interaction(MappingABC):
+    """One conversation turn, read like the dict it replaces
+
+    Stores an epoch timestamp, the category's enum position and parameters as
+    a flat (name, value, ...) tuple; the mapping view returns a datetime, the
+    category value string and a parameters dict.
+    """
+
+    __slots__ = ("timestamp", "user_input", "bot_response", "category_index", "params")
+
+    KEYS = ("timestamp", "user_input", "bot_response", "category", "parameters")
+
+    def __init__(
+        self,
+        timestamp: float,
+        user_input: str,
+        bot_response: str,
+        category_index: int,
+        parameters: Optional[Mapping[str, Any]] = None,
+    ):
+        self.timestamp = timestamp
+        self.user_input = user_input
+        self.bot_response = bot_response
+        self.category_index = category_index
+        # Most turns carry no parameters
+        self.params = (
+            tuple(item for pair in parameters.items() for item in pair)
+            if parameters
+            else None
+        )
+
+    @classmethod
+    def from_mapping(cls, entry: Mapping[str, Any]) -> "Interaction":
+        """Build from the dict form history entries had before this class"""
+        timestamp = entry.get("timestamp")
+        return cls(
+            (
+                timestamp.timestamp()
+                if isinstance(timestamp, datetime)
+                else float(timestamp or 0.0)
+            ),
+            entry.get("user_input", ""),
+            entry.get("bot_response", ""),
+            CATEGORY_ORDER[CommandCategory(entry.get("category", "unknown"))],
+            entry.get("parameters") or None,
+        )
+
+    @property
+    def category(self) -> CommandCategory:
+        return CATEGORIES[self.category_index]
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        if not self.params:
+            return {}
+        return dict(zip(self.params[::2], self.params[1::2]))
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "timestamp":
+            return datetime.fromtimestamp(self.timestamp)
+        if key == "user_input":
+            return self.user_input
+        if key == "bot_response":
+            return self.bot_response
+        if key == "category":
+            return self.category.value
+        if key == "parameters":
+            return self.parameters
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __reduce__(self):
+        return (
+            Interaction,
+            (
+                self.timestamp,
+                self.user_input,
+                self.bot_response,
+                self.category_index,
+                self.parameters,
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"Interaction({dict(self)!r})"
+
+
+class InteractionRing(SequenceABC):
+    """Fixed-size ring of the most recent interactions, oldest first
+
+    A plain list that is overwritten in place once full; smaller than a deque
+    for the 20 turns a context keeps.
+    """
+
+    __slots__ = ("_items", "_start")
+
+    maxlen = MAX_CONVERSATION_HISTORY
+
+    def __init__(self, items: Iterable[Interaction] = ()):
+        self._items: List[Interaction] = []
+        self._start = 0  # Position of the oldest item once the ring is full
+        for item in items:
+            self.append(item)
+
+    def append(self, item: Interaction):
+        """Add the newest item, dropping the oldest when full"""
+        if len(self._items) < self.maxlen:
+            self._items.append(item)
+        else:
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self.maxlen
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError("interaction index out of range")
+        return self._items[(self._start + index) % len(self._items)]
+
+    def __iter__(self) -> Iterator[Interaction]:
+        yield from self._items[self._start :]
+        yield from self._items[: self._start]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SequenceABC):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __reduce__(self):
+        return (InteractionRing, (list(self),))
+
+    def __repr__(self) -> str:
+        return f"InteractionRing({list(self)!r})"
+
+
+@dataclass(slots=True)
 class ConversationContext:
     """Context management for ongoing conversations"""
 
     user_id: str
     session_id: str
-    conversation_history: List[Dict[str, Any]] = field(default_factory=list)
+    conversation_history: "InteractionRing" = field(
+        default_factory=lambda: InteractionRing()
+    )
     current_topic: Optional[str] = None
     last_command_category: Optional[CommandCategory] = None
     active_parameters: Dict[str, Any] = field(default_factory=dict)
-    context_timestamp: datetime = field(default_factory=datetime.now)
+    last_activity: float = field(default_factory=time.time)  # Epoch seconds
     preferences: Dict[str, Any] = field(default_factory=dict)
 
+    @property
+    def context_timestamp(self) -> datetime:
+        """Last activity as a datetime"""
+        return datetime.fromtimestamp(self.last_activity)
+
+    @context_timestamp.setter
+    def context_timestamp(self, value: datetime):
+        self.last_activity = value.timestamp()
+
+    def __setstate__(self, state: Any):
+        """Restore a pickle, including ones written before the slotted layout
+
+        Earlier releases pickled an instance __dict__ with a context_timestamp
+        datetime and history as a list of dicts.
+        """
+        if isinstance(state, tuple):  # (instance dict, slot values)
+            state = {**(state[0] or {}), **(state[1] or {})}
+        state = dict(state)
+        if "context_timestamp" in state:
+            state["last_activity"] = state.pop("context_timestamp").timestamp()
+        history = state.get("conversation_history")
+        if history is not None and not isinstance(history, InteractionRing):
+            state["conversation_history"] = InteractionRing(
+                (
+                    entry
+                    if isinstance(entry, Interaction)
+                    else Interaction.from_mapping(entry)
+                )
+                for entry in history
+            )
+
+        for data_field in fields(self):
+            if data_field.name in state:
+                value = state[data_field.name]
+            elif data_field.default_factory is not MISSING:
+                value = data_field.default_factory()
+            else:
+                value = data_field.default
+            setattr(self, data_field.name, value)
+
     def add_interaction(
         self, user_input: str, bot_response: str, category: CommandCategory
     ):
         """Add interaction to conversation history"""
+        # The ring drops the oldest interaction once it is full
         self.conversation_history.append(
-            {
-                "timestamp": datetime.now(),
-                "user_input": user_input,
-                "bot_response": bot_response,
-                "category": category.value,
-                "parameters": dict(self.active_parameters),
-            }
+            Interaction(
+                time.time(),
+                user_input,
+                bot_response,
+                CATEGORY_ORDER[category],
+                self.active_parameters,
+            )
         )
 
-        # Keep only last 20 interactions for performance
-        if len(self.conversation_history) > 20:
-            self.conversation_history = self.conversation_history[-20:]
+    def update_parameters(self, parameters: Mapping[str, Any]):
+        """Merge parameters, interning their names across contexts"""
+        for name, value in parameters.items():
+            self.active_parameters[sys.intern(name)] = value
 
-    def get_recent_context(self, max_items: int = 5) -> List[Dict[str, Any]]:
+    def get_recent_context(self, max_items: int = 5) -> List[Interaction]:
         """Get recent conversation context"""
-        return (
-            self.conversation_history[-max_items:] if self.conversation_history else []
-        )
+        return self.conversation_history[-max_items:]
 
     def is_context_expired(self, timeout_minutes: int = 30) -> bool:
         """Check if context has expired"""
-        return datetime.now() - self.context_timestamp > timedelta(
-            minutes=timeout_minutes
-        )
+        return time.time() - self.last_activity > timeout_minutes * 60
 
 
 class VoiceClassifier:
     """Advanced voice command classifier with NLP and context management"""
 
-    def __init__(self, model_path: str = "en_core_web_sm"):
+    def __init__(
+        self,
+        model_path: str = "en_core_web_sm",
+        cache_max_entries: int = 10000,
+        cache_max_bytes: Optional[int] = 64 * 1024 * 1024,
+        cache_ttl: int = 3600,
+        normalizer: Optional[TextNormalizer] = None,
+        nlp_components: Optional[Sequence[str]] = None,
+        executor_workers: int = 0,
+        executor_start_method: Optional[str] = None,
+        artifact_path: Optional[str] = None,
+        shared_tables_dir: Optional[str] = None,
+        max_contexts: int = 100000,
+        context_timeout_minutes: int = 30,
+        fast_path_phrases: Optional[Sequence[str]] = None,
+        similarity_backend: Union[str, SimilarityBackend] = "brute",
+    ):
         self.nlp = None
         self.model_path = model_path
+        # spaCy is loaded lazily; None means no component is preloaded at startup
+        self.preload_nlp_components = (
+            tuple(nlp_components) if nlp_components is not None else None
+        )
+        self.nlp_components: Tuple[str, ...] = ()
+        self.is_initialized = False
+        self.artifact_path = artifact_path  # Prebuilt tables; None trains at startup
+        self.artifact_version: Optional[str] = None
+        # Directory where trained tables are published once and mmapped by every worker
+        self.shared_tables_dir = shared_tables_dir
+        self.tables_version: Optional[str] = None
+        # Tables before online training; updates published by other workers
+        # are only adopted when they were built on the same base
+        self.base_tables_version: Optional[str] = None
+        self._tables_watcher: Optional[asyncio.Task] = None
+        self.text_normalizer = normalizer or text_normalizer
         self.vectorizer = TfidfVectorizer(stop_words="english", max_features=1000)
         self.command_patterns = self._initialize_command_patterns()
+        self.compiled_patterns = self._compile_command_patterns()
+        self.parameter_extractors = self._initialize_parameter_extractors()
+        self.example_matrix = None  # Sparse TF-IDF rows, one per example
+        self.example_categories: List[CommandCategory] = []  # Row -> category
+        self.example_category_order: List[CommandCategory] = []
+        self.example_category_offsets = np.zeros(0, dtype=np.intp)
+        self.example_category_matrices = []  # Per-category row slices
+        # Example similarity search: exact by default, ANN for large corpora
+        self.similarity_backend = (
+            create_similarity_backend(similarity_backend)
+            if isinstance(similarity_backend, str)
+            else similarity_backend
+        )
+        self.category_term_presence = None  # Category x vocabulary term mask
+        self._analyzer = None
+        # Precomputed results for training examples and known hot phrasings
+        self.fast_path = FastPathIndex()
+        self.fast_path_phrases: List[str] = list(fast_path_phrases or [])
         self.context_cache: Dict[str, ConversationContext] = {}
-        self.classification_cache: Dict[str, ClassificationResult] = {}
-        self.cache_ttl = 3600  # 1 hour
+        # Contexts ordered by last activity so expiry never scans the cache
+        self.context_expiry = ContextExpiryIndex(operator.attrgetter("last_activity"))
+        self.max_contexts = max_contexts
+        self.context_timeout_minutes = context_timeout_minutes
+        self._context_reaper: Optional[asyncio.Task] = None
+        self.cache_ttl = cache_ttl  # 1 hour by default
+        self.classification_cache = BoundedLRUCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            ttl_seconds=self.cache_ttl,
+        )
+
+        # Raw term counts behind example_matrix, kept for incremental updates
+        self._example_counts: Optional[Tuple[str, csr_matrix]] = None
+        self._training_lock = asyncio.Lock()
+
+        # Optional Redis cache shared by every worker, keyed by results_version
+        self.shared_cache: Optional[SharedResultCache] = None
+
+        # Optional process pool for CPU-bound scoring; 0 workers scores inline
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.executor_workers = executor_workers
+        self.executor_start_method = executor_start_method
 
         # Performance metrics
         self.total_classifications = 0
         self.cache_hits = 0
-        self.classification_times = []
+        self.latency_histograms = {
+            stage: LatencyHistogram()
+            for stage in ("preprocessing", "scoring", "extraction", "total")
+        }
+        self.scored_classifications = 0
+        self.categories_pruned_total = 0
+        self.streams_started = 0
+        self.stream_updates = 0
+        self.stream_rescores = 0
+        self.streams_finalized = 0
 
         logger.info("VoiceClassifier initialized")
 
     async def initialize(self):
-        """Initialize spaCy model and other resources"""
+        """Initialize classification resources, loading spaCy only if preloaded"""
+        if self.artifact_path:
+            try:
+                self.load_artifact(self.artifact_path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(
+                    f"Could not load classifier artifact {self.artifact_path}, "
+                    f"training instead: {e}"
+                )
+
+        if self.artifact_version is None:
+            # Train vectorizer with command examples
+            await self._train_vectorizer()
+            if self.shared_tables_dir and self.tables_version:
+                self._share_trained_tables()
+
+        self.base_tables_version = self.tables_version
+        if self.shared_tables_dir:
+            # Start from the latest training update other workers published
+            self.refresh_shared_tables()
+
+        if self.preload_nlp_components is not None:
+            self.load_nlp(self.preload_nlp_components)
+
+        self.rebuild_fast_path()
+        self.is_initialized = True
+
+    def rebuild_fast_path(self):
+        """Precompute results for every example and fast path phrasing"""
+        phrasings = [
+            example
+            for pattern_groups in self.command_patterns.values()
+            for pattern_group in pattern_groups
+            for example in pattern_group["examples"]
+        ] + self.fast_path_phrases
+        normalized_texts = list(
+            dict.fromkeys(self.preprocess_text(text) for text in phrasings)
+        )
+        self.fast_path.rebuild(
+            self.tables_version, self.classify_core_many(normalized_texts)
+        )
+
+    def add_fast_path_phrases(self, texts: Iterable[str]):
+        """Add known high-frequency phrasings to the fast path"""
+        self.fast_path_phrases.extend(texts)
+        if self.is_initialized:
+            self.rebuild_fast_path()
+
+    def _resolve_nlp_components(self, components: Iterable[str]) -> Set[str]:
+        """Expand requested spaCy components with the components they rely on"""
+        resolved = set()
+        pending = list(components)
+        while pending:
+            component = pending.pop()
+            if component not in resolved:
+                resolved.add(component)
+                pending.extend(SPACY_COMPONENT_DEPENDENCIES.get(component, []))
+        return resolved
+
+    def load_nlp(self, components: Iterable[str] = ()):
+        """Lazily load spaCy with only the requested components (tokenizer always)"""
+        requested = self._resolve_nlp_components(components)
+        if self.nlp is not None and requested <= set(self.nlp_components):
+            return self.nlp
+
+        # Reloading keeps components earlier callers asked for
+        requested |= set(self.nlp_components)
+        exclude = [c for c in SPACY_PIPELINE_COMPONENTS if c not in requested]
+
+        import spacy
+
         try:
-            self.nlp = spacy.load(self.model_path)
-            logger.info(f"Loaded spaCy model: {self.model_path}")
+            self.nlp = spacy.load(self.model_path, exclude=exclude)
+            logger.info(
+                f"Loaded spaCy model: {self.model_path} "
+                f"(components: {sorted(requested) or ['tokenizer']})"
+            )
         except OSError:
             logger.warning(
                 f"spaCy model {self.model_path} not found, using basic English model"
             )
             try:
-                self.nlp = spacy.load("en_core_web_sm")
+                self.nlp = spacy.load("en_core_web_sm", exclude=exclude)
             except OSError:
                 logger.error(
                     "No spaCy model available. Please install: python -m spacy download en_core_web_sm"
                 )
                 raise
 
-        # Train vectorizer with command examples
-        await self._train_vectorizer()
+        self.nlp_components = tuple(sorted(requested))
+        return self.nlp
 
     def _initialize_command_patterns(
         self,
@@ -339,274 +906,1050 @@ class VoiceClassifier:
             ],
         }
 
+    def _compile_command_patterns(self) -> Dict[CommandCategory, re.Pattern]:
+        """Compile every category's patterns once into a single matcher per category"""
+        compiled_patterns = {}
+        for category, pattern_groups in self.command_patterns.items():
+            matcher = self._compile_category_patterns(pattern_groups)
+            if matcher is not None:
+                compiled_patterns[category] = matcher
+
+        logger.info(
+            f"Compiled command patterns for {len(compiled_patterns)} categories"
+        )
+        return compiled_patterns
+
+    def _compile_category_patterns(
+        self, pattern_groups: List[Dict[str, Any]]
+    ) -> Optional[re.Pattern]:
+        """Join a category's patterns into one case-insensitive alternation"""
+        valid_patterns = []
+        for pattern_group in pattern_groups:
+            for pattern in pattern_group["patterns"]:
+                try:
+                    re.compile(pattern)
+                except re.error:
+                    logger.warning(f"Invalid regex pattern: {pattern}")
+                    continue
+                valid_patterns.append(f"(?:{pattern})")
+
+        if not valid_patterns:
+            return None
+
+        return re.compile("|".join(valid_patterns), re.IGNORECASE)
+
     async def _train_vectorizer(self):
-        """Train the TF-IDF vectorizer with command examples"""
+        """Train the TF-IDF vectorizer and precompute the example matrix"""
+        self._fit_examples()
+
+    def _fit_examples(self):
+        """Fit the vectorizer on command examples and build scoring tables"""
         all_examples = []
+        category_order = []
+        category_offsets = []
         for category, patterns in self.command_patterns.items():
+            category_examples = []
             for pattern_group in patterns:
-                all_examples.extend(pattern_group["examples"])
+                category_examples.extend(pattern_group["examples"])
+
+            if category_examples:
+                # Rows are kept contiguous per category for reduceat scoring
+                category_order.append(category)
+                category_offsets.append(len(all_examples))
+                all_examples.extend(category_examples)
 
         if all_examples:
             self.vectorizer.fit(all_examples)
+            # TF-IDF rows are L2-normalised, so cosine similarity is a dot product
+            self._install_scoring_tables(
+                self.vectorizer,
+                self.vectorizer.transform(all_examples).tocsr(),
+                category_order,
+                category_offsets,
+            )
+            self.artifact_version = None
+            self.tables_version = compute_tables_version(
+                self.command_patterns,
+                self.vectorizer,
+                self.example_matrix,
+                self.example_category_order,
+                self.example_category_offsets,
+            )
             logger.info(f"Trained vectorizer with {len(all_examples)} examples")
 
-    def preprocess_text(self, text: str) -> str:
-        """Preprocess and normalize input text"""
-        start_time = time.time()
+    def _share_trained_tables(self):
+        """Publish trained tables under shared_tables_dir and remap them from there
+
+        Every worker trains identical tables, so they all agree on the version
+        directory; the first one writes it and the rest attach to the same
+        files, leaving one copy of the tables in the page cache per box.
+        """
+        shared_path = os.path.join(self.shared_tables_dir, self.tables_version)
+        try:
+            if not os.path.exists(os.path.join(shared_path, MANIFEST_FILE)):
+                self.save_artifact(shared_path)
+            self.load_artifact(shared_path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not share classifier tables, keeping private: {e}")
+
+    def refresh_shared_tables(self) -> bool:
+        """Load the latest training update another worker published
+
+        Returns True when the tables changed. Pointers built on a different
+        base (another release's built-in patterns) are ignored.
+        """
+        if not self.shared_tables_dir or self.base_tables_version is None:
+            return False
+
+        try:
+            pointer = read_tables_pointer(self.shared_tables_dir)
+            if (
+                pointer is None
+                or pointer.get("base_version") != self.base_tables_version
+                or pointer.get("version") == self.tables_version
+            ):
+                return False
+            self.load_artifact(
+                os.path.join(self.shared_tables_dir, pointer["version"])
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load published classifier tables: {e}")
+            return False
+
+        self._tables_changed()
+        logger.info(f"Loaded published classifier tables {self.tables_version}")
+        return True
+
+    def _tables_changed(self):
+        """Drop everything computed from the previous tables"""
+        self.classification_cache.clear()
+        if self.executor is not None:
+            self._restart_executor()
+        if self.is_initialized:
+            self.rebuild_fast_path()
+
+    async def _watch_shared_tables(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                async with self._training_lock:
+                    self.refresh_shared_tables()
+            except Exception as e:
+                logger.error(f"Shared tables watcher error: {e}")
+
+    def start_tables_watcher(self, interval_seconds: float = 5.0):
+        """Pick up training updates from other workers in a background task"""
+        if self._tables_watcher is not None or not self.shared_tables_dir:
+            return
+        self._tables_watcher = asyncio.get_running_loop().create_task(
+            self._watch_shared_tables(interval_seconds)
+        )
+        logger.info(f"Shared tables watcher started (every {interval_seconds}s)")
+
+    async def stop_tables_watcher(self):
+        """Cancel the shared tables watcher"""
+        if self._tables_watcher is None:
+            return
+        watcher, self._tables_watcher = self._tables_watcher, None
+        watcher.cancel()
+        try:
+            await watcher
+        except asyncio.CancelledError:
+            pass
+
+    @staticmethod
+    def _row_block(matrix: csr_matrix, start: int, end: int) -> csr_matrix:
+        """Rows start:end as a CSR matrix sharing the parent's data buffers"""
+        data_start, data_end = matrix.indptr[start], matrix.indptr[end]
+        block = csr_matrix((end - start, matrix.shape[1]), dtype=matrix.dtype)
+        # Assigned directly: the constructor copies views of larger buffers
+        block.data = matrix.data[data_start:data_end]
+        block.indices = matrix.indices[data_start:data_end]
+        block.indptr = (matrix.indptr[start : end + 1] - data_start).astype(
+            matrix.indptr.dtype
+        )
+        return block
+
+    def _install_scoring_tables(
+        self,
+        vectorizer: TfidfVectorizer,
+        example_matrix: csr_matrix,
+        category_order: List[CommandCategory],
+        category_offsets: List[int],
+    ):
+        """Set the example matrix and every table derived from it"""
+        row_bounds = list(category_offsets) + [example_matrix.shape[0]]
+        example_categories = []
+        for category, start, end in zip(
+            category_order, row_bounds[:-1], row_bounds[1:]
+        ):
+            example_categories.extend([category] * (end - start))
+
+        # Cheap bounds for pruned scoring: which terms each category uses
+        category_matrices = [
+            self._row_block(example_matrix, start, end)
+            for start, end in zip(row_bounds[:-1], row_bounds[1:])
+        ]
+
+        self.vectorizer = vectorizer
+        self.example_matrix = example_matrix
+        self.example_categories = example_categories
+        self.example_category_order = list(category_order)
+        self.example_category_offsets = np.asarray(category_offsets, dtype=np.intp)
+        self.example_category_matrices = category_matrices
+        self.category_term_presence = np.vstack(
+            [matrix.getnnz(axis=0) > 0 for matrix in category_matrices]
+        )
+        self._analyzer = vectorizer.build_analyzer()
+        self.similarity_backend.build(example_matrix, category_matrices)
+
+    def save_artifact(self, artifact_path: str) -> str:
+        """Persist the trained tables and pattern table as a versioned artifact"""
+        if self.example_matrix is None:
+            raise ValueError("Classifier must be trained before saving an artifact")
+
+        return save_classifier_artifact(
+            artifact_path,
+            self.command_patterns,
+            self.vectorizer,
+            self.example_matrix,
+            self.example_category_order,
+            self.example_category_offsets,
+        )
+
+    def load_artifact(self, artifact_path: str, verify: bool = True):
+        """Warm start from a prebuilt artifact instead of refitting"""
+        artifact = load_classifier_artifact(artifact_path, verify=verify)
 
-        # Basic cleaning
-        text = text.lower().strip()
-
-        # Remove filler words and hesitations
-        filler_words = [
-            "um",
-            "uh",
-            "ah",
-            "like",
-            "you know",
-            "well",
-            "so",
-            "actually",
-            "basically",
-            "totally",
-            "literally",
-            "right",
-            "okay",
-            "alright",
+        self.command_patterns = {
+            CommandCategory(category): pattern_groups
+            for category, pattern_groups in artifact.command_patterns.items()
+        }
+        self.compiled_patterns = self._compile_command_patterns()
+        self._install_scoring_tables(
+            artifact.vectorizer,
+            artifact.example_matrix,
+            [CommandCategory(category) for category in artifact.category_order],
+            artifact.category_offsets,
+        )
+        self.artifact_path = artifact_path
+        self.artifact_version = artifact.version
+        self.tables_version = artifact.version
+        logger.info(f"Loaded classifier artifact {artifact.version}")
+
+    def _category_examples(self, category: CommandCategory) -> List[str]:
+        return [
+            example
+            for pattern_group in self.command_patterns.get(category, [])
+            for example in pattern_group["examples"]
         ]
-        for filler in filler_words:
-            text = re.sub(r"\b" + filler + r"\b", "", text)
-
-        # Normalize contractions
-        contractions = {
-            "won't": "will not",
-            "can't": "cannot",
-            "n't": " not",
-            "'re": " are",
-            "'ve": " have",
-            "'ll": " will",
-            "'d": " would",
-            "'m": " am",
-            "it's": "it is",
-            "that's": "that is",
+
+    def _get_example_counts(self) -> csr_matrix:
+        """Term counts per example row, tokenized once per table version"""
+        if (
+            self._example_counts is None
+            or self._example_counts[0] != self.tables_version
+        ):
+            examples = [
+                example
+                for category in self.example_category_order
+                for example in self._category_examples(category)
+            ]
+            # Count with the fitted vocabulary; this tokenizes but does not refit
+            counts = CountVectorizer.transform(self.vectorizer, examples).tocsr()
+            self._example_counts = (self.tables_version, counts)
+        return self._example_counts[1]
+
+    def _count_new_examples(
+        self, examples: List[str], vocabulary: Dict[str, int]
+    ) -> csr_matrix:
+        """Count terms of new examples, growing vocabulary in place"""
+        max_features = self.vectorizer.max_features
+        data, indices, indptr = [], [], [0]
+        for example in examples:
+            term_counts: Dict[int, int] = {}
+            for token in self._analyzer(example):
+                term_index = vocabulary.get(token)
+                if term_index is None:
+                    if max_features is not None and len(vocabulary) >= max_features:
+                        continue
+                    term_index = vocabulary[token] = len(vocabulary)
+                term_counts[term_index] = term_counts.get(term_index, 0) + 1
+            for term_index in sorted(term_counts):
+                indices.append(term_index)
+                data.append(term_counts[term_index])
+            indptr.append(len(indices))
+
+        return csr_matrix(
+            (
+                np.asarray(data, dtype=np.int64),
+                np.asarray(indices, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int32),
+            ),
+            shape=(len(examples), len(vocabulary)),
+        )
+
+    def _build_training_update(
+        self,
+        category: CommandCategory,
+        examples: List[str],
+        patterns: List[str],
+    ) -> Dict[str, Any]:
+        """Build updated tables from the live ones without touching them"""
+        command_patterns = {
+            existing: list(pattern_groups)
+            for existing, pattern_groups in self.command_patterns.items()
+        }
+        command_patterns.setdefault(category, []).append(
+            {"patterns": patterns, "examples": examples, "parameters": []}
+        )
+        compiled_patterns = dict(self.compiled_patterns)
+        compiled = self._compile_category_patterns(command_patterns[category])
+        if compiled is not None:
+            compiled_patterns[category] = compiled
+
+        update = {
+            "command_patterns": command_patterns,
+            "compiled_patterns": compiled_patterns,
+        }
+        if not examples:
+            return update
+
+        # Delta IDF: only new examples are tokenized; document frequencies and
+        # IDF are recomputed from the stored counts, then rows are re-weighted
+        vocabulary = dict(self.vectorizer.vocabulary_)
+        old_counts = self._get_example_counts()
+        new_counts = self._count_new_examples(examples, vocabulary)
+        old_counts = csr_matrix(
+            (old_counts.data, old_counts.indices, old_counts.indptr),
+            shape=(old_counts.shape[0], len(vocabulary)),
+        )
+
+        # New rows join the end of their category's contiguous block
+        category_order = list(self.example_category_order)
+        if category not in category_order:
+            category_order.append(category)
+        row_bounds = list(self.example_category_offsets) + [old_counts.shape[0]]
+        blocks, category_offsets, row_count = [], [], 0
+        for index, block_category in enumerate(category_order):
+            category_offsets.append(row_count)
+            if index < len(self.example_category_order):
+                block = old_counts[row_bounds[index] : row_bounds[index + 1]]
+                blocks.append(block)
+                row_count += block.shape[0]
+            if block_category == category:
+                blocks.append(new_counts)
+                row_count += new_counts.shape[0]
+        counts = vstack(blocks, format="csr")
+
+        params = self.vectorizer.get_params()
+        transformer = TfidfTransformer(
+            norm=params["norm"],
+            use_idf=params["use_idf"],
+            smooth_idf=params["smooth_idf"],
+            sublinear_tf=params["sublinear_tf"],
+        ).fit(counts)
+        vectorizer = clone(self.vectorizer)
+        vectorizer.vocabulary_ = vocabulary
+        vectorizer.idf_ = transformer.idf_
+
+        update.update(
+            vectorizer=vectorizer,
+            example_matrix=transformer.transform(counts).tocsr(),
+            example_counts=counts,
+            category_order=category_order,
+            category_offsets=category_offsets,
+        )
+        return update
+
+    async def add_training_data(
+        self,
+        category: CommandCategory,
+        examples: Sequence[str] = (),
+        patterns: Sequence[str] = (),
+    ) -> Dict[str, Any]:
+        """Append labelled examples and patterns to the live classifier
+
+        Updated tables are built in a thread from copies and swapped in with
+        plain assignments, so classifications in flight keep running against
+        either the old or the new tables without waiting for a refit.
+        """
+        if category == CommandCategory.UNKNOWN:
+            raise ValueError("Cannot add training data for the unknown category")
+        examples = [example.strip() for example in examples if example.strip()]
+        patterns = list(patterns)
+        if not examples and not patterns:
+            raise ValueError("No examples or patterns to add")
+        for pattern in patterns:
+            # Patterns join the hot-path matchers, so backtracking-prone ones are refused
+            check_pattern_safety(pattern)
+        if self.example_matrix is None:
+            raise RuntimeError("Classifier must be initialized before adding data")
+
+        async with self._training_lock:
+            loop = asyncio.get_running_loop()
+            if self.base_tables_version is None:
+                self.base_tables_version = self.tables_version
+            lock_file = None
+            if self.shared_tables_dir:
+                # Serialize with other workers and build on their latest update
+                lock_file = await loop.run_in_executor(
+                    None, acquire_tables_lock, self.shared_tables_dir
+                )
+            try:
+                if lock_file is not None:
+                    self.refresh_shared_tables()
+
+                update = await loop.run_in_executor(
+                    None, self._build_training_update, category, examples, patterns
+                )
+
+                # Swap: no awaits between these assignments
+                self.command_patterns = update["command_patterns"]
+                self.compiled_patterns = update["compiled_patterns"]
+                if "example_matrix" in update:
+                    self._install_scoring_tables(
+                        update["vectorizer"],
+                        update["example_matrix"],
+                        update["category_order"],
+                        update["category_offsets"],
+                    )
+                self.artifact_version = None
+                self.tables_version = compute_tables_version(
+                    self.command_patterns,
+                    self.vectorizer,
+                    self.example_matrix,
+                    self.example_category_order,
+                    self.example_category_offsets,
+                )
+                if "example_counts" in update:
+                    self._example_counts = (
+                        self.tables_version,
+                        update["example_counts"],
+                    )
+
+                if self.shared_tables_dir:
+                    self._share_trained_tables()
+                    if self.artifact_version == self.tables_version:
+                        # Other workers load these tables on their next check
+                        publish_tables_pointer(
+                            self.shared_tables_dir,
+                            self.base_tables_version,
+                            self.tables_version,
+                        )
+                self._tables_changed()
+            finally:
+                if lock_file is not None:
+                    release_tables_lock(lock_file)
+
+        logger.info(
+            f"Added {len(examples)} examples and {len(patterns)} patterns to "
+            f"{category.value} (tables {self.tables_version})"
+        )
+        return {
+            "category": category.value,
+            "examples_added": len(examples),
+            "patterns_added": len(patterns),
+            "total_examples": self.example_matrix.shape[0],
+            "vocabulary_size": len(self.vectorizer.vocabulary_),
+            "tables_version": self.tables_version,
         }
-        for contraction, expansion in contractions.items():
-            text = text.replace(contraction, expansion)
 
-        # Remove extra whitespace
-        text = re.sub(r"\s+", " ", text).strip()
+    def preprocess_text(self, text: str) -> str:
+        """Preprocess and normalize input text"""
+        start_time = time.time()
+
+        text = self.text_normalizer.normalize(text)
 
         preprocessing_time = time.time() - start_time
         logger.debug(f"Text preprocessing took {preprocessing_time:.4f}s")
 
         return text
 
+    def _initialize_parameter_extractors(self) -> ParameterExtractorRegistry:
+        """Build the per-category parameter extractor registry"""
+        return ParameterExtractorRegistry(
+            {
+                CommandCategory.EMAIL_MANAGEMENT: EmailParameterExtractor(),
+                CommandCategory.DOCUMENT_GENERATION: DocumentParameterExtractor(),
+                CommandCategory.CALENDAR_SCHEDULING: CalendarParameterExtractor(),
+                CommandCategory.WEB_SEARCH: WebSearchParameterExtractor(),
+                CommandCategory.CALCULATIONS: CalculationParameterExtractor(),
+            }
+        )
+
+    def register_parameter_extractor(
+        self, category: CommandCategory, extractor: ParameterExtractor
+    ):
+        """Add or replace the parameter extractor for a category"""
+        if self.executor is not None:
+            raise RuntimeError(
+                "Register parameter extractors before starting the executor"
+            )
+        self.parameter_extractors.register(category, extractor)
+
+        # Cached and precomputed results carry the previous extractor's
+        # parameters; shared cache keys move with results_version
+        self.classification_cache.clear()
+        if self.is_initialized:
+            self.rebuild_fast_path()
+
     def extract_parameters(
         self, text: str, category: CommandCategory
     ) -> Dict[str, Any]:
         """Extract parameters from text based on command category"""
-        parameters = {}
-
-        if category == CommandCategory.EMAIL_MANAGEMENT:
-            # Extract email addresses
-            email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-            emails = re.findall(email_pattern, text)
-            if emails:
-                parameters["recipient"] = emails[0]
-
-            # Extract subject hints
-            subject_patterns = [
-                r"about\s+(.+?)(?:\s+to|\s+for|$)",
-                r"regarding\s+(.+?)(?:\s+to|\s+for|$)",
-                r"subject\s+(.+?)(?:\s+to|\s+for|$)",
-            ]
-            for pattern in subject_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    parameters["subject"] = match.group(1).strip()
-                    break
-
-        elif category == CommandCategory.DOCUMENT_GENERATION:
-            # Extract document format
-            format_pattern = r"\b(pdf|doc|docx|txt|markdown)\b"
-            format_match = re.search(format_pattern, text, re.IGNORECASE)
-            if format_match:
-                parameters["format"] = format_match.group(1).lower()
-
-            # Extract topic
-            topic_patterns = [
-                r"about\s+(.+?)(?:\s+in|\s+for|$)",
-                r"on\s+(.+?)(?:\s+in|\s+for|$)",
-                r"document\s+(.+?)(?:\s+in|\s+for|$)",
-            ]
-            for pattern in topic_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    parameters["content_topic"] = match.group(1).strip()
-                    break
-
-        elif category == CommandCategory.CALENDAR_SCHEDULING:
-            # Extract date/time information
-            time_patterns = [
-                r"\b(tomorrow|today|next\s+week|next\s+month)\b",
-                r"\b(\d{1,2}:\d{2})\s*(am|pm)?\b",
-                r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
-                r"\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}\b",
-            ]
-            for pattern in time_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    parameters["date_time"] = matches
-                    break
-
-            # Extract attendees
-            with_pattern = r"with\s+(.+?)(?:\s+at|\s+on|\s+for|$)"
-            with_match = re.search(with_pattern, text, re.IGNORECASE)
-            if with_match:
-                parameters["attendees"] = with_match.group(1).strip()
-
-        elif category == CommandCategory.WEB_SEARCH:
-            # Extract search query
-            search_patterns = [
-                r"search\s+for\s+(.+?)$",
-                r"find\s+(.+?)$",
-                r"look\s+up\s+(.+?)$",
-                r"what\s+is\s+(.+?)$",
-                r"tell\s+me\s+about\s+(.+?)$",
-            ]
-            for pattern in search_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    parameters["query"] = match.group(1).strip()
-                    break
-
-        elif category == CommandCategory.CALCULATIONS:
-            # Extract mathematical expressions
-            math_pattern = r"[\d\+\-\*\/\(\)\.\s]+"
-            math_matches = re.findall(math_pattern, text)
-            if math_matches:
-                parameters["expression"] = " ".join(math_matches).strip()
-
-        return parameters
+        return self.parameter_extractors.extract(text, category)
 
     def calculate_similarity_confidence(
         self, text: str, category: CommandCategory
     ) -> float:
         """Calculate confidence score using similarity matching"""
-        if category not in self.command_patterns:
-            return 0.0
+        return self.calculate_similarity_confidences(text).get(category, 0.0)
 
-        # Get examples for this category
-        examples = []
-        for pattern_group in self.command_patterns[category]:
-            examples.extend(pattern_group["examples"])
+    def calculate_similarity_confidences(
+        self, text: str
+    ) -> Dict[CommandCategory, float]:
+        """Calculate max example similarity for every category in one product"""
+        if self.example_matrix is None:
+            return {}
 
-        if not examples:
-            return 0.0
+        try:
+            input_vector = self.vectorizer.transform([text])
+            max_similarities = self._max_similarity_by_category(input_vector)[0]
+            return dict(zip(self.example_category_order, max_similarities.tolist()))
+        except Exception as e:
+            logger.warning(f"Similarity calculation failed: {e}")
+            return {}
+
+    def calculate_similarity_confidences_many(
+        self, texts: List[str]
+    ) -> List[Dict[CommandCategory, float]]:
+        """Similarity scores for a batch with one transform and one matrix product"""
+        if self.example_matrix is None or not texts:
+            return [{} for _ in texts]
 
         try:
-            # Calculate TF-IDF similarity
-            all_texts = examples + [text]
-            tfidf_matrix = self.vectorizer.transform(all_texts)
+            input_vectors = self.vectorizer.transform(texts)
+            max_similarities = self._max_similarity_by_category(input_vectors)
+            return [
+                dict(zip(self.example_category_order, row))
+                for row in max_similarities.tolist()
+            ]
+        except Exception as e:
+            logger.warning(f"Batch similarity calculation failed: {e}")
+            return [{} for _ in texts]
+
+    def _max_similarity_by_category(self, input_vectors) -> np.ndarray:
+        """Max cosine similarity per category for each row of input_vectors"""
+        return self.similarity_backend.max_similarity_by_category(input_vectors)
+
+    def _vocabulary_term_counts(self, text: str) -> Dict[int, int]:
+        """Count in-vocabulary terms of text using the vectorizer's analyzer"""
+        vocabulary = self.vectorizer.vocabulary_
+        term_counts: Dict[int, int] = {}
+        for token in self._analyzer(text):
+            term_index = vocabulary.get(token)
+            if term_index is not None:
+                term_counts[term_index] = term_counts.get(term_index, 0) + 1
+        return term_counts
+
+    def _tfidf_vector(self, term_counts: Dict[int, int]) -> np.ndarray:
+        """Dense L2-normalised TF-IDF vector, equivalent to vectorizer.transform"""
+        vector = np.zeros(len(self.vectorizer.vocabulary_))
+        term_indices = np.fromiter(term_counts.keys(), dtype=np.intp)
+        vector[term_indices] = (
+            np.fromiter(term_counts.values(), dtype=np.float64)
+            * self.vectorizer.idf_[term_indices]
+        )
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
 
-            # Calculate cosine similarity between input and examples
-            similarities = cosine_similarity(tfidf_matrix[-1:], tfidf_matrix[:-1])
-            max_similarity = np.max(similarities)
+    def _category_similarity(
+        self, category_index: int, input_vector: np.ndarray
+    ) -> float:
+        """Max cosine similarity between input_vector and one category's examples"""
+        return self.similarity_backend.category_similarity(category_index, input_vector)
+
+    def calculate_pruned_similarity_confidences(
+        self, text: str, pattern_scores: Dict[CommandCategory, float]
+    ) -> Tuple[Dict[CommandCategory, float], Dict[CommandCategory, float]]:
+        """Similarity scores only for categories that can still win.
+
+        Returns (similarity_scores, pruned_upper_bounds). A category sharing no
+        vocabulary term with the text has similarity exactly 0; otherwise its
+        combined score is bounded by 0.6 * pattern + 0.4. Categories are scored
+        in descending bound order and skipped once their bound falls below the
+        best combined score seen so far.
+        """
+        if self.example_matrix is None:
+            return {}, {}
 
-            return float(max_similarity)
+        try:
+            term_counts = self._vocabulary_term_counts(text)
+            return self._pruned_similarities(
+                term_counts,
+                pattern_scores,
+                lambda: self._tfidf_vector(term_counts),
+            )
         except Exception as e:
-            logger.warning(f"Similarity calculation failed: {e}")
-            return 0.0
+            logger.warning(f"Pruned similarity calculation failed: {e}")
+            return self.calculate_similarity_confidences(text), {}
+
+    def _pruned_similarities(
+        self,
+        term_counts: Mapping[int, int],
+        pattern_scores: Dict[CommandCategory, float],
+        input_vector_factory: Callable[[], np.ndarray],
+    ) -> Tuple[Dict[CommandCategory, float], Dict[CommandCategory, float]]:
+        """Pruned similarity scoring over precounted vocabulary terms
+
+        input_vector_factory builds the normalised TF-IDF vector for
+        term_counts and is only called if some category has to be scored.
+        """
+        if not term_counts:
+            return {}, {}
+
+        term_indices = np.fromiter(term_counts.keys(), dtype=np.intp)
+        overlapping = self.category_term_presence[:, term_indices].any(axis=1)
+
+        # Pattern hits alone guarantee this combined score
+        best_lower_bound = max(
+            (score * 0.6 for score in pattern_scores.values()), default=0.0
+        )
+        candidates = sorted(
+            (
+                (pattern_scores.get(category, 0.0) * 0.6 + 0.4, index)
+                for index, category in enumerate(self.example_category_order)
+                if overlapping[index]
+            ),
+            key=lambda candidate: (-candidate[0], candidate[1]),
+        )
+
+        input_vector = None
+        similarity_scores = {}
+        pruned_upper_bounds = {}
+        for upper_bound, index in candidates:
+            category = self.example_category_order[index]
+            if upper_bound < best_lower_bound:
+                pruned_upper_bounds[category] = upper_bound
+                continue
+
+            if input_vector is None:
+                input_vector = input_vector_factory()
+            similarity = self._category_similarity(index, input_vector)
+            similarity_scores[category] = similarity
+            best_lower_bound = max(
+                best_lower_bound,
+                pattern_scores.get(category, 0.0) * 0.6 + similarity * 0.4,
+            )
+
+        return similarity_scores, pruned_upper_bounds
+
+    def _resolve_pruned_score(
+        self, core: "CoreClassification", category: CommandCategory
+    ) -> float:
+        """Exact combined score of a category, even one whose scoring was pruned
+
+        core is left unchanged: it is shared through the caches and the fast
+        path index, so its pruned lower bounds stay as scored.
+        """
+        score = core.category_scores[category]
+        if category in core.pruned_upper_bounds:
+            index = self.example_category_order.index(category)
+            input_vector = self._tfidf_vector(
+                self._vocabulary_term_counts(core.normalized_text)
+            )
+            score += self._category_similarity(index, input_vector) * 0.4
+        return score
 
     def calculate_pattern_confidence(
         self, text: str, category: CommandCategory
     ) -> float:
         """Calculate confidence score using regex pattern matching"""
-        if category not in self.command_patterns:
+        matcher = self.compiled_patterns.get(category)
+        if matcher is None:
             return 0.0
 
-        max_confidence = 0.0
-        for pattern_group in self.command_patterns[category]:
-            for pattern in pattern_group["patterns"]:
-                try:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        # Pattern matches get higher confidence
-                        max_confidence = max(max_confidence, 0.8)
-                except re.error:
-                    logger.warning(f"Invalid regex pattern: {pattern}")
-                    continue
-
-        return max_confidence
+        # Pattern matches get higher confidence
+        return 0.8 if matcher.search(text) else 0.0
 
-    async def classify_command(
-        self,
-        text: str,
-        user_id: str = "default",
-        session_id: str = "default",
-        use_context: bool = True,
-    ) -> ClassificationResult:
-        """Classify voice command with confidence scoring"""
-        start_time = time.time()
+    def calculate_pattern_confidences(self, text: str) -> Dict[CommandCategory, float]:
+        """Calculate pattern confidence for every category in one pass"""
+        return {
+            category: 0.8 if matcher.search(text) else 0.0
+            for category, matcher in self.compiled_patterns.items()
+        }
 
-        # Check cache first
-        cache_key = f"{hashlib.md5(text.encode()).hexdigest()}_{user_id}_{session_id}"
-        if cache_key in self.classification_cache:
-            cached_result = self.classification_cache[cache_key]
-            if time.time() - cached_result.classification_time < self.cache_ttl:
-                self.cache_hits += 1
-                logger.debug(f"Cache hit for classification: {text[:50]}...")
-                return cached_result
+    def classify_core(self, normalized_text: str) -> "CoreClassification":
+        """Score normalized text without user context, pruning hopeless categories"""
+        classification_start = time.time()
+        pattern_scores = self.calculate_pattern_confidences(normalized_text)
+        similarity_scores, pruned_upper_bounds = (
+            self.calculate_pruned_similarity_confidences(
+                normalized_text, pattern_scores
+            )
+        )
+        return self._build_core(
+            normalized_text,
+            pattern_scores,
+            similarity_scores,
+            pruned_upper_bounds,
+            classification_start,
+        )
 
-        # Preprocess text
-        preprocessing_start = time.time()
-        normalized_text = self.preprocess_text(text)
-        preprocessing_time = time.time() - preprocessing_start
+    def _build_core(
+        self,
+        normalized_text: str,
+        pattern_scores: Dict[CommandCategory, float],
+        similarity_scores: Dict[CommandCategory, float],
+        pruned_upper_bounds: Dict[CommandCategory, float],
+        classification_start: float,
+    ) -> "CoreClassification":
+        """Combine pruned scores into a core result timed from classification_start"""
+        core = self._combine_scores(normalized_text, pattern_scores, similarity_scores)
+        core.pruned_upper_bounds = dict(pruned_upper_bounds)
+        core.categories_pruned = len(pruned_upper_bounds)
+        core.classification_time = time.time() - classification_start
+        return core
+
+    def classify_core_many(
+        self, normalized_texts: List[str]
+    ) -> List["CoreClassification"]:
+        """Score a batch of normalized texts with vectorized similarity scoring"""
+        classification_start = time.time()
+        similarity_scores = self.calculate_similarity_confidences_many(normalized_texts)
+        cores = [
+            self._combine_scores(
+                normalized_text,
+                self.calculate_pattern_confidences(normalized_text),
+                text_similarity_scores,
+            )
+            for normalized_text, text_similarity_scores in zip(
+                normalized_texts, similarity_scores
+            )
+        ]
 
-        # Get or create conversation context
-        context_key = f"{user_id}_{session_id}"
-        context = self.context_cache.get(context_key)
-        if not context:
-            context = ConversationContext(user_id=user_id, session_id=session_id)
-            self.context_cache[context_key] = context
+        # Amortize the shared batch cost across its results
+        per_text_time = (time.time() - classification_start) / max(len(cores), 1)
+        for core in cores:
+            core.classification_time = per_text_time
+        return cores
 
-        # Classification logic
-        classification_start = time.time()
+    def _combine_scores(
+        self,
+        normalized_text: str,
+        pattern_scores: Dict[CommandCategory, float],
+        similarity_scores: Dict[CommandCategory, float],
+    ) -> "CoreClassification":
+        """Combine pattern and similarity scores into a core classification"""
         best_category = CommandCategory.UNKNOWN
         best_confidence = 0.0
-        best_parameters = {}
+        category_scores = {}
 
         # Try each category
         for category in CommandCategory:
             if category == CommandCategory.UNKNOWN:
                 continue
 
-            # Calculate pattern-based confidence
-            pattern_confidence = self.calculate_pattern_confidence(
-                normalized_text, category
-            )
-
-            # Calculate similarity-based confidence
-            similarity_confidence = self.calculate_similarity_confidence(
-                normalized_text, category
-            )
+            pattern_confidence = pattern_scores.get(category, 0.0)
+            similarity_confidence = similarity_scores.get(category, 0.0)
 
             # Combine confidences (weighted average)
             combined_confidence = (pattern_confidence * 0.6) + (
                 similarity_confidence * 0.4
             )
-
-            # Context boost
-            if use_context and context.last_command_category == category:
-                combined_confidence += 0.1  # Boost for context continuity
+            category_scores[category] = combined_confidence
 
             # Update best match
             if combined_confidence > best_confidence:
                 best_confidence = combined_confidence
                 best_category = category
-                best_parameters = self.extract_parameters(normalized_text, category)
 
-        classification_time = time.time() - classification_start
-        total_time = time.time() - start_time
+        # Parameters are only extracted for the winning category
+        extraction_start = time.time()
+        best_parameters = (
+            self.extract_parameters(normalized_text, best_category)
+            if best_category != CommandCategory.UNKNOWN
+            else {}
+        )
+        extraction_time = time.time() - extraction_start
+
+        return CoreClassification(
+            normalized_text=normalized_text,
+            category_scores=category_scores,
+            best_category=best_category,
+            best_confidence=best_confidence,
+            parameters=best_parameters,
+            extraction_time=extraction_time,
+        )
+
+    def start_executor(self, workers: Optional[int] = None):
+        """Start the process pool that scores cache misses off the event loop"""
+        workers = workers or self.executor_workers
+        if self.executor is not None or workers <= 0:
+            return
+
+        mp_context = (
+            multiprocessing.get_context(self.executor_start_method)
+            if self.executor_start_method
+            else None
+        )
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_initialize_worker,
+            initargs=(
+                self.command_patterns,
+                self.parameter_extractors.extractors,
+                self.artifact_path if self.artifact_version else None,
+                (self.similarity_backend.name, self.similarity_backend.get_params()),
+                None if self.artifact_version else self._scoring_tables(),
+            ),
+        )
+        self.executor_workers = workers
+
+        # Spawn every worker now so training does not land on the first requests
+        for _ in range(workers):
+            self.executor.submit(_worker_ready)
+
+        logger.info(f"Started classification executor with {workers} workers")
+
+    def shutdown_executor(self, wait: bool = True):
+        """Stop the classification process pool, falling back to inline scoring"""
+        if self.executor is None:
+            return
+
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+        self.executor = None
+        logger.info("Classification executor shut down")
+
+    def _scoring_tables(self) -> Optional[Tuple[Any, ...]]:
+        """Tables pool workers install as-is, including online training updates"""
+        if self.example_matrix is None:
+            return None
+        return (
+            self.vectorizer,
+            self.example_matrix,
+            self.example_category_order,
+            list(self.example_category_offsets),
+        )
+
+    def _restart_executor(self):
+        """Replace pool workers so they pick up updated tables"""
+        previous = self.executor
+        self.executor = None
+        self.start_executor(self.executor_workers)
+        # Work already queued on the old workers still completes
+        previous.shutdown(wait=False)
+
+    async def _run_in_executor(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    @property
+    def results_version(self) -> str:
+        """Shared cache key version: the tables plus the registered extractors"""
+        return f"{self.tables_version}-{self.parameter_extractors.version}"
+
+    def attach_shared_cache(self, shared_cache: Optional[SharedResultCache]):
+        """Share context-free results with other workers through Redis"""
+        self.shared_cache = shared_cache
+
+    def _record_core(self, core: "CoreClassification"):
+        """Count a freshly scored core result in the metrics"""
+        self.scored_classifications += 1
+        self.categories_pruned_total += core.categories_pruned
+        self.latency_histograms["scoring"].record(
+            core.classification_time - core.extraction_time
+        )
+        if core.best_category != CommandCategory.UNKNOWN:
+            self.latency_histograms["extraction"].record(core.extraction_time)
+            self.parameter_extractors.record(core.best_category, core.extraction_time)
+
+    async def _score_core(self, normalized_text: str) -> "CoreClassification":
+        """Score one cache miss inline or in the process pool"""
+        core = None
+        if self.executor is not None:
+            try:
+                core = await self._run_in_executor(
+                    _worker_classify_core, normalized_text
+                )
+            except BrokenProcessPool as e:
+                logger.error(f"Classification executor failed, scoring inline: {e}")
+                self.shutdown_executor(wait=False)
+
+        if core is None:
+            core = self.classify_core(normalized_text)
+
+        self._record_core(core)
+        return core
+
+    async def _score_cores_many(
+        self, normalized_texts: List[str]
+    ) -> List["CoreClassification"]:
+        """Score cache misses in one batch, split across pool workers if enabled"""
+        cores = None
+        if self.executor is not None and len(normalized_texts) > 1:
+            chunk_size = math.ceil(len(normalized_texts) / self.executor_workers)
+            chunks = [
+                normalized_texts[start : start + chunk_size]
+                for start in range(0, len(normalized_texts), chunk_size)
+            ]
+            try:
+                chunk_cores = await asyncio.gather(
+                    *(
+                        self._run_in_executor(_worker_classify_core_many, chunk)
+                        for chunk in chunks
+                    )
+                )
+                cores = [core for chunk in chunk_cores for core in chunk]
+            except BrokenProcessPool as e:
+                logger.error(f"Classification executor failed, scoring inline: {e}")
+                self.shutdown_executor(wait=False)
+
+        if cores is None:
+            cores = self.classify_core_many(normalized_texts)
+
+        for core in cores:
+            self._record_core(core)
+        return cores
+
+    def _get_precomputed_core(
+        self, normalized_text: str
+    ) -> Optional["CoreClassification"]:
+        """Fast path, then local cache, then fast path token signature"""
+        core = self.fast_path.get(self.tables_version, normalized_text)
+        if core is not None:
+            return core
+
+        core = self.classification_cache.get(normalized_text)
+        if core is not None:
+            return core
+
+        # Similarity ignores word order but patterns do not: a template is only
+        # reused when the same patterns match, otherwise the text is scored
+        def same_pattern_hits(template: "CoreClassification") -> bool:
+            return self.calculate_pattern_confidences(
+                template.normalized_text
+            ) == self.calculate_pattern_confidences(normalized_text)
+
+        template = self.fast_path.get_similar(
+            self.tables_version, normalized_text, same_pattern_hits
+        )
+        if template is None:
+            return None
+
+        # Same words and pattern hits as an indexed phrasing: reuse its scores,
+        # not its parameters
+        core = CoreClassification(
+            normalized_text=normalized_text,
+            category_scores=CategoryScores(template.category_scores),
+            best_category=template.best_category,
+            best_confidence=template.best_confidence,
+            parameters=(
+                self.extract_parameters(normalized_text, template.best_category)
+                if template.best_category != CommandCategory.UNKNOWN
+                else {}
+            ),
+        )
+        self.classification_cache.put(normalized_text, core)
+        return core
+
+    async def _get_core_classification(
+        self, normalized_text: str
+    ) -> "CoreClassification":
+        """Get the shared context-free classification, computing it on a miss"""
+        core = self._get_precomputed_core(normalized_text)
+        if core is None and self.shared_cache is not None:
+            payload = await self.shared_cache.get(self.results_version, normalized_text)
+            if payload is not None:
+                core = CoreClassification.from_payload(payload)
+                self.classification_cache.put(normalized_text, core)
+
+        if core is not None:
+            self.cache_hits += 1
+            logger.debug(f"Cache hit for classification: {normalized_text[:50]}...")
+            return core
+
+        core = await self._score_core(normalized_text)
+        self.classification_cache.put(normalized_text, core)
+        if self.shared_cache is not None:
+            await self.shared_cache.set(
+                self.results_version, normalized_text, core.to_payload()
+            )
+        return core
+
+    def _apply_context_boost(
+        self,
+        core: "CoreClassification",
+        context: Optional[ConversationContext],
+    ) -> Tuple[CommandCategory, float, Dict[str, Any]]:
+        """Overlay the per-session context boost on a shared core result"""
+        best_category = core.best_category
+        best_confidence = core.best_confidence
+        boosted_category = context.last_command_category if context else None
+
+        if boosted_category in core.category_scores:
+            # A pruned score is only a lower bound; resolve it if the boost could win
+            boosted_score = core.category_scores[boosted_category]
+            upper_bound = core.pruned_upper_bounds.get(boosted_category)
+            if upper_bound is not None and upper_bound + 0.1 >= best_confidence:
+                boosted_score = self._resolve_pruned_score(core, boosted_category)
+
+            # Boost for context continuity; ties keep the earlier category
+            boosted_confidence = boosted_score + 0.1
+            if boosted_category == best_category or (
+                boosted_confidence > best_confidence
+                or (
+                    boosted_confidence == best_confidence
+                    and CATEGORY_ORDER[boosted_category] < CATEGORY_ORDER[best_category]
+                )
+            ):
+                best_category = boosted_category
+                best_confidence = boosted_confidence
+
+        if best_category == core.best_category:
+            parameters = dict(core.parameters)
+        else:
+            extraction_start = time.time()
+            parameters = self.extract_parameters(core.normalized_text, best_category)
+            extraction_time = time.time() - extraction_start
+            self.latency_histograms["extraction"].record(extraction_time)
+            self.parameter_extractors.record(best_category, extraction_time)
+
+        return best_category, best_confidence, parameters
+
+    def _get_or_create_context(
+        self, user_id: str, session_id: str
+    ) -> ConversationContext:
+        """Get or create conversation context for user/session"""
+        context_key = f"{user_id}_{session_id}"
+        context = self.context_cache.get(context_key)
+        if not context:
+            # Make room by evicting the least recently active contexts
+            overflow = len(self.context_cache) - self.max_contexts + 1
+            if overflow > 0:
+                self.context_expiry.evict(self.context_cache, overflow)
+            context = ConversationContext(user_id=user_id, session_id=session_id)
+            self.context_cache[context_key] = context
+            self.context_expiry.track(context_key, context)
+        return context
+
+    def _finalize_classification(
+        self,
+        text: str,
+        core: "CoreClassification",
+        context: ConversationContext,
+        use_context: bool,
+        preprocessing_time: float,
+        scoring_time: float,
+    ) -> ClassificationResult:
+        """Apply the context overlay, build the result and update context"""
+        overlay_start = time.time()
+        best_category, best_confidence, best_parameters = self._apply_context_boost(
+            core, context if use_context else None
+        )
+        classification_time = scoring_time + (time.time() - overlay_start)
 
         # Create result
         result = ClassificationResult(
@@ -617,25 +1960,25 @@ class VoiceClassifier:
             context_used=use_context,
             preprocessing_time=preprocessing_time,
             classification_time=classification_time,
+            categories_pruned=core.categories_pruned,
             raw_text=text,
-            normalized_text=normalized_text,
+            normalized_text=core.normalized_text,
         )
 
         # Add suggestions for low confidence
         if result.confidence < 0.5:
-            result.suggestions = self._generate_suggestions(normalized_text)
+            result.suggestions = self._generate_suggestions(core.normalized_text)
 
         # Update context
         context.last_command_category = best_category
-        context.active_parameters.update(best_parameters)
-        context.context_timestamp = datetime.now()
-
-        # Cache result
-        self.classification_cache[cache_key] = result
+        context.update_parameters(best_parameters)
+        context.last_activity = time.time()
 
         # Update metrics
+        total_time = preprocessing_time + classification_time
         self.total_classifications += 1
-        self.classification_times.append(total_time)
+        self.latency_histograms["preprocessing"].record(preprocessing_time)
+        self.latency_histograms["total"].record(total_time)
 
         logger.info(
             f"Classified '{text[:50]}...' as {best_category.value} "
@@ -644,6 +1987,117 @@ class VoiceClassifier:
 
         return result
 
+    async def classify_command(
+        self,
+        text: str,
+        user_id: str = "default",
+        session_id: str = "default",
+        use_context: bool = True,
+    ) -> ClassificationResult:
+        """Classify voice command with confidence scoring"""
+        # Preprocess text
+        preprocessing_start = time.time()
+        normalized_text = self.preprocess_text(text)
+        preprocessing_time = time.time() - preprocessing_start
+
+        # Get or create conversation context
+        context = self._get_or_create_context(user_id, session_id)
+
+        # Classification logic: shared core result plus per-session overlay
+        scoring_start = time.time()
+        core = await self._get_core_classification(normalized_text)
+        scoring_time = time.time() - scoring_start
+
+        return self._finalize_classification(
+            text, core, context, use_context, preprocessing_time, scoring_time
+        )
+
+    def start_stream(
+        self,
+        user_id: str = "default",
+        session_id: str = "default",
+        use_context: bool = True,
+    ) -> "StreamingClassificationSession":
+        """Open an incremental classification session for a live transcript"""
+        from .streaming_session import StreamingClassificationSession
+
+        self.streams_started += 1
+        return StreamingClassificationSession(self, user_id, session_id, use_context)
+
+    async def classify_many(
+        self,
+        texts: List[str],
+        user_id: str = "default",
+        session_id: str = "default",
+        use_context: bool = True,
+    ) -> List[ClassificationResult]:
+        """Classify a batch of commands, returning results in input order"""
+        preprocessing_times = []
+        normalized_texts = []
+        for text in texts:
+            preprocessing_start = time.time()
+            normalized_texts.append(self.preprocess_text(text))
+            preprocessing_times.append(time.time() - preprocessing_start)
+
+        # Resolve cached cores, then score all distinct misses in one batch
+        scoring_start = time.time()
+        cores: Dict[str, CoreClassification] = {}
+        misses = []
+        for normalized_text in normalized_texts:
+            if normalized_text in cores:
+                self.cache_hits += 1
+                continue
+
+            core = self._get_precomputed_core(normalized_text)
+            if core is not None:
+                self.cache_hits += 1
+                cores[normalized_text] = core
+            else:
+                cores[normalized_text] = None
+                misses.append(normalized_text)
+
+        if misses and self.shared_cache is not None:
+            payloads = await self.shared_cache.get_many(self.results_version, misses)
+            remaining = []
+            for normalized_text, payload in zip(misses, payloads):
+                if payload is None:
+                    remaining.append(normalized_text)
+                    continue
+                self.cache_hits += 1
+                core = CoreClassification.from_payload(payload)
+                self.classification_cache.put(normalized_text, core)
+                cores[normalized_text] = core
+            misses = remaining
+
+        scored_cores = await self._score_cores_many(misses)
+        for core in scored_cores:
+            self.classification_cache.put(core.normalized_text, core)
+            cores[core.normalized_text] = core
+
+        if scored_cores and self.shared_cache is not None:
+            await self.shared_cache.set_many(
+                self.results_version,
+                [(core.normalized_text, core.to_payload()) for core in scored_cores],
+            )
+
+        scoring_time = (time.time() - scoring_start) / max(len(texts), 1)
+
+        # Context overlay is applied in order, exactly as sequential calls would
+        context = self._get_or_create_context(user_id, session_id)
+        return [
+            self._finalize_classification(
+                text,
+                cores[normalized_text],
+                context,
+                use_context,
+                preprocessing_time,
+                scoring_time,
+            )
+            for text, normalized_text, preprocessing_time in zip(
+                texts, normalized_texts, preprocessing_times
+            )
+        ]
+
     def _generate_suggestions(self, text: str) -> List[str]:
         """Generate command suggestions for unclear input"""
         suggestions = []
@@ -706,9 +2160,6 @@ class VoiceClassifier:
 
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get classifier performance metrics"""
-        avg_time = (
-            np.mean(self.classification_times) if self.classification_times else 0
-        )
         cache_hit_rate = (
             (self.cache_hits / self.total_classifications)
             if self.total_classifications > 0
@@ -719,23 +2170,149 @@ class VoiceClassifier:
             "total_classifications": self.total_classifications,
             "cache_hits": self.cache_hits,
             "cache_hit_rate": cache_hit_rate,
-            "average_classification_time": avg_time,
+            "average_classification_time": self.latency_histograms["total"].mean,
+            "latency": {
+                stage: histogram.snapshot()
+                for stage, histogram in self.latency_histograms.items()
+            },
+            "categories_pruned_total": self.categories_pruned_total,
+            "average_categories_pruned": (
+                self.categories_pruned_total / self.scored_classifications
+                if self.scored_classifications > 0
+                else 0
+            ),
+            "executor_workers": self.executor_workers if self.executor else 0,
+            "parameter_extractors": self.parameter_extractors.get_stats(),
+            "artifact_version": self.artifact_version,
+            "tables_version": self.tables_version,
+            "similarity_backend": self.similarity_backend.get_stats(),
+            "shared_cache": (
+                self.shared_cache.get_stats() if self.shared_cache is not None else None
+            ),
+            "nlp_loaded": self.nlp is not None,
+            "nlp_components": list(self.nlp_components),
             "active_contexts": len(self.context_cache),
+            "context_expiry": {
+                **self.context_expiry.get_stats(),
+                "max_contexts": self.max_contexts,
+                "timeout_minutes": self.context_timeout_minutes,
+                "reaper_running": self._context_reaper is not None,
+            },
             "cached_results": len(self.classification_cache),
+            "classification_cache": self.classification_cache.get_stats(),
+            "fast_path": {
+                **self.fast_path.get_stats(),
+                "hit_rate": (
+                    (self.fast_path.exact_hits + self.fast_path.signature_hits)
+                    / self.total_classifications
+                    if self.total_classifications > 0
+                    else 0
+                ),
+            },
+            "streaming": {
+                "sessions_started": self.streams_started,
+                "updates": self.stream_updates,
+                "rescores": self.stream_rescores,
+                "rescore_rate": (
+                    self.stream_rescores / self.stream_updates
+                    if self.stream_updates > 0
+                    else 0
+                ),
+                "finalized": self.streams_finalized,
+            },
+            "normalizer": self.text_normalizer.get_stats(),
         }
 
-    def cleanup_expired_contexts(self, timeout_minutes: int = 30):
-        """Clean up expired conversation contexts"""
-        expired_keys = []
-        for key, context in self.context_cache.items():
-            if context.is_context_expired(timeout_minutes):
-                expired_keys.append(key)
+    def cleanup_expired_contexts(
+        self, timeout_minutes: Optional[int] = None, limit: Optional[int] = None
+    ) -> int:
+        """Clean up expired conversation contexts, oldest first"""
+        if timeout_minutes is None:
+            timeout_minutes = self.context_timeout_minutes
+        cutoff = (datetime.now() - timedelta(minutes=timeout_minutes)).timestamp()
+        removed = self.context_expiry.expire(self.context_cache, cutoff, limit)
+
+        if removed:
+            logger.info(f"Cleaned up {removed} expired contexts")
+        return removed
+
+    async def _reap_expired_contexts(self, interval_seconds: float, batch_size: int):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                # Expire in batches so a large backlog never stalls the loop
+                while self.cleanup_expired_contexts(limit=batch_size) == batch_size:
+                    await asyncio.sleep(0)
+            except Exception as e:
+                logger.error(f"Context reaper error: {e}")
+
+    def start_context_reaper(
+        self, interval_seconds: float = 60.0, batch_size: int = 1000
+    ):
+        """Expire idle contexts periodically in a background task"""
+        if self._context_reaper is not None:
+            return
+        self._context_reaper = asyncio.get_running_loop().create_task(
+            self._reap_expired_contexts(interval_seconds, batch_size)
+        )
+        logger.info(f"Context reaper started (every {interval_seconds}s)")
+
+    async def stop_context_reaper(self):
+        """Cancel the background context reaper"""
+        if self._context_reaper is None:
+            return
+        reaper, self._context_reaper = self._context_reaper, None
+        reaper.cancel()
+        try:
+            await reaper
+        except asyncio.CancelledError:
+            pass
+
+
+# Worker-local classifier, built once per pool process by _initialize_worker
+_worker_classifier: Optional[VoiceClassifier] = None
+
+
+def _initialize_worker(
+    command_patterns: Dict[CommandCategory, List[Dict[str, Any]]],
+    parameter_extractors: Dict[CommandCategory, ParameterExtractor],
+    artifact_path: Optional[str] = None,
+    similarity_backend: Tuple[str, Dict[str, Any]] = ("brute", {}),
+    scoring_tables: Optional[Tuple[Any, ...]] = None,
+):
+    """Build the classifier a pool process scores with"""
+    global _worker_classifier
+    backend_name, backend_params = similarity_backend
+    classifier = VoiceClassifier(
+        cache_max_entries=1,
+        similarity_backend=create_similarity_backend(backend_name, **backend_params),
+    )
+    classifier.parameter_extractors = ParameterExtractorRegistry(parameter_extractors)
+    if artifact_path:
+        # Memory-mapped tables are shared with the parent through the page cache
+        classifier.load_artifact(artifact_path, verify=False)
+    else:
+        classifier.command_patterns = command_patterns
+        classifier.compiled_patterns = classifier._compile_command_patterns()
+        if scoring_tables is not None:
+            # The parent's tables; refitting would drop its incremental updates
+            classifier._install_scoring_tables(*scoring_tables)
+        else:
+            classifier._fit_examples()
+    classifier.is_initialized = True
+    _worker_classifier = classifier
+
+
+def _worker_ready() -> bool:
+    return _worker_classifier is not None
+
+
+def _worker_classify_core(normalized_text: str) -> CoreClassification:
+    return _worker_classifier.classify_core(normalized_text)
 
-        for key in expired_keys:
-            del self.context_cache[key]
 
-        if expired_keys:
-            logger.info(f"Cleaned up {len(expired_keys)} expired contexts")
+def _worker_classify_core_many(normalized_texts: List[str]) -> List[CoreClassification]:
+    return _worker_classifier.classify_core_many(normalized_texts)
 
 
 # Global classifier instance
@@ -19,7 +19,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, Body
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from typing import Annotated, Dict, List, Optional, Any
 import logging
 import time
 from datetime import datetime
@@ -30,6 +30,7 @@ from ..ai.voice_classifier import (
     CommandCategory,
 )
 from ..ai.context_manager import context_manager
+from ..auth.jwt_auth import get_current_user
 from .models import (
     VoiceProcessingRequest,
     VoiceProcessingResponse,
@@ -84,6 +85,54 @@ class VoiceClassificationResponse(BaseModel):
     normalized_text: str = Field(description="Normalized/preprocessed text")
 
 
+class VoiceBatchClassificationRequest(BaseModel):
+    """Request model for batch voice command classification"""
+
+    texts: List[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(
+        ..., min_length=1, max_length=1000, description="Voice command texts"
+    )
+    user_id: str = Field(default="default", description="User identifier")
+    session_id: str = Field(default="default", description="Session identifier")
+    use_context: bool = Field(default=True, description="Use conversation context")
+    include_suggestions: bool = Field(
+        default=True, description="Include suggestions for unclear commands"
+    )
+
+
+class VoiceBatchClassificationResponse(BaseModel):
+    """Response model for batch voice command classification"""
+
+    results: List[VoiceClassificationResponse] = Field(
+        description="Classification results in request order"
+    )
+    total_classified: int = Field(description="Number of classified commands")
+    processing_time: float = Field(description="Total batch time in seconds")
+
+
+class VoiceTrainingUpdateRequest(BaseModel):
+    """Request model for adding training data to the live classifier"""
+
+    category: str = Field(..., description="Command category to extend")
+    examples: List[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(
+        default_factory=list, max_length=1000, description="Labelled example texts"
+    )
+    patterns: List[Annotated[str, Field(min_length=1, max_length=500)]] = Field(
+        default_factory=list, max_length=100, description="Regex patterns"
+    )
+
+
+class VoiceTrainingUpdateResponse(BaseModel):
+    """Response model for a classifier training update"""
+
+    category: str
+    examples_added: int
+    patterns_added: int
+    total_examples: int
+    vocabulary_size: int
+    tables_version: str
+    timestamp: str
+
+
 class ContextSummaryResponse(BaseModel):
     """Response model for context summary"""
 
@@ -108,6 +157,26 @@ class ContextSuggestionsResponse(BaseModel):
     context_available: bool
 
 
+def _to_classification_response(
+    result: ClassificationResult, include_suggestions: bool
+) -> VoiceClassificationResponse:
+    """Convert a classifier result into its API response model"""
+    return VoiceClassificationResponse(
+        category=result.category.value,
+        intent=result.intent,
+        confidence=result.confidence,
+        confidence_level=result.confidence_level.value,
+        parameters=result.parameters,
+        context_used=result.context_used,
+        preprocessing_time=result.preprocessing_time,
+        classification_time=result.classification_time,
+        suggestions=result.suggestions if include_suggestions else [],
+        requires_confirmation=result.requires_confirmation,
+        raw_text=result.raw_text,
+        normalized_text=result.normalized_text,
+    )
+
+
 # Voice Classification Routes
 @voice_router.post("/classify", response_model=VoiceClassificationResponse)
 async def classify_voice_command(request: VoiceClassificationRequest):
@@ -118,7 +187,7 @@ async def classify_voice_command(request: VoiceClassificationRequest):
         start_time = time.time()
 
         # Ensure classifier is initialized
-        if not voice_classifier.nlp:
+        if not voice_classifier.is_initialized:
             await voice_classifier.initialize()
 
         # Perform classification
@@ -130,20 +199,7 @@ async def classify_voice_command(request: VoiceClassificationRequest):
         )
 
         # Prepare response
-        response = VoiceClassificationResponse(
-            category=result.category.value,
-            intent=result.intent,
-            confidence=result.confidence,
-            confidence_level=result.confidence_level.value,
-            parameters=result.parameters,
-            context_used=result.context_used,
-            preprocessing_time=result.preprocessing_time,
-            classification_time=result.classification_time,
-            suggestions=result.suggestions if request.include_suggestions else [],
-            requires_confirmation=result.requires_confirmation,
-            raw_text=result.raw_text,
-            normalized_text=result.normalized_text,
-        )
+        response = _to_classification_response(result, request.include_suggestions)
 
         total_time = time.time() - start_time
         logger.info(f"Voice classification completed in {total_time:.3f}s")
@@ -155,6 +211,45 @@ async def classify_voice_command(request: VoiceClassificationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@voice_router.post("/classify/batch", response_model=VoiceBatchClassificationResponse)
+async def classify_voice_commands_batch(request: VoiceBatchClassificationRequest):
+    """
+    Classify a batch of voice command texts, returning results in request order
+    """
+    try:
+        start_time = time.time()
+
+        # Ensure classifier is initialized
+        if not voice_classifier.is_initialized:
+            await voice_classifier.initialize()
+
+        results = await voice_classifier.classify_many(
+            texts=request.texts,
+            user_id=request.user_id,
+            session_id=request.session_id,
+            use_context=request.use_context,
+        )
+
+        total_time = time.time() - start_time
+        logger.info(
+            f"Batch voice classification of {len(results)} commands "
+            f"completed in {total_time:.3f}s"
+        )
+
+        return VoiceBatchClassificationResponse(
+            results=[
+                _to_classification_response(result, request.include_suggestions)
+                for result in results
+            ],
+            total_classified=len(results),
+            processing_time=total_time,
+        )
+
+    except Exception as e:
+        logger.error(f"Batch voice classification error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @voice_router.get("/categories", response_model=List[str])
 async def get_voice_categories():
     """
@@ -221,6 +316,45 @@ async def cleanup_voice_classifier(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@voice_router.post("/admin/training", response_model=VoiceTrainingUpdateResponse)
+async def add_voice_training_data(
+    request: VoiceTrainingUpdateRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Append labelled examples and patterns to the live classifier
+
+    Requires a bearer token: updates reach every worker sharing the tables.
+    """
+    try:
+        category_enum = CommandCategory(request.category)
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid category: {request.category}"
+        )
+
+    try:
+        # Ensure classifier is initialized
+        if not voice_classifier.is_initialized:
+            await voice_classifier.initialize()
+
+        update = await voice_classifier.add_training_data(
+            category_enum, examples=request.examples, patterns=request.patterns
+        )
+        logger.info(
+            f"Training data for {category_enum.value} added by {current_user['sub']}"
+        )
+        return VoiceTrainingUpdateResponse(
+            **update, timestamp=datetime.now().isoformat()
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Training update error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # Context Management Routes
 @context_router.get(
     "/{user_id}/{session_id}/summary", response_model=ContextSummaryResponse
@@ -447,7 +581,7 @@ async def process_voice_with_classification(request: VoiceProcessingRequest):
         transcription_confidence = 0.95  # Simulated
 
         # Step 2: Classify the transcribed text
-        if not voice_classifier.nlp:
+        if not voice_classifier.is_initialized:
             await voice_classifier.initialize()
 
         classification = await voice_classifier.classify_command(
@@ -506,7 +640,7 @@ async def process_ai_request_with_classification(request: AIProviderRequest):
         start_time = time.time()
 
         # Classify the prompt first
-        if not voice_classifier.nlp:
+        if not voice_classifier.is_initialized:
             await voice_classifier.initialize()
 
         classification = await voice_classifier.classify_command(
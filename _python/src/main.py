@@ -38,6 +38,9 @@ from .api.routes import (
     context_router,
 )
 from .api.websocket_manager import WebSocketManager
+from .ai.shared_result_cache import SharedResultCache
+from .ai.similarity_backends import create_similarity_backend
+from .ai.streaming_session import TranscriptStreams
 from .ai.voice_classifier import voice_classifier
 from .ai.context_manager import context_manager
 from .api.models import (
@@ -71,6 +74,11 @@ class JarvisLiveAPI:
             version="1.0.0",
             lifespan=self.lifespan,
         )
+        # Open transcript streams per WebSocket, and how long an idle one lives
+        self.transcript_max_streams = int(os.getenv("TRANSCRIPT_MAX_STREAMS", "8"))
+        self.transcript_stream_idle_seconds = float(
+            os.getenv("TRANSCRIPT_STREAM_IDLE_SECONDS", "60")
+        )
         self.setup_middleware()
         self.setup_routes()
 
@@ -135,6 +143,10 @@ class JarvisLiveAPI:
         async def websocket_endpoint(websocket: WebSocket, client_id: str):
             """WebSocket endpoint for real-time voice processing"""
             await websocket_manager.connect(websocket, client_id)
+            # Live transcripts being classified on this connection, by stream id
+            transcript_streams = TranscriptStreams(
+                self.transcript_max_streams, self.transcript_stream_idle_seconds
+            )
             try:
                 while True:
                     # Receive audio data or commands from iOS client
@@ -162,6 +174,15 @@ class JarvisLiveAPI:
                             response, client_id
                         )
 
+                    elif data.get("type") == "transcript":
+                        # Classify partial transcripts while the user is speaking
+                        response = await self.process_transcript_message(
+                            data, client_id, transcript_streams
+                        )
+                        await websocket_manager.send_personal_message(
+                            response, client_id
+                        )
+
             except WebSocketDisconnect:
                 websocket_manager.disconnect(client_id)
                 logger.info(f"Client {client_id} disconnected")
@@ -245,11 +266,46 @@ class JarvisLiveAPI:
             await redis_client.ping()
             logger.info("Redis connection established")
 
-            # Initialize voice classifier
+            # Initialize voice classifier, warm-starting from a prebuilt artifact
+            artifact_path = os.getenv("VOICE_CLASSIFIER_ARTIFACT")
+            if artifact_path:
+                voice_classifier.artifact_path = artifact_path
+            # Workers publish trained tables here once and all mmap the same copy
+            voice_classifier.shared_tables_dir = os.getenv(
+                "VOICE_CLASSIFIER_SHARED_DIR"
+            )
+            voice_classifier.max_contexts = int(
+                os.getenv("VOICE_CLASSIFIER_MAX_CONTEXTS", "100000")
+            )
+            # Exact search by default; "lsh" or "minhash" for large example sets
+            voice_classifier.similarity_backend = create_similarity_backend(
+                os.getenv("VOICE_CLASSIFIER_SIMILARITY_BACKEND", "brute")
+            )
             await voice_classifier.initialize()
+            voice_classifier.start_context_reaper()
+            # Training updates made on other workers arrive through the shared dir
+            voice_classifier.start_tables_watcher()
             logger.info("Voice classifier initialized")
 
-            # Initialize context manager
+            # Share classification results across workers through Redis. Off by
+            # default: scoring a miss is cheaper than a Redis round trip unless
+            # the example corpus is large
+            if os.getenv("VOICE_CLASSIFIER_SHARED_CACHE", "false").lower() == "true":
+                voice_classifier.attach_shared_cache(SharedResultCache(redis_client))
+
+            # Score classifications in a process pool when workers are configured
+            classifier_workers = int(os.getenv("VOICE_CLASSIFIER_WORKERS", "0"))
+            if classifier_workers > 0:
+                voice_classifier.start_executor(classifier_workers)
+
+            # Initialize context manager; updates within the window share one write
+            context_manager.write_coalesce_window = (
+                float(os.getenv("CONTEXT_WRITE_COALESCE_MS", "0")) / 1000
+            )
+            context_manager.configure_local_cache(
+                int(os.getenv("CONTEXT_LOCAL_CACHE_MAX_ENTRIES", "10000")),
+                int(os.getenv("CONTEXT_LOCAL_CACHE_MAX_BYTES", "0")) or None,
+            )
             await context_manager.initialize()
             logger.info("Context manager initialized")
 
@@ -275,6 +331,11 @@ class JarvisLiveAPI:
                 await mcp_bridge.shutdown()
                 logger.info("MCP bridge shut down")
 
+            await context_manager.shutdown()
+            await voice_classifier.stop_context_reaper()
+            await voice_classifier.stop_tables_watcher()
+            voice_classifier.shutdown_executor()
+
             if redis_client:
                 await redis_client.close()
                 logger.info("Redis connection closed")
@@ -336,6 +397,58 @@ class JarvisLiveAPI:
             logger.error(f"AI request processing error: {str(e)}")
             return {"type": "error", "message": f"AI request failed: {str(e)}"}
 
+    async def process_transcript_message(
+        self,
+        data: dict,
+        client_id: str,
+        streams: TranscriptStreams,
+    ) -> dict:
+        """Process a partial or final transcript from WebSocket"""
+        try:
+            stream_id = data.get("stream_id", "default")
+            text = data.get("text", "")
+            replace = data.get("replace", False)
+            final = data.get("final", False)
+
+            stream = streams.get(stream_id)
+            if stream is None:
+                stream = voice_classifier.start_stream(
+                    user_id=client_id,
+                    session_id=data.get("session_id", "default"),
+                    use_context=data.get("use_context", True),
+                )
+                streams.add(stream_id, stream)
+
+            if final:
+                streams.pop(stream_id)
+                result = await stream.finalize(
+                    text if replace else stream.raw_text + text
+                )
+            elif replace:
+                result = stream.revise(text)
+            else:
+                result = stream.append(text)
+
+            return {
+                "type": "intent_final" if final else "intent_provisional",
+                "stream_id": stream_id,
+                "category": result.category.value,
+                "intent": result.intent,
+                "confidence": result.confidence,
+                "parameters": result.parameters,
+                "requires_confirmation": result.requires_confirmation,
+                "processing_time": (
+                    result.preprocessing_time + result.classification_time
+                ),
+            }
+
+        except Exception as e:
+            logger.error(f"Transcript classification error: {str(e)}")
+            return {
+                "type": "error",
+                "message": f"Transcript classification failed: {str(e)}",
+            }
+
     async def process_mcp_command(self, data: dict, client_id: str) -> dict:
         """Process MCP command from WebSocket"""
         try:
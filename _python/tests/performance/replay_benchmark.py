@@ -0,0 +1,366 @@
+"""
+* Purpose: Deterministic replay benchmark of recorded voice transcripts
+* Issues & Complexity Summary: Replays a JSONL corpus through the classifier and context manager and compares to a baseline
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~330
+  - Core Algorithm Complexity: Low (paced replay, histogram percentiles, result digest)
+  - Dependencies: asyncio, resource, LatencyHistogram
+  - State Management Complexity: Medium (fresh classifier and context manager per replay)
+  - Novelty/Uncertainty Factor: Low (timing metrics compared with a tolerance)
+* AI Pre-Task Self-Assessment: 90%
+* Problem Estimate: 82%
+* Initial Code Complexity Estimate: 75%
+* Final Code Complexity: 77%
+* Overall Result Score: 89%
+* Key Variances/Learnings: A digest of every result separates behaviour changes from speed changes
+* Last Updated: 2026-10-16
+
+Usage:
+    python -m tests.performance.replay_benchmark tests/performance/data/replay_sample.jsonl \\
+        --baseline tests/performance/data/replay_baseline.json [--speed 60] [--write-baseline]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import resource
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from src.ai.context_manager import ContextManager
+from src.ai.latency_histogram import LatencyHistogram
+from src.ai.voice_classifier import VoiceClassifier
+
+DATA_DIR = Path(__file__).parent / "data"
+SAMPLE_CORPUS = DATA_DIR / "replay_sample.jsonl"
+SAMPLE_BASELINE = DATA_DIR / "replay_baseline.json"
+
+
+@dataclass
+class ReplayRecord:
+    """One recorded utterance"""
+
+    text: str
+    user_id: str
+    session_id: str
+    timestamp: float  # POSIX seconds
+
+
+@dataclass
+class ReplayReport:
+    """Replay metrics; latencies are in milliseconds"""
+
+    records: int
+    wall_time: float
+    throughput: float  # Records per second of processing time
+    latency_ms: Dict[str, float]
+    classifier_cache_hit_rate: float
+    context_cache_hit_rate: float
+    peak_rss_mb: float
+    categories: Dict[str, int] = field(default_factory=dict)
+    results_digest: str = ""
+    speed: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _parse_timestamp(value: Union[str, float, int]) -> float:
+    """POSIX seconds from a number or an ISO 8601 string"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def load_replay_corpus(path: Union[str, Path]) -> List[ReplayRecord]:
+    """Read (text, user_id, session_id, timestamp) JSONL records in time order"""
+    records = []
+    with open(path, "r") as corpus:
+        for line_number, line in enumerate(corpus, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                records.append(
+                    ReplayRecord(
+                        text=entry["text"],
+                        user_id=entry.get("user_id", "default"),
+                        session_id=entry.get("session_id", "default"),
+                        timestamp=_parse_timestamp(entry.get("timestamp", 0)),
+                    )
+                )
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"{path}:{line_number}: invalid record: {e}") from e
+
+    # Stable, so records sharing a timestamp keep their recorded order
+    records.sort(key=lambda record: record.timestamp)
+    return records
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def replay(
+    records: List[ReplayRecord],
+    classifier: VoiceClassifier,
+    context_manager: ContextManager,
+    speed: Optional[float] = None,
+) -> ReplayReport:
+    """Replay records through classifier and context manager
+
+    speed=None replays back to back; otherwise recorded gaps are divided by
+    speed (1.0 is real time). Waiting time is excluded from latency and
+    throughput.
+    """
+    latency = LatencyHistogram()
+    categories: Counter = Counter()
+    digest = hashlib.sha256()
+    cache_hits_before = classifier.cache_hits
+    classifications_before = classifier.total_classifications
+
+    wall_start = time.perf_counter()
+    busy_time = 0.0
+    first_timestamp = records[0].timestamp if records else 0.0
+    for record in records:
+        if speed:
+            due = wall_start + (record.timestamp - first_timestamp) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        start = time.perf_counter()
+        result = await classifier.classify_command(
+            record.text, record.user_id, record.session_id
+        )
+        await context_manager.update_context_interaction(
+            record.user_id,
+            record.session_id,
+            record.text,
+            "",
+            result.category,
+            result.parameters,
+        )
+        elapsed = time.perf_counter() - start
+        busy_time += elapsed
+        latency.record(elapsed)
+
+        categories[result.category.value] += 1
+        digest.update(
+            json.dumps(
+                [
+                    result.category.value,
+                    round(result.confidence, 6),
+                    result.parameters,
+                ],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+
+    wall_time = time.perf_counter() - wall_start
+    classifications = classifier.total_classifications - classifications_before
+    context_metrics = context_manager.get_performance_metrics()
+    return ReplayReport(
+        records=len(records),
+        wall_time=wall_time,
+        throughput=len(records) / busy_time if busy_time > 0 else 0.0,
+        latency_ms={
+            key: value * 1000 if key != "count" else value
+            for key, value in latency.snapshot().items()
+        },
+        classifier_cache_hit_rate=(
+            (classifier.cache_hits - cache_hits_before) / classifications
+            if classifications > 0
+            else 0.0
+        ),
+        context_cache_hit_rate=context_metrics["cache_hit_rate"],
+        peak_rss_mb=peak_rss_mb(),
+        categories=dict(sorted(categories.items())),
+        results_digest=digest.hexdigest(),
+        speed=speed,
+    )
+
+
+async def run_replay(
+    corpus_path: Union[str, Path] = SAMPLE_CORPUS,
+    speed: Optional[float] = None,
+    redis_url: Optional[str] = None,
+    repeats: int = 1,
+) -> ReplayReport:
+    """Replay a corpus through a fresh classifier and context manager per repeat
+
+    With several repeats, timings are the median across runs and every run
+    must produce the same results digest.
+    """
+    records = load_replay_corpus(corpus_path)
+    reports = []
+    for _ in range(repeats):
+        classifier = VoiceClassifier()
+        await classifier.initialize()
+        context_manager = ContextManager(redis_url or "redis://localhost:6379")
+        if redis_url:
+            await context_manager.initialize()
+        reports.append(await replay(records, classifier, context_manager, speed))
+    return median_report(reports)
+
+
+def median_report(reports: List[ReplayReport]) -> ReplayReport:
+    """Combine repeated replays of one corpus into a median report"""
+    digests = {report.results_digest for report in reports}
+    if len(digests) > 1:
+        raise RuntimeError(f"Replay is not deterministic: {len(digests)} digests")
+
+    first = reports[0]
+    return ReplayReport(
+        records=first.records,
+        wall_time=statistics.median(report.wall_time for report in reports),
+        throughput=statistics.median(report.throughput for report in reports),
+        latency_ms={
+            key: statistics.median(report.latency_ms[key] for report in reports)
+            for key in first.latency_ms
+        },
+        classifier_cache_hit_rate=first.classifier_cache_hit_rate,
+        context_cache_hit_rate=first.context_cache_hit_rate,
+        peak_rss_mb=max(report.peak_rss_mb for report in reports),
+        categories=first.categories,
+        results_digest=first.results_digest,
+        speed=first.speed,
+    )
+
+
+def compare_to_baseline(
+    report: ReplayReport, baseline: Dict[str, Any], tolerance: float = 0.25
+) -> List[str]:
+    """Regressions of report against a baseline report dict
+
+    The results digest and cache hit rates must match; timing and memory may
+    be up to tolerance worse before they count as a regression. Timings are
+    only compared when the report was replayed at the baseline's speed.
+    """
+    regressions = []
+    if report.records != baseline["records"]:
+        regressions.append(
+            f"corpus size changed: {baseline['records']} -> {report.records} records"
+        )
+    elif report.results_digest != baseline["results_digest"]:
+        changed = {
+            category: (baseline["categories"].get(category, 0), count)
+            for category, count in report.categories.items()
+            if baseline["categories"].get(category, 0) != count
+        }
+        regressions.append(
+            f"classification results changed (category counts {changed})"
+        )
+
+    for metric in ("classifier_cache_hit_rate", "context_cache_hit_rate"):
+        if getattr(report, metric) < baseline[metric] - 0.01:
+            regressions.append(
+                f"{metric} dropped: {baseline[metric]:.3f} -> "
+                f"{getattr(report, metric):.3f}"
+            )
+
+    # Paced and unpaced runs see different cache and CPU warmth
+    if report.speed != baseline.get("speed"):
+        return regressions
+
+    if report.throughput < baseline["throughput"] * (1 - tolerance):
+        regressions.append(
+            f"throughput dropped: {baseline['throughput']:.0f} -> "
+            f"{report.throughput:.0f} records/s"
+        )
+    for percentile in ("p50", "p90", "p99"):
+        before = baseline["latency_ms"][percentile]
+        after = report.latency_ms[percentile]
+        if after > before * (1 + tolerance):
+            regressions.append(
+                f"{percentile} latency rose: {before:.3f} -> {after:.3f} ms"
+            )
+    if report.peak_rss_mb > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(
+            f"peak RSS rose: {baseline['peak_rss_mb']:.0f} -> "
+            f"{report.peak_rss_mb:.0f} MB"
+        )
+    return regressions
+
+
+def format_report(report: ReplayReport) -> str:
+    latency = report.latency_ms
+    return "\n".join(
+        [
+            f"Records:            {report.records}",
+            f"Wall time:          {report.wall_time:.2f}s"
+            + (f" (speed x{report.speed:g})" if report.speed else ""),
+            f"Throughput:         {report.throughput:.0f} records/s",
+            f"Latency (ms):       p50 {latency['p50']:.3f}  p90 {latency['p90']:.3f}  "
+            f"p99 {latency['p99']:.3f}  max {latency['max']:.3f}",
+            f"Classifier cache:   {report.classifier_cache_hit_rate:.1%} hit rate",
+            f"Context cache:      {report.context_cache_hit_rate:.1%} hit rate",
+            f"Peak RSS:           {report.peak_rss_mb:.0f} MB",
+            f"Results digest:     {report.results_digest[:16]}",
+        ]
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded transcripts through the voice classifier"
+    )
+    parser.add_argument("corpus", nargs="?", default=str(SAMPLE_CORPUS))
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=None,
+        help="Pacing relative to recorded time (1 = real time); default is unpaced",
+    )
+    parser.add_argument("--baseline", help="Baseline report JSON to compare against")
+    parser.add_argument(
+        "--write-baseline",
+        action="store_true",
+        help="Write this run's report to --baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=5, help="Replays to take the median of"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--redis-url", help="Persist contexts to Redis during replay")
+    parser.add_argument("--json", dest="json_path", help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run_replay(args.corpus, args.speed, args.redis_url, args.repeats)
+    )
+    print(format_report(report))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report.to_dict(), indent=2) + "\n")
+
+    if not args.baseline:
+        return 0
+    if args.write_baseline:
+        Path(args.baseline).write_text(json.dumps(report.to_dict(), indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    if report.speed != baseline.get("speed"):
+        print("Pacing differs from the baseline; timings were not compared")
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if not regressions:
+        print("No regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+* Purpose: Size and speed benchmark of context persistence against pickle
+* Issues & Complexity Summary: Encoded bytes, encode/decode time and Redis bytes written per voice turn
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~190
+  - Core Algorithm Complexity: Low (repeated encode/decode timing)
+  - Dependencies: pytest, pickle, zlib
+  - State Management Complexity: Low (contexts built per test)
+  - Novelty/Uncertainty Factor: Low (sizes are deterministic, timings are indicative)
+* AI Pre-Task Self-Assessment: 92%
+* Problem Estimate: 75%
+* Initial Code Complexity Estimate: 65%
+* Final Code Complexity: 66%
+* Overall Result Score: 90%
+* Key Variances/Learnings: Compression matters most for full histories, the string table for short ones
+* Last Updated: 2026-10-16
+"""
+
+import pickle
+import time
+import zlib
+from typing import Callable, Dict
+
+import pytest
+
+from src.ai.context_codec import ContextCodec
+from src.ai.context_manager import ContextManager
+from src.ai.voice_classifier import CommandCategory, ConversationContext
+
+ROUNDS = 2000
+
+INTERACTIONS = [
+    (
+        "send an email to {name} about the quarterly report",
+        "I'll draft an email to {name}@example.com about the quarterly report",
+        CommandCategory.EMAIL_MANAGEMENT,
+        {"recipient": "{name}@example.com", "subject": "quarterly report"},
+    ),
+    (
+        "schedule a meeting with {name} tomorrow at 3pm",
+        "Scheduling a meeting with {name} tomorrow at 3pm",
+        CommandCategory.CALENDAR_SCHEDULING,
+        {"attendees": "{name}", "date_time": ["tomorrow", "3pm"]},
+    ),
+    (
+        "create a pdf document about {name}'s project plan",
+        "Creating a PDF document about the project plan",
+        CommandCategory.DOCUMENT_GENERATION,
+        {"format": "pdf", "content_topic": "project plan"},
+    ),
+    (
+        "what's the weather like today",
+        "It's sunny with a high of 24 degrees",
+        CommandCategory.GENERAL_CONVERSATION,
+        {},
+    ),
+]
+NAMES = ["alice", "bob", "carol", "dave", "erin", "frank", "grace"]
+
+
+def build_context(turns: int) -> ConversationContext:
+    """Context after the given number of turns of a mixed conversation"""
+    context = ConversationContext(user_id="user-4821", session_id="session-9f3a2c")
+    context.preferences = {"voice": "en-AU", "speech_rate": 1.1}
+    for turn in range(turns):
+        user_input, bot_response, category, parameters = INTERACTIONS[
+            turn % len(INTERACTIONS)
+        ]
+        name = NAMES[turn % len(NAMES)]
+        context.update_parameters(
+            {
+                key: (
+                    value.format(name=name) if isinstance(value, str) else list(value)
+                )
+                for key, value in parameters.items()
+            }
+        )
+        context.add_interaction(
+            f"{user_input.format(name=name)} {turn}",
+            bot_response.format(name=name),
+            category,
+        )
+        context.last_command_category = category
+    context.current_topic = "project plan"
+    return context
+
+
+class DiscardingRedis:
+    """Redis stand-in that records pipelined command names and stores nothing"""
+
+    def __init__(self):
+        self.pipelines = []
+
+    async def get(self, key):
+        return None
+
+    def pipeline(self, transaction=True):
+        return DiscardingPipeline(self)
+
+
+class DiscardingPipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.queued.append(name)
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.redis_client.pipelines.append(tuple(self.queued))
+        return [
+            (
+                {}
+                if name == "hgetall"
+                else [] if name == "lrange" else None if name == "get" else True
+            )
+            for name in self.queued
+        ]
+
+
+def time_per_call(function: Callable[[], object]) -> float:
+    """Microseconds per call over ROUNDS calls"""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        function()
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def measure(context: ConversationContext) -> Dict[str, Dict[str, float]]:
+    """Bytes and encode/decode microseconds per format"""
+    codec = ContextCodec()
+    uncompressed = ContextCodec(compression=None)
+    formats = {
+        "pickle": (pickle.dumps, pickle.loads),
+        "pickle+zlib": (
+            lambda value: zlib.compress(pickle.dumps(value)),
+            lambda data: pickle.loads(zlib.decompress(data)),
+        ),
+        "codec": (codec.encode, codec.decode),
+        "codec-raw": (uncompressed.encode, uncompressed.decode),
+    }
+    results = {}
+    for name, (encode, decode) in formats.items():
+        data = encode(context)
+        assert decode(data) == context
+        results[name] = {
+            "bytes": len(data),
+            "encode_us": time_per_call(lambda: encode(context)),
+            "decode_us": time_per_call(lambda: decode(data)),
+        }
+    return results
+
+
+@pytest.mark.performance
+class TestContextCodecBenchmark:
+    """Encoded size and speed of the context codec against pickle"""
+
+    @pytest.mark.parametrize("turns", [1, 5, 20, 40])
+    def test_bytes_and_speed_vs_pickle(self, turns):
+        """Test the codec writes fewer bytes than pickle at every history length"""
+        results = measure(build_context(turns))
+        print(f"\n{turns} turns:")
+        for name, result in results.items():
+            print(
+                f"  {name:12} {result['bytes']:6d} bytes, "
+                f"encode {result['encode_us']:6.1f}us, "
+                f"decode {result['decode_us']:6.1f}us"
+            )
+
+        assert results["codec-raw"]["bytes"] < results["pickle"]["bytes"]
+        assert results["codec"]["bytes"] <= results["codec-raw"]["bytes"]
+        if turns >= 5:
+            assert results["codec"]["bytes"] < results["pickle"]["bytes"] / 2
+            assert results["codec"]["bytes"] < results["pickle+zlib"]["bytes"]
+
+
+@pytest.mark.performance
+class TestContextWriteAmplification:
+    """Redis bytes written per voice turn: appends against whole-context rewrites"""
+
+    @pytest.mark.asyncio
+    async def test_append_vs_rewrite(self):
+        """Test appending a turn writes far fewer bytes than rewriting the context"""
+        manager = ContextManager()
+        manager.redis_client = DiscardingRedis()
+        codec = ContextCodec()
+        await manager.get_context("user-4821", "session-9f3a2c")
+        start = manager.redis_bytes_written
+        rewrite_bytes = pickle_bytes = 0
+        turns = 40
+
+        for turn in range(turns):
+            user_input, bot_response, category, parameters = INTERACTIONS[
+                turn % len(INTERACTIONS)
+            ]
+            name = NAMES[turn % len(NAMES)]
+            await manager.update_context_interaction(
+                "user-4821",
+                "session-9f3a2c",
+                f"{user_input.format(name=name)} {turn}",
+                bot_response.format(name=name),
+                category,
+                {
+                    key: value.format(name=name) if isinstance(value, str) else value
+                    for key, value in parameters.items()
+                },
+            )
+            context = manager.local_cache.peek("user-4821_session-9f3a2c")
+            rewrite_bytes += len(codec.encode(context))
+            pickle_bytes += len(pickle.dumps(context))
+
+        appended = manager.redis_bytes_written - start
+        print(
+            f"\nper turn: append {appended / turns:.0f} bytes, "
+            f"codec rewrite {rewrite_bytes / turns:.0f} bytes, "
+            f"pickle rewrite {pickle_bytes / turns:.0f} bytes "
+            f"({pickle_bytes / appended:.1f}x less than pickle)"
+        )
+
+        # One MULTI/EXEC per turn: push, trim, field update, TTLs
+        pipelines = manager.redis_client.pipelines[-turns:]
+        assert all(pipeline[:2] == ("rpush", "ltrim") for pipeline in pipelines)
+        assert pickle_bytes / appended >= 10
+        assert rewrite_bytes > appended
@@ -0,0 +1,172 @@
+"""
+* Purpose: Memory benchmark for cached classification results and conversation contexts
+* Issues & Complexity Summary: Bytes per cache entry for the compact slotted types vs the dict-based originals
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~170
+  - Core Algorithm Complexity: Low (tracemalloc allocation deltas)
+  - Dependencies: pytest, tracemalloc
+  - State Management Complexity: Low (entries built and released per measurement)
+  - Novelty/Uncertainty Factor: Low (reference types mirror the previous layout)
+* AI Pre-Task Self-Assessment: 92%
+* Problem Estimate: 80%
+* Initial Code Complexity Estimate: 70%
+* Final Code Complexity: 72%
+* Overall Result Score: 90%
+* Key Variances/Learnings: Boxed floats, per-instance dicts and datetimes dominated entry size
+* Last Updated: 2026-10-16
+"""
+
+import gc
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+from src.ai.voice_classifier import (
+    MAX_CONVERSATION_HISTORY,
+    CommandCategory,
+    ConversationContext,
+    CoreClassification,
+)
+
+ENTRY_COUNT = 2000
+SCORED_CATEGORIES = [
+    category for category in CommandCategory if category != CommandCategory.UNKNOWN
+]
+
+
+@dataclass
+class DictCoreClassification:
+    """Previous CoreClassification layout: instance dict and a dict of scores"""
+
+    normalized_text: str
+    category_scores: Dict[CommandCategory, float]
+    best_category: CommandCategory
+    best_confidence: float
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    classification_time: float = 0.0
+    extraction_time: float = 0.0
+    pruned_upper_bounds: Dict[CommandCategory, float] = field(default_factory=dict)
+    categories_pruned: int = 0
+
+
+@dataclass
+class DictConversationContext:
+    """Previous ConversationContext layout: datetimes and a list of dicts"""
+
+    user_id: str
+    session_id: str
+    conversation_history: List[Dict[str, Any]] = field(default_factory=list)
+    current_topic: Optional[str] = None
+    last_command_category: Optional[CommandCategory] = None
+    active_parameters: Dict[str, Any] = field(default_factory=dict)
+    context_timestamp: datetime = field(default_factory=datetime.now)
+    preferences: Dict[str, Any] = field(default_factory=dict)
+
+
+def bytes_per_entry(build: Callable[[int], Any], count: int = ENTRY_COUNT) -> float:
+    """Average bytes allocated and still held per built entry"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        entries = [build(index) for index in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del entries
+    return (after - before) / count
+
+
+def core_fields(index: int) -> Dict[str, Any]:
+    return {
+        "normalized_text": f"send an email to user{index}@example.com about the budget",
+        "category_scores": {
+            category: (index % 97) / 100 + position / 1000
+            for position, category in enumerate(SCORED_CATEGORIES)
+        },
+        "best_category": CommandCategory.EMAIL_MANAGEMENT,
+        "best_confidence": 0.6 + (index % 37) / 100,
+        "parameters": {
+            "recipient": f"user{index}@example.com",
+            "subject": "the budget",
+        },
+        "classification_time": 1e-4 * (index % 13),
+    }
+
+
+def fill_context(context: Any, index: int) -> Any:
+    for turn in range(MAX_CONVERSATION_HISTORY):
+        context.active_parameters["query"] = f"topic {index}.{turn}"
+        context.add_interaction(
+            f"search for topic {index}.{turn}",
+            "Searching",
+            CommandCategory.WEB_SEARCH,
+        )
+    return context
+
+
+def build_dict_context(index: int) -> DictConversationContext:
+    context = DictConversationContext(f"user{index}", "session")
+    for turn in range(MAX_CONVERSATION_HISTORY):
+        context.active_parameters["query"] = f"topic {index}.{turn}"
+        context.conversation_history.append(
+            {
+                "timestamp": datetime.now(),
+                "user_input": f"search for topic {index}.{turn}",
+                "bot_response": "Searching",
+                "category": CommandCategory.WEB_SEARCH.value,
+                "parameters": dict(context.active_parameters),
+            }
+        )
+    return context
+
+
+@pytest.mark.performance
+class TestCacheEntryFootprint:
+    """Bytes per cached entry before and after the compact representations"""
+
+    def test_core_classification_footprint(self):
+        """Test compact core results are smaller than the dict-based layout"""
+        before = bytes_per_entry(
+            lambda index: DictCoreClassification(**core_fields(index))
+        )
+        after = bytes_per_entry(lambda index: CoreClassification(**core_fields(index)))
+
+        print(
+            f"\nCoreClassification bytes/entry: {before:.0f} -> {after:.0f} "
+            f"({before / after:.2f}x entries per GB)"
+        )
+        assert after < before * 0.8
+
+    def test_conversation_context_footprint(self):
+        """Test compact contexts with full history are smaller than before"""
+        before = bytes_per_entry(build_dict_context, count=500)
+        after = bytes_per_entry(
+            lambda index: fill_context(
+                ConversationContext(f"user{index}", "session"), index
+            ),
+            count=500,
+        )
+
+        print(
+            f"\nConversationContext bytes/entry: {before:.0f} -> {after:.0f} "
+            f"({before / after:.2f}x entries per GB)"
+        )
+        assert after < before * 0.8
+
+    def test_compact_types_keep_their_mapping_views(self):
+        """Test compact scores and interactions read like the dicts they replace"""
+        fields = core_fields(1)
+        core = CoreClassification(**fields)
+        assert dict(core.category_scores) == fields["category_scores"]
+        assert CommandCategory.UNKNOWN not in core.category_scores
+
+        context = fill_context(ConversationContext("user", "session"), 1)
+        interaction = context.conversation_history[-1]
+        assert len(context.conversation_history) == MAX_CONVERSATION_HISTORY
+        assert interaction["category"] == CommandCategory.WEB_SEARCH.value
+        assert interaction.get("parameters") == {"query": "topic 1.19"}
+        assert isinstance(interaction["timestamp"], datetime)
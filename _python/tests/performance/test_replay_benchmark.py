@@ -0,0 +1,99 @@
+"""
+* Purpose: Replay benchmark of the recorded sample corpus against its stored baseline
+* Issues & Complexity Summary: Deterministic results and cache behaviour on a realistic traffic shape
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~90
+  - Core Algorithm Complexity: Low (replay and baseline comparison)
+  - Dependencies: pytest, replay_benchmark
+  - State Management Complexity: Low (fresh classifier per replay)
+  - Novelty/Uncertainty Factor: Low (timings printed, not asserted)
+* AI Pre-Task Self-Assessment: 92%
+* Problem Estimate: 80%
+* Initial Code Complexity Estimate: 70%
+* Final Code Complexity: 72%
+* Overall Result Score: 90%
+* Key Variances/Learnings: Shared CI machines are too noisy for timing asserts; the CLI compares timings
+* Last Updated: 2026-10-16
+"""
+
+import json
+
+import pytest
+
+from replay_benchmark import (
+    SAMPLE_BASELINE,
+    SAMPLE_CORPUS,
+    compare_to_baseline,
+    format_report,
+    load_replay_corpus,
+    run_replay,
+)
+
+
+@pytest.mark.performance
+class TestReplayBenchmark:
+    """Replay recorded transcripts through the classifier and context manager"""
+
+    @pytest.mark.asyncio
+    async def test_sample_corpus_matches_baseline(self):
+        """Test replaying the sample corpus reproduces the baseline results"""
+        report = await run_replay(SAMPLE_CORPUS, repeats=2)
+        baseline = json.loads(SAMPLE_BASELINE.read_text())
+        print(f"\n{format_report(report)}")
+
+        # Timings are compared by the CLI on a quiet machine, not here
+        regressions = compare_to_baseline(report, baseline, tolerance=float("inf"))
+        assert regressions == []
+        assert report.records == len(load_replay_corpus(SAMPLE_CORPUS))
+        assert report.classifier_cache_hit_rate > 0.5
+
+    @pytest.mark.asyncio
+    async def test_paced_replay_keeps_results(self, tmp_path):
+        """Test pacing waits for recorded gaps without changing results"""
+        corpus = tmp_path / "corpus.jsonl"
+        corpus.write_text(
+            "\n".join(
+                json.dumps(
+                    {
+                        "text": text,
+                        "user_id": "user",
+                        "session_id": "session",
+                        "timestamp": timestamp,
+                    }
+                )
+                for text, timestamp in [
+                    ("search for python tutorials", "2026-10-01T09:00:01Z"),
+                    ("what is 15 plus 27", "2026-10-01T09:00:00Z"),
+                    ("send an email to john", "2026-10-01T09:00:02Z"),
+                ]
+            )
+        )
+
+        unpaced = await run_replay(corpus)
+        paced = await run_replay(corpus, speed=10)
+
+        assert paced.results_digest == unpaced.results_digest
+        assert paced.wall_time >= 0.2
+        assert paced.latency_ms["max"] < paced.wall_time * 1000
+        assert paced.categories == unpaced.categories
+
+    @pytest.mark.asyncio
+    async def test_regressions_reported(self):
+        """Test changed results and slower replays are flagged"""
+        report = await run_replay(SAMPLE_CORPUS)
+        baseline = report.to_dict()
+        baseline["results_digest"] = "0" * 64
+        baseline["categories"] = {**report.categories, "web_search": 0}
+        baseline["throughput"] = report.throughput * 2
+        baseline["latency_ms"] = {
+            key: value / 2 for key, value in report.latency_ms.items()
+        }
+
+        regressions = compare_to_baseline(report, baseline)
+        assert any("classification results changed" in item for item in regressions)
+        assert any("throughput dropped" in item for item in regressions)
+        assert any("p99 latency rose" in item for item in regressions)
+
+        # A paced run is only checked for results, not timings
+        baseline["speed"] = 60.0
+        assert len(compare_to_baseline(report, baseline)) == 1
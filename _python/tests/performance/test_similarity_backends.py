@@ -0,0 +1,147 @@
+"""
+* Purpose: Recall-vs-latency benchmark for the example similarity backends
+* Issues & Complexity Summary: Approximate backends measured against exact sparse cosine on a synthetic corpus
+* Key Complexity Drivers:
+  - Logic Scope (Est. LoC): ~130
+  - Core Algorithm Complexity: Low (per-query timing, agreement with brute force)
+  - Dependencies: pytest, numpy, scipy, scikit-learn
+  - State Management Complexity: Low (one corpus built per module)
+  - Novelty/Uncertainty Factor: Medium (recall depends on how clustered the corpus is)
+* AI Pre-Task Self-Assessment: 90%
+* Problem Estimate: 80%
+* Initial Code Complexity Estimate: 72%
+* Final Code Complexity: 74%
+* Overall Result Score: 89%
+* Key Variances/Learnings: Top-category agreement matters more than recall of every category maximum
+* Last Updated: 2026-10-16
+"""
+
+import time
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+
+from src.ai.similarity_backends import (
+    BruteForceSimilarityBackend,
+    create_similarity_backend,
+)
+
+CATEGORY_COUNT = 13
+EXAMPLES_PER_CATEGORY = 4000
+VOCABULARY_SIZE = 1000
+TOPIC_TERMS = 40
+QUERY_COUNT = 200
+
+
+def term_rows_to_matrix(rows: List[np.ndarray], rng: np.random.Generator):
+    """L2-normalised TF-IDF-like rows with random term weights"""
+    indptr = np.cumsum([0] + [len(row) for row in rows])
+    indices = np.concatenate(rows)
+    weights = rng.uniform(0.5, 3.0, len(indices))
+    return normalize(
+        csr_matrix((weights, indices, indptr), shape=(len(rows), VOCABULARY_SIZE))
+    )
+
+
+@pytest.fixture(scope="module")
+def corpus() -> Tuple[csr_matrix, List[csr_matrix], csr_matrix]:
+    """Short utterances drawn mostly from a per-category topic vocabulary,
+    and queries that perturb random examples by one term"""
+    rng = np.random.default_rng(1)
+    topics = [
+        rng.choice(VOCABULARY_SIZE, TOPIC_TERMS, replace=False)
+        for _ in range(CATEGORY_COUNT)
+    ]
+    rows = []
+    for topic in topics:
+        for _ in range(EXAMPLES_PER_CATEGORY):
+            length = int(rng.integers(3, 9))
+            topical = int(round(length * 0.8))
+            rows.append(
+                np.unique(
+                    np.concatenate(
+                        [
+                            rng.choice(topic, topical),
+                            rng.choice(VOCABULARY_SIZE, length - topical),
+                        ]
+                    )
+                )
+            )
+    example_matrix = term_rows_to_matrix(rows, rng)
+    category_matrices = [
+        example_matrix[start : start + EXAMPLES_PER_CATEGORY]
+        for start in range(0, example_matrix.shape[0], EXAMPLES_PER_CATEGORY)
+    ]
+
+    queries = []
+    for _ in range(QUERY_COUNT):
+        terms = list(rows[rng.integers(len(rows))])
+        if len(terms) > 3:
+            terms.pop(int(rng.integers(len(terms))))
+        terms.append(int(rng.integers(VOCABULARY_SIZE)))
+        queries.append(np.unique(terms))
+    return example_matrix, category_matrices, term_rows_to_matrix(queries, rng)
+
+
+def measure(backend, corpus) -> Tuple[np.ndarray, float, float]:
+    """Per-category similarities, build seconds and microseconds per query"""
+    example_matrix, category_matrices, queries = corpus
+    start = time.perf_counter()
+    backend.build(example_matrix, category_matrices)
+    build_time = time.perf_counter() - start
+
+    vectors = queries.toarray()
+    start = time.perf_counter()
+    similarities = np.array(
+        [
+            [
+                backend.category_similarity(index, vector)
+                for index in range(CATEGORY_COUNT)
+            ]
+            for vector in vectors
+        ]
+    )
+    latency = (time.perf_counter() - start) / len(vectors) * 1e6
+    return similarities, build_time, latency
+
+
+@pytest.mark.performance
+class TestSimilarityBackendRecall:
+    """Recall and latency of each backend against exact brute force"""
+
+    @pytest.mark.parametrize("name", ["lsh", "minhash"])
+    def test_recall_vs_latency(self, corpus, name):
+        """Test approximate backends find the winning category's best example"""
+        exact, _, exact_latency = measure(BruteForceSimilarityBackend(), corpus)
+        backend = create_similarity_backend(name)
+        approximate, build_time, latency = measure(backend, corpus)
+
+        rows = np.arange(len(exact))
+        best = exact.argmax(axis=1)
+        recall = np.mean(np.isclose(approximate, exact))
+        top_recall = np.mean(np.isclose(approximate[rows, best], exact[rows, best]))
+        top_agreement = np.mean(approximate.argmax(axis=1) == best)
+        print(
+            f"\n{name}: {latency:.0f}us/query vs brute {exact_latency:.0f}us, "
+            f"build {build_time:.2f}s, recall {recall:.3f}, "
+            f"top-category recall {top_recall:.3f}, agreement {top_agreement:.3f}, "
+            f"{backend.get_stats()['average_candidates']:.0f} candidates"
+        )
+
+        # Exact reranking means approximate scores never exceed exact ones
+        assert np.all(approximate <= exact + 1e-9)
+        assert top_recall >= 0.9
+        assert top_agreement >= 0.95
+
+    def test_small_categories_stay_exact(self, corpus):
+        """Test categories below exact_below are searched in full"""
+        exact, _, _ = measure(BruteForceSimilarityBackend(), corpus)
+        for name in ("lsh", "minhash"):
+            backend = create_similarity_backend(
+                name, exact_below=EXAMPLES_PER_CATEGORY + 1
+            )
+            approximate, _, _ = measure(backend, corpus)
+            assert np.allclose(approximate, exact)
@@ -18,14 +18,31 @@
 
 import pytest
 import asyncio
+import pickle
+import numpy as np
 from unittest.mock import Mock, patch, AsyncMock
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, Any
 
+from src.ai.bounded_cache import BoundedLRUCache
+from src.ai.fast_path_index import token_signature
+from src.ai.context_codec import ContextCodec, ContextCodecError
+from src.ai.context_manager import ContextManager
+from src.ai.latency_histogram import LatencyHistogram
+from src.ai.parameter_extractors import ParameterExtractor
+from src.ai.pattern_safety import UnsafePatternError, check_pattern_safety
+from src.ai.shared_result_cache import SharedResultCache
+from src.ai.similarity_backends import CandidateSimilarityBackend
+from src.ai.streaming_session import TranscriptStreams
+from src.ai.text_normalizer import TextNormalizer, text_normalizer
 from src.ai.voice_classifier import (
     VoiceClassifier,
     CommandCategory,
     ClassificationResult,
     ConversationContext,
+    CoreClassification,
+    Interaction,
     IntentConfidence,
 )
 
@@ -95,16 +112,72 @@ def sample_commands():
     }
 
 
+def add_context(
+    classifier: VoiceClassifier,
+    user_id: str,
+    session_id: str,
+    last_activity: datetime,
+) -> ConversationContext:
+    """Register a context last active at a given time"""
+    context = ConversationContext(
+        user_id=user_id,
+        session_id=session_id,
+        last_activity=last_activity.timestamp(),
+    )
+    key = f"{user_id}_{session_id}"
+    classifier.context_cache[key] = context
+    classifier.context_expiry.track(key, context)
+    return context
+
+
 class TestVoiceClassifier:
     """Test cases for VoiceClassifier class"""
 
     def test_voice_classifier_initialization(self, voice_classifier):
         """Test voice classifier initialization"""
         assert voice_classifier.nlp is None
+        assert voice_classifier.is_initialized is False
         assert voice_classifier.command_patterns is not None
         assert len(voice_classifier.command_patterns) > 0
         assert voice_classifier.context_cache == {}
-        assert voice_classifier.classification_cache == {}
+        assert len(voice_classifier.classification_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_initialize_does_not_load_spacy_by_default(self):
+        """Test spaCy stays unloaded unless components are requested"""
+        classifier = VoiceClassifier()
+        with patch("spacy.load") as mock_load:
+            await classifier.initialize()
+
+        mock_load.assert_not_called()
+        assert classifier.is_initialized is True
+        assert classifier.example_matrix is not None
+        metrics = classifier.get_performance_metrics()
+        assert metrics["nlp_loaded"] is False
+        assert metrics["nlp_components"] == []
+
+    @pytest.mark.asyncio
+    async def test_preloaded_nlp_components_prune_pipeline(self):
+        """Test only requested components (and their dependencies) are loaded"""
+        classifier = VoiceClassifier(nlp_components=["ner"])
+        with patch("spacy.load") as mock_load:
+            await classifier.initialize()
+            exclude = mock_load.call_args.kwargs["exclude"]
+
+            assert "ner" not in exclude and "tok2vec" not in exclude
+            assert "parser" in exclude and "lemmatizer" in exclude
+            assert classifier.nlp_components == ("ner", "tok2vec")
+
+            # Already-loaded components do not trigger a reload
+            classifier.load_nlp(["tok2vec"])
+            assert mock_load.call_count == 1
+
+            # New components reload while keeping earlier ones
+            classifier.load_nlp(["parser"])
+            assert mock_load.call_count == 2
+            assert classifier.nlp_components == ("ner", "parser", "tok2vec")
+
+        assert classifier.get_performance_metrics()["nlp_loaded"] is True
 
     def test_preprocess_text(self, voice_classifier):
         """Test text preprocessing functionality"""
@@ -166,6 +239,71 @@ class TestVoiceClassifier:
         assert "query" in params
         assert "climate change" in params["query"]
 
+    def test_extract_parameters_without_extractor(self, voice_classifier):
+        """Test categories without a registered extractor have no parameters"""
+        assert (
+            voice_classifier.extract_parameters(
+                "hello there", CommandCategory.GENERAL_CONVERSATION
+            )
+            == {}
+        )
+
+    @pytest.mark.asyncio
+    async def test_register_parameter_extractor(self, initialized_classifier):
+        """Test custom extractors plug in and report per-extractor timings"""
+
+        class ReminderExtractor(ParameterExtractor):
+            def extract(self, text):
+                return {"reminder": text}
+
+        class UnfinishedExtractor(ParameterExtractor):
+            pass
+
+        with pytest.raises(TypeError):
+            UnfinishedExtractor()
+
+        classifier = initialized_classifier
+        classifier.register_parameter_extractor(
+            CommandCategory.REMINDERS, ReminderExtractor()
+        )
+        result = await classifier.classify_command("remind me to call mom")
+
+        assert result.category == CommandCategory.REMINDERS
+        assert result.parameters == {"reminder": "remind me to call mom"}
+        extractor_stats = classifier.get_performance_metrics()["parameter_extractors"]
+        assert extractor_stats["reminders"]["count"] == 1
+        assert extractor_stats["web_search"]["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_register_extractor_invalidates_precomputed_results(self):
+        """Test a new extractor reaches fast path, cached and shared results"""
+
+        class ReminderExtractor(ParameterExtractor):
+            def extract(self, text):
+                return {"reminder": text}
+
+        classifier = VoiceClassifier()
+        await classifier.initialize()
+        classifier.attach_shared_cache(SharedResultCache(FakeRedis()))
+        hot_text = "remind me to call mom"  # A training example: fast path entry
+        cached_text = "please remind me to water the plants"
+        assert (await classifier.classify_command(cached_text)).parameters == {}
+        previous_results_version = classifier.results_version
+
+        classifier.register_parameter_extractor(
+            CommandCategory.REMINDERS, ReminderExtractor()
+        )
+
+        assert classifier.results_version != previous_results_version
+        assert classifier.shared_cache.get_stats()["hits"] == 0
+        for text in (hot_text, cached_text):
+            result = await classifier.classify_command(text)
+            assert result.category == CommandCategory.REMINDERS
+            assert result.parameters == {
+                "reminder": classifier.preprocess_text(text)
+            }
+        assert classifier.fast_path.exact_hits == 1
+
     def test_calculate_pattern_confidence(self, voice_classifier):
         """Test pattern-based confidence calculation"""
         # High confidence match
@@ -180,6 +318,131 @@ class TestVoiceClassifier:
         )
         assert confidence == 0.0
 
+    def test_calculate_pattern_confidences_matches_per_category(self, voice_classifier):
+        """Test single-pass pattern scoring agrees with per-category scoring"""
+        for text in [
+            "create a pdf report",
+            "what is 100 divided by 4",
+            "send an email to john@example.com",
+            "random text",
+        ]:
+            scores = voice_classifier.calculate_pattern_confidences(text)
+            for category in CommandCategory:
+                assert scores.get(
+                    category, 0.0
+                ) == voice_classifier.calculate_pattern_confidence(text, category)
+
+    def test_compiled_patterns_skip_invalid_regex(self, voice_classifier):
+        """Test invalid patterns are skipped when compiling a category"""
+        matcher = voice_classifier._compile_category_patterns(
+            [{"patterns": [r"(unclosed", r"\bvalid\b"], "examples": []}]
+        )
+
+        assert matcher is not None
+        assert matcher.search("this is VALID text")
+        assert voice_classifier._compile_category_patterns([{"patterns": []}]) is None
+
+    @pytest.mark.asyncio
+    async def test_similarity_confidences_use_example_matrix(
+        self, initialized_classifier
+    ):
+        """Test precomputed example matrix matches per-category cosine similarity"""
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        classifier = initialized_classifier
+        text = "generate a pdf report about sales"
+        scores = classifier.calculate_similarity_confidences(text)
+
+        assert classifier.example_matrix.shape[0] == len(classifier.example_categories)
+        for category, pattern_groups in classifier.command_patterns.items():
+            examples = [e for group in pattern_groups for e in group["examples"]]
+            expected = cosine_similarity(
+                classifier.vectorizer.transform([text]),
+                classifier.vectorizer.transform(examples),
+            ).max()
+            assert scores[category] == pytest.approx(expected)
+
+    @pytest.mark.asyncio
+    async def test_pruned_scoring_matches_full_scoring(self, initialized_classifier):
+        """Test bound pruning never changes the winning category or confidence"""
+        classifier = initialized_classifier
+        texts = [
+            "send an email to john about the meeting",
+            "create a document about ai",
+            "what is 15 plus 27",
+            "xyz random gibberish text",
+        ]
+
+        for text in texts:
+            normalized = classifier.preprocess_text(text)
+            full = classifier._combine_scores(
+                normalized,
+                classifier.calculate_pattern_confidences(normalized),
+                classifier.calculate_similarity_confidences(normalized),
+            )
+            core = classifier.classify_core(normalized)
+
+            assert core.best_category == full.best_category
+            assert core.best_confidence == pytest.approx(full.best_confidence)
+            assert core.categories_pruned == len(core.pruned_upper_bounds)
+            for category, upper_bound in list(core.pruned_upper_bounds.items()):
+                assert upper_bound < core.best_confidence
+                assert classifier._resolve_pruned_score(
+                    core, category
+                ) == pytest.approx(full.category_scores[category])
+
+    @pytest.mark.asyncio
+    async def test_obvious_command_reports_pruned_categories(
+        self, initialized_classifier
+    ):
+        """Test pruned category counts reach results and metrics"""
+        result = await initialized_classifier.classify_command(
+            "send an email to john about the meeting", "user", "session"
+        )
+
+        assert result.category == CommandCategory.EMAIL_MANAGEMENT
+        assert result.categories_pruned > 0
+        metrics = initialized_classifier.get_performance_metrics()
+        assert metrics["categories_pruned_total"] == result.categories_pruned
+
+    @pytest.mark.asyncio
+    async def test_context_boost_leaves_shared_core_unchanged(
+        self, initialized_classifier
+    ):
+        """Test resolving a pruned score for one session does not edit the core"""
+        classifier = initialized_classifier
+        text = classifier.preprocess_text("create a document about the email")
+        pruned = CommandCategory.DOCUMENT_GENERATION
+        core = CoreClassification(
+            normalized_text=text,
+            category_scores={CommandCategory.EMAIL_MANAGEMENT: 0.12, pruned: 0.0},
+            best_category=CommandCategory.EMAIL_MANAGEMENT,
+            best_confidence=0.12,
+            pruned_upper_bounds={pruned: 0.4},
+            categories_pruned=1,
+        )
+        context = ConversationContext("user1", "session1")
+        context.last_command_category = pruned
+
+        category, confidence, _ = classifier._apply_context_boost(core, context)
+        similarity = classifier.calculate_similarity_confidence(text, pruned)
+        assert similarity > 0
+        assert category == pruned
+        assert confidence == pytest.approx(similarity * 0.4 + 0.1)
+        assert core.category_scores[pruned] == 0.0
+        assert core.pruned_upper_bounds == {pruned: 0.4}
+        assert core.categories_pruned == len(core.pruned_upper_bounds)
+
+    def test_similarity_confidences_before_training(self, voice_classifier):
+        """Test similarity scoring is empty until the vectorizer is trained"""
+        assert voice_classifier.calculate_similarity_confidences("hello") == {}
+        assert (
+            voice_classifier.calculate_similarity_confidence(
+                "hello", CommandCategory.GENERAL_CONVERSATION
+            )
+            == 0.0
+        )
+
     @pytest.mark.asyncio
     async def test_classify_command_basic(
         self, initialized_classifier, sample_commands
@@ -269,6 +532,210 @@ class TestVoiceClassifier:
         assert "average_classification_time" in metrics
         assert "active_contexts" in metrics
         assert "cached_results" in metrics
+        assert "classification_cache" in metrics
+        assert set(metrics["latency"]) == {
+            "preprocessing",
+            "scoring",
+            "extraction",
+            "total",
+        }
+
+    @pytest.mark.asyncio
+    async def test_latency_metrics_track_each_stage(self, initialized_classifier):
+        """Test stage histograms record per request and per cache miss"""
+        classifier = initialized_classifier
+        await classifier.classify_command("create a document about AI")
+        await classifier.classify_command("create a document about AI")
+
+        latency = classifier.get_performance_metrics()["latency"]
+        assert latency["total"]["count"] == 2
+        assert latency["preprocessing"]["count"] == 2
+        assert latency["scoring"]["count"] == 1  # Second call is a cache hit
+        assert latency["extraction"]["count"] == 1
+        assert 0 < latency["total"]["p50"] <= latency["total"]["max"]
+
+    @pytest.mark.asyncio
+    async def test_core_cache_shared_across_users(self, initialized_classifier):
+        """Test the same phrasing from different users reuses one core result"""
+        for i in range(5):
+            result = await initialized_classifier.classify_command(
+                "check my email", user_id=f"user_{i}", session_id=f"session_{i}"
+            )
+            assert result.raw_text == "check my email"
+
+        assert initialized_classifier.cache_hits == 4
+        assert len(initialized_classifier.classification_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_context_boost_overlay_matches_full_scoring(
+        self, initialized_classifier
+    ):
+        """Test the context overlay reproduces in-loop context boosting"""
+        classifier = initialized_classifier
+        texts = [
+            "make it a PDF format",
+            "what is 100 divided by 4",
+            "xyz random gibberish text",
+            "send the report to the team",
+        ]
+
+        for text in texts:
+            normalized = classifier.preprocess_text(text)
+            core = classifier.classify_core(normalized)
+            for last_category in CommandCategory:
+                context = ConversationContext("user", "session")
+                context.last_command_category = last_category
+
+                expected_category = CommandCategory.UNKNOWN
+                expected_confidence = 0.0
+                for category in CommandCategory:
+                    if category == CommandCategory.UNKNOWN:
+                        continue
+                    score = core.category_scores[category]
+                    if category == last_category:
+                        score += 0.1
+                    if score > expected_confidence:
+                        expected_category, expected_confidence = category, score
+
+                category, confidence, parameters = classifier._apply_context_boost(
+                    core, context
+                )
+                assert category == expected_category
+                assert confidence == expected_confidence
+                assert parameters == classifier.extract_parameters(
+                    normalized, expected_category
+                )
+
+    @pytest.mark.asyncio
+    async def test_classify_many_matches_sequential(self, sample_commands):
+        """Test batch classification returns the same results as sequential calls"""
+        texts = [cmd for commands in sample_commands.values() for cmd in commands]
+        texts += texts[:3]  # Repeated phrasings within one batch
+
+        batch_classifier = VoiceClassifier()
+        sequential_classifier = VoiceClassifier()
+        await batch_classifier._train_vectorizer()
+        await sequential_classifier._train_vectorizer()
+
+        batch_results = await batch_classifier.classify_many(texts, user_id="u1")
+        sequential_results = [
+            await sequential_classifier.classify_command(text, user_id="u1")
+            for text in texts
+        ]
+
+        assert [r.raw_text for r in batch_results] == texts
+        for batch_result, sequential_result in zip(batch_results, sequential_results):
+            assert batch_result.category == sequential_result.category
+            assert batch_result.confidence == pytest.approx(
+                sequential_result.confidence
+            )
+            assert batch_result.parameters == sequential_result.parameters
+        assert batch_classifier.cache_hits == sequential_classifier.cache_hits
+
+    @pytest.mark.asyncio
+    async def test_executor_mode_matches_inline(self, sample_commands):
+        """Test process pool scoring returns the same results as inline scoring"""
+        texts = [cmd for commands in sample_commands.values() for cmd in commands]
+
+        pooled_classifier = VoiceClassifier(executor_workers=2)
+        inline_classifier = VoiceClassifier()
+        await pooled_classifier.initialize()
+        await inline_classifier.initialize()
+        pooled_classifier.start_executor()
+        try:
+            assert pooled_classifier.get_performance_metrics()["executor_workers"] == 2
+            pooled_results = [
+                await pooled_classifier.classify_command(text) for text in texts[:4]
+            ]
+            pooled_results += await pooled_classifier.classify_many(texts[4:])
+        finally:
+            pooled_classifier.shutdown_executor()
+
+        inline_results = [
+            await inline_classifier.classify_command(text) for text in texts
+        ]
+        for pooled_result, inline_result in zip(pooled_results, inline_results):
+            assert pooled_result.category == inline_result.category
+            assert pooled_result.confidence == pytest.approx(inline_result.confidence)
+            assert pooled_result.parameters == inline_result.parameters
+        assert pooled_classifier.executor is None
+
+    @pytest.mark.asyncio
+    async def test_fast_path_serves_known_phrasings_without_scoring(self):
+        """Test examples and configured hot phrasings skip scoring entirely"""
+        classifier = VoiceClassifier(fast_path_phrases=["open my inbox"])
+        await classifier.initialize()
+
+        for text in ["Search for Python tutorials", "open my inbox"]:
+            result = await classifier.classify_command(text)
+            expected = classifier.classify_core(classifier.preprocess_text(text))
+            assert result.category == expected.best_category
+            assert result.confidence == expected.best_confidence
+
+        assert classifier.scored_classifications == 0
+        stats = classifier.get_performance_metrics()["fast_path"]
+        assert stats["exact_hits"] == 2
+        assert stats["hit_rate"] == 1.0
+
+        # Retraining rebuilds the index for the new tables
+        await classifier.add_training_data(
+            CommandCategory.WEB_SEARCH, examples=["browse the web for recipes"]
+        )
+        assert classifier.fast_path.version == classifier.tables_version
+        assert "browse the web for recipes" in classifier.fast_path.exact
+
+    @pytest.mark.asyncio
+    async def test_fast_path_signature_only_for_confident_phrasings(self):
+        """Test reordered words reuse a confident template with fresh parameters"""
+        classifier = VoiceClassifier()
+        await classifier.initialize()
+
+        result = await classifier.classify_command("python tutorials search for")
+        assert result.category == CommandCategory.WEB_SEARCH
+        assert classifier.fast_path.signature_hits == 1
+        assert classifier.scored_classifications == 0
+
+        # "close safari" scores below the signature threshold, so it is scored
+        await classifier.classify_command("safari close")
+        assert classifier.fast_path.signature_hits == 1
+        assert classifier.scored_classifications == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_path_signature_rejected_when_patterns_differ(self):
+        """Test reordered words that break a pattern match are scored in full"""
+        classifier = VoiceClassifier()
+        await classifier.initialize()
+        text = "off bluetooth turn"
+        assert token_signature(text) in classifier.fast_path.signatures
+
+        result = await classifier.classify_command(text, user_id="fresh")
+        expected = classifier.classify_core(classifier.preprocess_text(text))
+        assert result.confidence == expected.best_confidence < 0.5
+        assert classifier.fast_path.signature_hits == 0
+        assert classifier.fast_path.get_stats()["signature_rejections"] == 1
+        assert classifier.scored_classifications == 1
+
+    @pytest.mark.asyncio
+    async def test_classify_many_empty_batch(self, initialized_classifier):
+        """Test empty batches classify to an empty list"""
+        assert await initialized_classifier.classify_many([]) == []
+
+    @pytest.mark.asyncio
+    async def test_classification_cache_hits_and_bounds(self):
+        """Test repeated commands hit the bounded classification cache"""
+        classifier = VoiceClassifier(cache_max_entries=2)
+        await classifier._train_vectorizer()
+
+        await classifier.classify_command("create a document about AI")
+        await classifier.classify_command("create a document about AI")
+        for i in range(3):
+            await classifier.classify_command(f"send email number {i}")
+
+        cache_stats = classifier.get_performance_metrics()["classification_cache"]
+        assert classifier.cache_hits == 1
+        assert cache_stats["hits"] == 1
+        assert cache_stats["entries"] == 2
+        assert cache_stats["evictions"] == 2
 
     def test_cleanup_expired_contexts(self, voice_classifier):
         """Test context cleanup functionality"""
@@ -284,6 +751,820 @@ class TestVoiceClassifier:
         # Should have fewer contexts
         assert len(voice_classifier.context_cache) <= initial_count
 
+    def test_expiry_removes_only_idle_contexts(self, voice_classifier):
+        """Test heap expiry honours activity recorded after a context was indexed"""
+        idle_time = datetime.now() - timedelta(hours=2)
+        for session_id in ["idle", "active", "cleared"]:
+            add_context(voice_classifier, "user", session_id, idle_time)
+        # Activity after indexing leaves a stale heap entry behind
+        voice_classifier.context_cache["user_active"].context_timestamp = datetime.now()
+        voice_classifier.clear_context("user", "cleared")
+
+        assert voice_classifier.cleanup_expired_contexts(timeout_minutes=30) == 1
+        assert list(voice_classifier.context_cache) == ["user_active"]
+        assert voice_classifier.context_expiry.get_stats()["refreshed"] == 1
+        assert len(voice_classifier.context_expiry) == 1
+
+    def test_max_contexts_evicts_least_recently_active(self):
+        """Test the live context cap evicts the oldest contexts first"""
+        classifier = VoiceClassifier(max_contexts=3)
+        for index in range(3):
+            add_context(
+                classifier,
+                "user",
+                f"s{index}",
+                datetime.now() - timedelta(minutes=10 - index),
+            )
+        classifier.context_cache["user_s0"].context_timestamp = datetime.now()
+
+        classifier._get_or_create_context("user", "s3")
+
+        assert set(classifier.context_cache) == {"user_s0", "user_s2", "user_s3"}
+        assert classifier.context_expiry.evicted == 1
+
+    @pytest.mark.asyncio
+    async def test_context_reaper_expires_in_background(self, voice_classifier):
+        """Test the reaper task expires idle contexts without a manual cleanup"""
+        for index in range(5):
+            add_context(
+                voice_classifier,
+                "user",
+                f"s{index}",
+                datetime.now() - timedelta(hours=1),
+            )
+
+        voice_classifier.start_context_reaper(interval_seconds=0.01, batch_size=2)
+        await asyncio.sleep(0.1)
+        await voice_classifier.stop_context_reaper()
+
+        assert voice_classifier.context_cache == {}
+        assert voice_classifier.context_expiry.expired == 5
+
+
+class TestBoundedLRUCache:
+    """Test cases for BoundedLRUCache"""
+
+    def test_lru_eviction_by_entries(self):
+        """Test least recently used entry is evicted first"""
+        cache = BoundedLRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # Refreshes "a"
+        cache.put("c", 3)
+
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache
+        assert cache.evictions == 1
+
+    def test_eviction_by_bytes(self):
+        """Test byte budget eviction uses the size estimator"""
+        cache = BoundedLRUCache(max_entries=100, max_bytes=10, sizeof=lambda v: 4)
+        for key in range(5):
+            cache.put(key, key)
+
+        assert len(cache) == 2
+        assert cache.total_bytes == 8
+        assert cache.get_stats()["evictions"] == 3
+
+    def test_ttl_uses_insert_timestamp(self):
+        """Test entries expire relative to their insert time"""
+        now = [100.0]
+        cache = BoundedLRUCache(ttl_seconds=10, clock=lambda: now[0])
+        cache.put("key", "value")
+
+        now[0] = 109.0
+        assert cache.get("key") == "value"
+
+        now[0] = 110.0
+        assert cache.get("key") is None
+        stats = cache.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert len(cache) == 0
+
+    def test_purge_expired(self):
+        """Test bulk removal of expired entries"""
+        now = [0.0]
+        cache = BoundedLRUCache(ttl_seconds=5, clock=lambda: now[0])
+        cache.put("old", 1)
+        now[0] = 4.0
+        cache.put("new", 2)
+        now[0] = 6.0
+
+        assert cache.purge_expired() == 1
+        assert list(cache) == ["new"]
+
+
+class TestClassifierArtifact:
+    """Test cases for the persisted classifier artifact"""
+
+    @pytest.mark.asyncio
+    async def test_artifact_round_trip(self, tmp_path, initialized_classifier):
+        """Test a warm-started classifier scores exactly like the trained one"""
+        trained = initialized_classifier
+        version = trained.save_artifact(str(tmp_path))
+
+        warm = VoiceClassifier(artifact_path=str(tmp_path))
+        await warm.initialize()
+
+        assert warm.artifact_version == version
+        assert warm.example_matrix.data.flags.writeable is False  # Memory-mapped
+        assert (warm.example_matrix != trained.example_matrix).nnz == 0
+        assert warm.command_patterns == trained.command_patterns
+        for text in ["create a document about AI", "what is 15 plus 27", "xyz"]:
+            warm_core = warm.classify_core(warm.preprocess_text(text))
+            trained_core = trained.classify_core(trained.preprocess_text(text))
+            assert warm_core.best_category == trained_core.best_category
+            assert warm_core.best_confidence == trained_core.best_confidence
+
+        # Rebuilding identical tables yields the same version
+        assert warm.save_artifact(str(tmp_path)) == version
+
+    @pytest.mark.asyncio
+    async def test_saves_keep_the_previous_arrays(
+        self, tmp_path, initialized_classifier
+    ):
+        """Test a loader holding the previous manifest can still open its arrays"""
+        from src.ai import classifier_artifact
+
+        classifier = initialized_classifier
+        first = classifier.save_artifact(str(tmp_path))
+        first_files = list(tmp_path.glob(f"{first}.*.npy"))
+        await classifier.add_training_data(
+            CommandCategory.WEB_SEARCH, examples=["browse the web for recipes"]
+        )
+        second = classifier.save_artifact(str(tmp_path))
+        assert second != first and all(path.exists() for path in first_files)
+
+        await classifier.add_training_data(
+            CommandCategory.WEB_SEARCH, examples=["look online for flights"]
+        )
+        third = classifier.save_artifact(str(tmp_path))
+        assert not any(path.exists() for path in first_files)
+        assert list(tmp_path.glob(f"{second}.*.npy"))
+
+        # Arrays removed between the manifest read and np.load: read it again
+        real_load = np.load
+        loaded = []
+
+        def load_after_a_save(path, *args, **kwargs):
+            loaded.append(path)
+            if len(loaded) == 1:
+                raise FileNotFoundError(path)
+            return real_load(path, *args, **kwargs)
+
+        with patch.object(classifier_artifact.np, "load", load_after_a_save):
+            artifact = classifier_artifact.load_classifier_artifact(str(tmp_path))
+        assert artifact.version == third
+
+    @pytest.mark.asyncio
+    async def test_corrupt_artifact_falls_back_to_training(
+        self, tmp_path, initialized_classifier
+    ):
+        """Test verification rejects a tampered artifact and training takes over"""
+        initialized_classifier.save_artifact(str(tmp_path))
+        idf_file = next(tmp_path.glob("*.idf.npy"))
+        idf = np.load(idf_file)
+        np.save(idf_file, idf * 2)
+
+        with pytest.raises(ValueError):
+            VoiceClassifier().load_artifact(str(tmp_path))
+
+        classifier = VoiceClassifier(artifact_path=str(tmp_path))
+        await classifier.initialize()
+        assert classifier.artifact_version is None
+        assert classifier.example_matrix is not None
+
+        missing = VoiceClassifier(artifact_path=str(tmp_path / "missing"))
+        await missing.initialize()
+        assert missing.is_initialized is True
+
+
+class TestSimilarityBackends:
+    """Test cases for pluggable example similarity search"""
+
+    def test_incomplete_backend_fails_at_instantiation(self):
+        """Test a backend missing abstract methods cannot be created"""
+
+        class IndexOnlyBackend(CandidateSimilarityBackend):
+            def _build_index(self):
+                pass
+
+        with pytest.raises(TypeError):
+            IndexOnlyBackend()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["lsh", "minhash"])
+    async def test_small_corpus_matches_brute_force(
+        self, backend, initialized_classifier
+    ):
+        """Test categories below exact_below are scored exactly by ANN backends"""
+        classifier = VoiceClassifier(similarity_backend=backend)
+        await classifier.initialize()
+        assert classifier.get_performance_metrics()["similarity_backend"]["name"] == (
+            backend
+        )
+
+        texts = ["send an email to john", "what is 15 plus 27", "xyz"]
+        for text in texts:
+            expected = initialized_classifier.calculate_similarity_confidences(text)
+            actual = classifier.calculate_similarity_confidences(text)
+            assert actual == pytest.approx(expected)
+
+            core = classifier.classify_core(classifier.preprocess_text(text))
+            reference = initialized_classifier.classify_core(
+                initialized_classifier.preprocess_text(text)
+            )
+            assert core.best_category == reference.best_category
+            assert core.best_confidence == pytest.approx(reference.best_confidence)
+
+    def test_unknown_backend_rejected(self):
+        """Test an unregistered backend name fails at construction"""
+        with pytest.raises(ValueError):
+            VoiceClassifier(similarity_backend="hnsw")
+
+
+class TestStreamingClassification:
+    """Test cases for incremental classification of live transcripts"""
+
+    def assert_same_core(self, core, reference):
+        assert core.normalized_text == reference.normalized_text
+        assert core.best_category == reference.best_category
+        assert core.best_confidence == reference.best_confidence
+        assert dict(core.category_scores) == dict(reference.category_scores)
+        assert core.parameters == reference.parameters
+
+    @pytest.mark.asyncio
+    async def test_deltas_match_full_scoring(self, initialized_classifier):
+        """Test every provisional core equals scoring the transcript from scratch"""
+        classifier = initialized_classifier
+        for text in [
+            "send an email to john@example.com about the budget",
+            "um what is 15 plus 27",
+            "search for python tutorials you know online",
+        ]:
+            stream = classifier.start_stream()
+            for end in range(1, len(text) + 1):
+                stream.append(text[end - 1])
+                reference = classifier.classify_core(
+                    classifier.preprocess_text(text[:end])
+                )
+                self.assert_same_core(stream.core, reference)
+
+            # Similarity is only rescored when terms or pattern hits change
+            assert stream.rescores < stream.updates / 2
+
+    @pytest.mark.asyncio
+    async def test_revisions_roll_back_state(self, initialized_classifier):
+        """Test revised earlier words drop their counts and pattern matches"""
+        classifier = initialized_classifier
+        stream = classifier.start_stream()
+        for transcript in [
+            "send email to",
+            "send email to bob",
+            "spend time with bob",
+            "what is 2 plus 2",
+            "what is the weather",
+        ]:
+            result = stream.revise(transcript)
+            reference = classifier.classify_core(classifier.preprocess_text(transcript))
+            self.assert_same_core(stream.core, reference)
+            assert result.category == reference.best_category
+
+    @pytest.mark.asyncio
+    async def test_finalize_matches_classify_command(self, initialized_classifier):
+        """Test the committed result equals a one-shot classification"""
+        text = "send an email to jane@example.org about the launch"
+        one_shot = VoiceClassifier()
+        await one_shot.initialize()
+        expected = await one_shot.classify_command(text, "user", "session")
+
+        classifier = initialized_classifier
+        stream = classifier.start_stream("user", "session")
+        for word in text.split(" "):
+            stream.append(word + " ")
+        rescores = stream.rescores
+        result = await stream.finalize(text)
+
+        assert stream.rescores == rescores  # Reused the last provisional core
+        assert result.category == expected.category
+        assert result.confidence == expected.confidence
+        assert result.parameters == expected.parameters
+        assert classifier.classification_cache.get(result.normalized_text) is not None
+        context = classifier.get_context("user", "session")
+        assert context.last_command_category == result.category
+
+        metrics = classifier.get_performance_metrics()["streaming"]
+        assert metrics["finalized"] == 1
+        assert metrics["rescores"] < metrics["updates"]
+        with pytest.raises(RuntimeError):
+            stream.append("again")
+
+    def test_transcript_streams_capped_per_connection(self, voice_classifier):
+        """Test unfinalized streams past the cap evict the least recently used"""
+        streams = TranscriptStreams(max_streams=3, idle_ttl_seconds=60)
+        opened = {}
+        for index in range(3):
+            opened[index] = voice_classifier.start_stream()
+            streams.add(f"s{index}", opened[index])
+        assert streams.get("s0") is opened[0]
+
+        for index in range(3, 10):
+            streams.add(f"s{index}", voice_classifier.start_stream())
+
+        assert len(streams) == 3
+        assert "s1" not in streams and "s0" not in streams
+        assert streams.get_stats()["evictions"] == 7
+        assert streams.pop("s9") is not None
+        assert streams.pop("s9") is None
+
+    def test_transcript_streams_expire_when_idle(self, voice_classifier):
+        """Test streams unused for the idle TTL are dropped"""
+        now = [0.0]
+        streams = TranscriptStreams(
+            max_streams=8, idle_ttl_seconds=30, clock=lambda: now[0]
+        )
+        streams.add("idle", voice_classifier.start_stream())
+        streams.add("active", voice_classifier.start_stream())
+
+        now[0] = 20.0
+        assert streams.get("active") is not None
+        now[0] = 40.0
+        assert streams.get("idle") is None
+        assert "active" in streams
+        now[0] = 70.0
+        assert streams.purge_expired() == 1
+        assert len(streams) == 0
+        assert streams.get_stats()["expirations"] == 2
+
+
+class TestOnlineTraining:
+    """Test cases for incremental training of a live classifier"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_update_matches_full_refit(self):
+        """Test delta IDF over stored counts reproduces a full refit"""
+        classifier = VoiceClassifier()
+        await classifier.initialize()
+        classifier.classification_cache.put("stale", "entry")
+        previous_version = classifier.tables_version
+
+        update = await classifier.add_training_data(
+            CommandCategory.CALCULATIONS,
+            examples=["crunch the quarterly numbers", "tally the invoice totals"],
+            patterns=[r"\bcrunch\b"],
+        )
+
+        assert update["examples_added"] == 2
+        assert update["patterns_added"] == 1
+        assert classifier.tables_version != previous_version
+        assert len(classifier.classification_cache) == 0
+
+        refit = VoiceClassifier()
+        refit.command_patterns = classifier.command_patterns
+        refit.compiled_patterns = classifier.compiled_patterns
+        refit._fit_examples()
+        idf = classifier.vectorizer.idf_
+        for term, index in refit.vectorizer.vocabulary_.items():
+            incremental_index = classifier.vectorizer.vocabulary_[term]
+            assert idf[incremental_index] == pytest.approx(refit.vectorizer.idf_[index])
+        assert list(classifier.example_category_offsets) == list(
+            refit.example_category_offsets
+        )
+
+        text = classifier.preprocess_text("crunch the numbers")
+        core = classifier.classify_core(text)
+        assert core.best_category == CommandCategory.CALCULATIONS
+        assert core.best_confidence == pytest.approx(
+            refit.classify_core(text).best_confidence
+        )
+
+    @pytest.mark.asyncio
+    async def test_invalid_training_data_rejected(self, initialized_classifier):
+        """Test bad updates raise without touching the live tables"""
+        version = initialized_classifier.tables_version
+
+        with pytest.raises(ValueError):
+            await initialized_classifier.add_training_data(
+                CommandCategory.EMAIL_MANAGEMENT, patterns=["(unclosed"]
+            )
+        with pytest.raises(ValueError):
+            await initialized_classifier.add_training_data(
+                CommandCategory.UNKNOWN, examples=["anything"]
+            )
+        with pytest.raises(ValueError):
+            await initialized_classifier.add_training_data(
+                CommandCategory.EMAIL_MANAGEMENT, examples=["  "]
+            )
+
+        assert initialized_classifier.tables_version == version
+
+    def test_training_route_requires_authentication(self):
+        """Test the admin training route refuses requests without a valid token"""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from src.api import routes
+        from src.auth.jwt_auth import JWTAuth
+
+        app = FastAPI()
+        app.include_router(routes.voice_router)
+        client = TestClient(app)
+        body = {"category": "calculations", "examples": ["crunch the numbers"]}
+        update = {
+            "category": "calculations",
+            "examples_added": 1,
+            "patterns_added": 0,
+            "total_examples": 33,
+            "vocabulary_size": 87,
+            "tables_version": "v1",
+        }
+
+        classifier = routes.voice_classifier
+        add_training_data = AsyncMock(return_value=update)
+        with patch.object(classifier, "is_initialized", True), patch.object(
+            classifier, "add_training_data", add_training_data
+        ):
+            response = client.post("/voice/admin/training", json=body)
+            assert response.status_code in (401, 403)
+            response = client.post(
+                "/voice/admin/training",
+                json=body,
+                headers={"Authorization": "Bearer not-a-token"},
+            )
+            assert response.status_code == 401
+            add_training_data.assert_not_called()
+
+            token = JWTAuth.create_access_token(user_id="admin")
+            response = client.post(
+                "/voice/admin/training",
+                json=body,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            assert response.status_code == 200
+            add_training_data.assert_awaited_once()
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [r"(a+)+$", r"(?:\w+\s?)*done", r"(a|ab)*c", r"(\w+)\s+\1", r".*a.*b.*c"],
+    )
+    def test_backtracking_prone_patterns_rejected(self, pattern):
+        """Test patterns outside the restricted syntax are refused"""
+        with pytest.raises(UnsafePatternError):
+            check_pattern_safety(pattern)
+
+    def test_builtin_patterns_fit_restricted_syntax(self, voice_classifier):
+        """Test every built-in command pattern passes the safety check"""
+        for pattern_groups in voice_classifier.command_patterns.values():
+            for pattern_group in pattern_groups:
+                for pattern in pattern_group["patterns"]:
+                    check_pattern_safety(pattern)
+
+    @pytest.mark.asyncio
+    async def test_unsafe_pattern_not_installed(self, initialized_classifier):
+        """Test an unsafe pattern fails the update before reaching the matchers"""
+        matcher = initialized_classifier.compiled_patterns[CommandCategory.WEB_SEARCH]
+
+        with pytest.raises(ValueError):
+            await initialized_classifier.add_training_data(
+                CommandCategory.WEB_SEARCH, patterns=[r"(x+x+)+y"]
+            )
+
+        assert (
+            initialized_classifier.compiled_patterns[CommandCategory.WEB_SEARCH]
+            is matcher
+        )
+
+    @pytest.mark.asyncio
+    async def test_update_reaches_workers_sharing_tables_dir(self, tmp_path):
+        """Test an update on one worker is loaded by the others and by new ones"""
+        first = VoiceClassifier(shared_tables_dir=str(tmp_path))
+        second = VoiceClassifier(shared_tables_dir=str(tmp_path))
+        for worker in (first, second):
+            await worker.initialize()
+        await second.classify_command("crunch the numbers")
+
+        await first.add_training_data(
+            CommandCategory.CALCULATIONS,
+            examples=["crunch the quarterly numbers"],
+            patterns=[r"\bcrunch\b"],
+        )
+
+        assert second.refresh_shared_tables() is True
+        assert second.refresh_shared_tables() is False
+        assert second.tables_version == first.tables_version
+        assert len(second.classification_cache) == 0
+        result = await second.classify_command("crunch the numbers")
+        assert result.category == CommandCategory.CALCULATIONS
+
+        # Updates from the second worker build on the first one's
+        await second.add_training_data(
+            CommandCategory.WEB_SEARCH, examples=["browse the web for recipes"]
+        )
+        assert first.refresh_shared_tables() is True
+        assert "crunch the quarterly numbers" in first._category_examples(
+            CommandCategory.CALCULATIONS
+        )
+
+        late = VoiceClassifier(shared_tables_dir=str(tmp_path))
+        await late.initialize()
+        assert late.tables_version == second.tables_version
+        assert late.base_tables_version == first.base_tables_version
+
+    @pytest.mark.asyncio
+    async def test_pool_workers_use_incremental_tables(self):
+        """Test pool processes install the parent's tables instead of refitting"""
+        import importlib
+
+        classifier_module = importlib.import_module("src.ai.voice_classifier")
+        classifier = VoiceClassifier()
+        await classifier.initialize()
+        await classifier.add_training_data(
+            CommandCategory.CALCULATIONS, examples=["crunch the quarterly numbers"]
+        )
+
+        classifier_module._initialize_worker(
+            classifier.command_patterns,
+            classifier.parameter_extractors.extractors,
+            None,
+            ("brute", {}),
+            classifier._scoring_tables(),
+        )
+        try:
+            worker = classifier_module._worker_classifier
+            assert worker.vectorizer.vocabulary_ == classifier.vectorizer.vocabulary_
+            text = classifier.preprocess_text("crunch the numbers")
+            assert worker.classify_core(text).category_scores == (
+                classifier.classify_core(text).category_scores
+            )
+        finally:
+            classifier_module._worker_classifier = None
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in for the shared caches and context store
+
+    Commands are the underscore methods; calling one directly or executing
+    a pipeline counts as one round trip.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.round_trips = 0
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        command = getattr(self, f"_{name}")
+
+        async def call(*args, **kwargs):
+            self.round_trips += 1
+            return command(*args, **kwargs)
+
+        return call
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+    @staticmethod
+    def _bytes(value):
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def _get(self, key):
+        return self.store.get(key)
+
+    def _mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def _setex(self, key, ttl, value):
+        self.store[key] = value
+        return True
+
+    def _delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def _expire(self, key, ttl):
+        return key in self.store
+
+    def _sadd(self, key, *members):
+        self.store.setdefault(key, set()).update(members)
+        return len(members)
+
+    def _srem(self, key, *members):
+        self.store.get(key, set()).difference_update(members)
+        return len(members)
+
+    def _smembers(self, key):
+        return {self._bytes(member) for member in self.store.get(key, set())}
+
+    def _hset(self, key, mapping):
+        fields = self.store.setdefault(key, {})
+        fields.update({self._bytes(k): self._bytes(v) for k, v in mapping.items()})
+        return len(mapping)
+
+    def _hdel(self, key, *fields):
+        for field in fields:
+            self.store.get(key, {}).pop(self._bytes(field), None)
+        return len(fields)
+
+    def _hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    def _rpush(self, key, *values):
+        items = self.store.setdefault(key, [])
+        items.extend(self._bytes(value) for value in values)
+        return len(items)
+
+    def _ltrim(self, key, start, end):
+        items = self.store.get(key, [])
+        end = len(items) if end == -1 else end + 1
+        items[:] = items[start:end]
+        return True
+
+    def _lrange(self, key, start, end):
+        items = self.store.get(key, [])
+        return list(items[start : len(items) if end == -1 else end + 1])
+
+
+class FakeRedisPipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self.redis_client, f"_{name}")
+
+        def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.redis_client.round_trips += 1
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+class TestSharedClassifierState:
+    """Test cases for state shared across API workers"""
+
+    @pytest.mark.asyncio
+    async def test_shared_tables_dir_maps_one_copy(self, tmp_path):
+        """Test workers publish trained tables once and mmap the same files"""
+        workers = [VoiceClassifier(shared_tables_dir=str(tmp_path)) for _ in range(2)]
+        for worker in workers:
+            await worker.initialize()
+
+        versions = {worker.artifact_version for worker in workers}
+        assert len(versions) == 1 and None not in versions
+        assert [p.name for p in tmp_path.iterdir()] == [versions.pop()]
+        for worker in workers:
+            assert worker.example_matrix.data.flags.writeable is False
+
+    @pytest.mark.asyncio
+    async def test_results_shared_across_workers(self):
+        """Test a result scored by one worker is reused by another"""
+        redis_client = FakeRedis()
+        first, second = VoiceClassifier(), VoiceClassifier()
+        for worker in (first, second):
+            await worker.initialize()
+            worker.attach_shared_cache(SharedResultCache(redis_client))
+        assert first.tables_version == second.tables_version
+
+        texts = ["send an email to jane@example.org", "what is 15 plus 27"]
+        expected = await first.classify_command(texts[0])
+        await first.classify_many(texts)
+
+        shared = await second.classify_command(texts[0])
+        batch = await second.classify_many(texts)
+
+        assert second.scored_classifications == 0
+        assert second.shared_cache.get_stats()["hits"] == 2
+        assert shared.category == expected.category
+        assert shared.confidence == expected.confidence
+        assert shared.parameters == expected.parameters
+        assert [r.category for r in batch] == [
+            CommandCategory.EMAIL_MANAGEMENT,
+            (await first.classify_command(texts[1])).category,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_hit_matches_local_result(self):
+        """Test a Redis hit returns exactly what scoring locally returns"""
+        redis_client = FakeRedis()
+        first, second = VoiceClassifier(), VoiceClassifier()
+        for worker in (first, second):
+            await worker.initialize()
+            worker.attach_shared_cache(SharedResultCache(redis_client))
+
+        text = "schedule a meeting with the team at 10:30 am"
+        local = await first.classify_command(text)
+        shared = await second.classify_command(text)
+
+        assert local.category == CommandCategory.CALENDAR_SCHEDULING
+        assert local.parameters["date_time"] == [("10:30", "am")]
+        assert second.shared_cache.get_stats()["hits"] == 1
+        assert shared.parameters == local.parameters
+        assert type(shared.parameters["date_time"][0]) is tuple
+        assert shared.confidence == local.confidence
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_fails_open(self, initialized_classifier):
+        """Test Redis errors fall back to local scoring"""
+        redis_client = Mock()
+        redis_client.get = AsyncMock(side_effect=ConnectionError("down"))
+        redis_client.pipeline.side_effect = ConnectionError("down")
+        initialized_classifier.attach_shared_cache(SharedResultCache(redis_client))
+
+        result = await initialized_classifier.classify_command("create a document")
+
+        assert result.category == CommandCategory.DOCUMENT_GENERATION
+        assert initialized_classifier.shared_cache.get_stats()["errors"] == 2
+
+
+class TestLatencyHistogram:
+    """Test cases for the fixed-memory latency histogram"""
+
+    def test_percentiles_within_precision(self):
+        """Test percentiles match exact values within the bucket precision"""
+        histogram = LatencyHistogram(precision=0.01)
+        values = [i / 1000 for i in range(1, 1001)]  # 1ms .. 1s
+        for value in values:
+            histogram.record(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 1000
+        assert snapshot["mean"] == pytest.approx(sum(values) / 1000)
+        assert snapshot["max"] == 1.0
+        for key, exact in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            assert exact <= snapshot[key] <= exact * 1.01
+
+    def test_memory_is_fixed(self):
+        """Test recording never grows the bucket array"""
+        histogram = LatencyHistogram()
+        bucket_count = len(histogram._counts)
+        for value in (0.0, 1e-9, 0.25, 3600.0):
+            histogram.record(value)
+
+        assert len(histogram._counts) == bucket_count
+        assert histogram.snapshot()["max"] == 3600.0
+        histogram.reset()
+        assert histogram.snapshot() == {
+            "count": 0,
+            "mean": 0.0,
+            "p50": 0.0,
+            "p90": 0.0,
+            "p99": 0.0,
+            "max": 0.0,
+        }
+
+
+class TestTextNormalizer:
+    """Test cases for the shared TextNormalizer"""
+
+    def test_normalize_matches_sequential_rules(self):
+        """Test single-pass rewriting matches per-rule substitutions"""
+        import re
+        from src.ai.text_normalizer import CONTRACTIONS, FILLER_WORDS
+
+        def sequential(text):
+            text = text.lower().strip()
+            for filler in FILLER_WORDS:
+                text = re.sub(r"\b" + filler + r"\b", "", text)
+            for contraction, expansion in CONTRACTIONS.items():
+                text = text.replace(contraction, expansion)
+            return re.sub(r"\s+", " ", text).strip()
+
+        normalizer = TextNormalizer(memo_size=0)
+        for text in [
+            "Um, you know, I can't  believe it's RIGHT there",
+            "well so basically create a document alright",
+            "they're sure we'll win, that's what I'd say",
+            "won't you like, send it okay",
+            "you um know",
+        ]:
+            assert normalizer.normalize(text) == sequential(text)
+
+    def test_memoization_stats(self):
+        """Test normalized forms are memoized"""
+        normalizer = TextNormalizer(memo_size=8)
+        normalizer.normalize("Um hello there")
+        normalizer.normalize("Um hello there")
+
+        stats = normalizer.get_stats()
+        assert stats["memoization"] is True
+        assert stats["hits"] == 1
+        assert TextNormalizer(memo_size=0).get_stats() == {"memoization": False}
+
+    def test_classifier_shares_global_normalizer(self, voice_classifier):
+        """Test classifiers use the shared normalizer by default"""
+        assert voice_classifier.text_normalizer is text_normalizer
+        custom = TextNormalizer(filler_words=["hey"])
+        assert VoiceClassifier(normalizer=custom).preprocess_text("hey you") == "you"
+
 
 class TestConversationContext:
     """Test cases for ConversationContext class"""
@@ -339,6 +1620,583 @@ class TestConversationContext:
         assert context.is_context_expired(timeout_minutes=0)
 
 
+class TestContextCodec:
+    """Test cases for the Redis context codec"""
+
+    @staticmethod
+    def _context() -> ConversationContext:
+        context = ConversationContext("user1", "session1")
+        for i in range(25):
+            context.update_parameters(
+                {"recipient": "john@example.com", "date_time": ["tomorrow", i]}
+            )
+            context.add_interaction(
+                f"email john about item {i}",
+                f"Drafting an email about item {i}",
+                CommandCategory.EMAIL_MANAGEMENT,
+            )
+        context.current_topic = "item"
+        context.last_command_category = CommandCategory.EMAIL_MANAGEMENT
+        context.preferences = {"speed": 1.25, "offset": -3, "muted": False, "x": None}
+        return context
+
+    @pytest.mark.parametrize("compression", [None, "zlib"])
+    def test_round_trip(self, compression):
+        """Test contexts decode to an equal context"""
+        codec = ContextCodec(compression=compression, compress_threshold=0)
+        context = self._context()
+        decoded = codec.decode(codec.encode(context))
+
+        assert decoded == context
+        assert len(decoded.conversation_history) == 20
+        assert decoded.conversation_history[0].params == (
+            "recipient",
+            "john@example.com",
+            "date_time",
+            ["tomorrow", 5],
+        )
+        assert codec.get_stats()["compressed"] == (compression is not None)
+
+    def test_smaller_than_pickle(self):
+        """Test encoded contexts take fewer bytes than pickle"""
+        context = self._context()
+        assert len(ContextCodec().encode(context)) < len(pickle.dumps(context)) / 3
+        assert len(ContextCodec(compression=None).encode(context)) < len(
+            pickle.dumps(context)
+        )
+
+    def test_strings_containing_nul(self):
+        """Test strings with NUL characters survive the string table"""
+        codec = ContextCodec(compression=None)
+        context = ConversationContext("user\x00one", "")
+        context.update_parameters({"raw": "a\x00b"})
+        assert codec.decode(codec.encode(context)) == context
+
+    def test_legacy_pickle_payloads(self):
+        """Test contexts stored with pickle still load, unless disabled"""
+        context = self._context()
+        codec = ContextCodec()
+        assert codec.decode(pickle.dumps(context)) == context
+        assert codec.get_stats()["legacy_pickle_decoded"] == 1
+
+        with pytest.raises(ContextCodecError):
+            ContextCodec(allow_pickle=False).decode(pickle.dumps(context))
+
+    def test_round_trip_keeps_extractor_outputs(self, voice_classifier):
+        """Test real extractor outputs, regex group tuples included, survive"""
+        codec = ContextCodec(compression=None)
+        context = ConversationContext("user1", "session1")
+        for text, category in [
+            ("set up a call at 3:00 pm", CommandCategory.CALENDAR_SCHEDULING),
+            ("meet with Sam tomorrow", CommandCategory.CALENDAR_SCHEDULING),
+            ("email jane@example.org re budget", CommandCategory.EMAIL_MANAGEMENT),
+            ("calculate 12 * (3 + 4)", CommandCategory.CALCULATIONS),
+        ]:
+            parameters = voice_classifier.extract_parameters(text, category)
+            context.update_parameters(parameters)
+            context.add_interaction(text, "Done", category)
+        assert context.conversation_history[0].parameters["date_time"] == [
+            ("3:00", "pm")
+        ]
+
+        decoded = codec.decode(codec.encode(context))
+        assert decoded == context
+        assert decoded.active_parameters["date_time"] == ["tomorrow"]
+        assert decoded.conversation_history[0].parameters["date_time"] == [
+            ("3:00", "pm")
+        ]
+        value = {"date_time": [("10:30", "am")], "nested": ([1, (2,)], ())}
+        assert codec.decode_value(codec.encode_value(value)) == value
+
+    def test_non_string_fields_raise_codec_errors(self):
+        """Test fields that must be strings fail with ContextCodecError"""
+        codec = ContextCodec(compression=None)
+        context = ConversationContext("user1", "session1")
+        context.add_interaction(42, "Done", CommandCategory.CALCULATIONS)
+        with pytest.raises(ContextCodecError, match="user_input"):
+            codec.encode(context)
+        with pytest.raises(ContextCodecError, match="string"):
+            codec.encode(ConversationContext(7, "session1"))
+
+    def test_baseline_pickle_payloads(self):
+        """Test a context pickled by the original dict-history class still loads"""
+        context = ContextCodec().decode(BASELINE_CONTEXT_PICKLE.read_bytes())
+
+        assert (context.user_id, context.session_id) == ("user-1", "session-1")
+        assert context.last_activity == datetime(2025, 6, 26, 10, 30).timestamp()
+        assert context.current_topic == "email"
+        assert context.last_command_category == CommandCategory.EMAIL_MANAGEMENT
+        assert context.preferences == {"voice": "calm"}
+        assert context.active_parameters == {
+            "date_time": [("10:30", "am")],
+            "recipient": "jane@example.org",
+        }
+        first, second = context.conversation_history
+        assert isinstance(first, Interaction)
+        assert first["timestamp"] == datetime(2025, 6, 26, 10, 29)
+        assert first["category"] == "calendar_scheduling"
+        assert first.parameters == {"date_time": [("10:30", "am")]}
+        assert second["user_input"] == "email jane@example.org"
+        assert second.parameters == context.active_parameters
+        assert pickle.loads(pickle.dumps(context)) == context
+
+    def test_pickle_payloads_cannot_reference_other_globals(self):
+        """Test pickles naming anything but context types are rejected"""
+        with pytest.raises(ContextCodecError, match="posix|nt"):
+            ContextCodec().decode(pickle.dumps(__import__("os").getcwd))
+        with pytest.raises(ContextCodecError, match="Corrupt"):
+            ContextCodec().decode(pickle.dumps(self._context())[:40])
+
+    def test_rejects_unknown_versions_and_corrupt_payloads(self):
+        """Test unreadable payloads raise ContextCodecError"""
+        codec = ContextCodec(compression=None)
+        data = codec.encode(self._context())
+
+        with pytest.raises(ContextCodecError, match="schema version"):
+            codec.decode(data[:2] + bytes([99]) + data[3:])
+        with pytest.raises(ContextCodecError):
+            codec.decode(data[: len(data) // 2])
+        with pytest.raises(ContextCodecError):
+            codec.encode(ConversationContext("user1", "session1", preferences={1: 2}))
+        with pytest.raises(ContextCodecError):
+            codec.encode(
+                ConversationContext("user1", "session1", preferences={"at": object()})
+            )
+
+
+# Produced by the original ConversationContext, whose history held plain dicts
+BASELINE_CONTEXT_PICKLE = Path(__file__).parent / "data" / "baseline_context.pickle"
+
+
+class TestContextPersistence:
+    """Test cases for ContextManager's Redis layout"""
+
+    @staticmethod
+    def _manager() -> ContextManager:
+        manager = ContextManager()
+        manager.redis_client = FakeRedis()
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_interaction_appends_in_one_round_trip(self):
+        """Test an interaction is one RPUSH/LTRIM transaction, not a rewrite"""
+        manager = self._manager()
+        redis_client = manager.redis_client
+        await manager.get_context("user1", "session1")
+
+        for i in range(25):
+            round_trips = redis_client.round_trips
+            await manager.update_context_interaction(
+                "user1",
+                "session1",
+                f"search for item {i}",
+                f"Results for item {i}",
+                CommandCategory.WEB_SEARCH,
+                {"query": f"item {i}"},
+            )
+            assert redis_client.round_trips == round_trips + 1
+
+        history = redis_client.store["context_history:user1:session1"]
+        state = redis_client.store["context_state:user1:session1"]
+        assert len(history) == 20
+        assert b"preferences" in state and state[b"topic"] == b"item 24"
+
+        context = manager.local_cache.pop("user1_session1")
+        reloaded = await manager.get_context("user1", "session1")
+        assert reloaded == context
+        assert reloaded.conversation_history[0]["user_input"] == "search for item 5"
+
+    @pytest.mark.asyncio
+    async def test_unset_fields_are_removed(self):
+        """Test fields and parameters that are unset disappear from the hash"""
+        manager = self._manager()
+        context = TestContextCodec._context()
+        await manager.save_context(context)
+        context.current_topic = None
+        del context.active_parameters["date_time"]
+        await manager.save_context(context)
+
+        manager.local_cache.clear()
+        reloaded = await manager.get_context("user1", "session1")
+        assert reloaded.current_topic is None
+        assert "date_time" not in reloaded.active_parameters
+        assert reloaded.conversation_history[-1].parameters["date_time"] == [
+            "tomorrow",
+            24,
+        ]
+        assert reloaded == context
+
+    @pytest.mark.asyncio
+    async def test_legacy_contexts_are_migrated(self):
+        """Test whole-context values from earlier releases move to the new layout"""
+        manager = self._manager()
+        context = TestContextCodec._context()
+        manager.redis_client.store["context:user1:session1"] = pickle.dumps(context)
+
+        assert await manager.get_context("user1", "session1") == context
+        assert "context:user1:session1" not in manager.redis_client.store
+        manager.local_cache.clear()
+        assert await manager.get_context("user1", "session1") == context
+        assert manager.get_performance_metrics()["codec"]["legacy_pickle_decoded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_baseline_contexts_are_migrated(self):
+        """Test contexts pickled by the original class move to the new layout"""
+        manager = self._manager()
+        data = BASELINE_CONTEXT_PICKLE.read_bytes()
+        manager.redis_client.store["context:user-1:session-1"] = data
+        expected = ContextCodec().decode(data)
+
+        assert await manager.get_context("user-1", "session-1") == expected
+        assert "context:user-1:session-1" not in manager.redis_client.store
+        manager.local_cache.clear()
+        reloaded = await manager.get_context("user-1", "session-1")
+        assert reloaded.conversation_history[0]["user_input"] == (
+            "schedule a meeting at 10:30 am"
+        )
+        assert reloaded.last_activity == expected.last_activity
+
+    @pytest.mark.asyncio
+    async def test_unreadable_contexts_are_left_alone(self):
+        """Test a payload that fails to decode is neither replaced nor cached"""
+        manager = self._manager()
+        store = manager.redis_client.store
+        store["context:user1:session1"] = b"\x80\x04garbage"
+        stored = TestContextCodec._context()
+        stored.session_id = "session2"
+        store["context:user1:session2"] = pickle.dumps(stored)
+        await self._interact(manager, "session3", 1)
+        manager.local_cache.clear()
+
+        contexts = await manager.get_contexts_many(
+            [("user1", f"session{i}") for i in range(1, 4)]
+        )
+        assert contexts[0] is None
+        assert contexts[1].session_id == "session2"
+        assert contexts[2].session_id == "session3"
+        assert store["context:user1:session1"] == b"\x80\x04garbage"
+        assert "context_state:user1:session1" not in store
+        assert "user1_session1" not in manager.local_cache
+        assert manager.get_performance_metrics()["decode_failures"] == 1
+
+        store["context_state:user1:session3"][b"last_activity"] = b"not a number"
+        manager.local_cache.clear()
+        assert await manager.get_context("user1", "session3") is None
+        assert store["context_state:user1:session3"][b"last_activity"] == (
+            b"not a number"
+        )
+        await manager.update_context_interaction(
+            "user1", "session3", "hello", "Hi", CommandCategory.GENERAL_CONVERSATION
+        )
+        assert store["context_state:user1:session3"][b"last_activity"] == (
+            b"not a number"
+        )
+
+    @pytest.mark.asyncio
+    async def test_contexts_are_not_saved_when_reads_fail(self):
+        """Test contexts created after a failed read stay out of Redis and cache"""
+        manager = self._manager()
+        manager.redis_client.pipeline = Mock(side_effect=ConnectionError("down"))
+
+        context = await manager.get_context("user1", "session1")
+        assert context.session_id == "session1"
+        assert manager.redis_client.pipeline.call_count == 1
+        assert "user1_session1" not in manager.local_cache
+
+    @staticmethod
+    async def _interact(manager, session_id, turn):
+        await manager.update_context_interaction(
+            "user1",
+            session_id,
+            f"email bob about item {turn}",
+            f"Drafting an email about item {turn}",
+            CommandCategory.EMAIL_MANAGEMENT,
+            {"recipient": "bob@example.com", "subject": f"item {turn}"},
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_contexts_many_pipelines_reads(self):
+        """Test stored, legacy and new contexts load in a fixed number of round trips"""
+        manager = self._manager()
+        redis_client = manager.redis_client
+        for session_id in ("session1", "session2"):
+            await self._interact(manager, session_id, 1)
+        legacy = TestContextCodec._context()
+        legacy.session_id = "session3"
+        redis_client.store["context:user1:session3"] = pickle.dumps(legacy)
+        expected = dict(manager.local_cache.items())
+        manager.local_cache.clear()
+
+        round_trips = redis_client.round_trips
+        sessions = [("user1", f"session{i}") for i in range(1, 6)]
+        contexts = await manager.get_contexts_many(sessions)
+        # States and histories, legacy values, one write for migrated and new
+        assert redis_client.round_trips == round_trips + 3
+        assert contexts[0] == expected["user1_session1"]
+        assert contexts[1] == expected["user1_session2"]
+        assert contexts[2] == legacy
+        assert [c.session_id for c in contexts[3:]] == ["session4", "session5"]
+        assert set(await manager.get_user_sessions("user1")) == {
+            f"session{i}" for i in range(1, 6)
+        }
+
+    @pytest.mark.asyncio
+    async def test_clear_user_contexts_in_one_pipeline(self):
+        """Test every session of a user is removed in one round trip after listing"""
+        manager = self._manager()
+        redis_client = manager.redis_client
+        for i in range(4):
+            await self._interact(manager, f"session{i}", i)
+
+        round_trips = redis_client.round_trips
+        await manager.clear_user_contexts("user1")
+        assert redis_client.round_trips == round_trips + 2
+        assert redis_client.store == {}
+        assert len(manager.local_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_coalesced_writes_share_one_round_trip(self):
+        """Test updates inside the window are written together and reload intact"""
+        manager = self._manager()
+        redis_client = manager.redis_client
+        await manager.get_contexts_many([("user1", "session1"), ("user1", "session2")])
+        manager.write_coalesce_window = 60
+
+        round_trips = redis_client.round_trips
+        for turn in range(25):
+            await self._interact(manager, "session1" if turn % 2 else "session2", turn)
+        assert redis_client.round_trips == round_trips
+        assert manager.get_performance_metrics()["pending_writes"] == 2
+
+        await manager.flush_pending_writes()
+        assert redis_client.round_trips == round_trips + 1
+        metrics = manager.get_performance_metrics()
+        assert metrics["coalesced_writes"] == 23 and metrics["write_flushes"] == 1
+        assert len(redis_client.store["context_history:user1:session2"]) == 13
+
+        expected = dict(manager.local_cache.items())
+        manager.local_cache.clear()
+        for session_id in ("session1", "session2"):
+            reloaded = await manager.get_context("user1", session_id)
+            assert reloaded == expected[f"user1_{session_id}"]
+        manager._flush_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_coalescing_window_flushes_itself(self):
+        """Test pending updates are written once the window elapses"""
+        manager = self._manager()
+        await manager.get_context("user1", "session1")
+        manager.write_coalesce_window = 0.01
+        await self._interact(manager, "session1", 1)
+        await self._interact(manager, "session1", 2)
+        assert "context_history:user1:session1" not in manager.redis_client.store
+
+        await asyncio.sleep(0.05)
+        assert manager.get_performance_metrics()["pending_writes"] == 0
+        assert len(manager.redis_client.store["context_history:user1:session1"]) == 2
+
+
+class TestContextWriteBehind:
+    """Test cases for ContextManager's dirty-context write-behind queue"""
+
+    @staticmethod
+    def _manager() -> ContextManager:
+        manager = ContextManager()
+        manager.redis_client = FakeRedis()
+        manager.write_behind_batch_size = 2
+        manager.write_behind_batch_interval = 0
+        return manager
+
+    @staticmethod
+    async def _save_while_unavailable(manager, contexts):
+        """Save contexts while Redis is down, leaving them dirty"""
+        redis_client = manager.redis_client
+        redis_client.pipeline = Mock(side_effect=ConnectionError("Redis unavailable"))
+        await manager.save_contexts(contexts)
+        del redis_client.pipeline
+
+    @pytest.mark.asyncio
+    async def test_only_dirty_contexts_are_flushed_in_batches(self):
+        """Test a flush rewrites dirty contexts only, a batch per round trip"""
+        manager = self._manager()
+        contexts = await manager.get_contexts_many(
+            [("user1", f"session{i}") for i in range(5)]
+        )
+        for context in contexts[:3]:
+            context.preferences["voice"] = "en-AU"
+        await self._save_while_unavailable(manager, contexts[:3])
+        await self._save_while_unavailable(manager, contexts[:1])
+        assert manager.get_performance_metrics()["write_behind"]["queue_depth"] == 3
+
+        round_trips = manager.redis_client.round_trips
+        assert await manager.flush_dirty_contexts() == 3
+        assert manager.redis_client.round_trips == round_trips + 2
+        assert await manager.flush_dirty_contexts() == 0
+
+        write_behind = manager.get_performance_metrics()["write_behind"]
+        assert write_behind["queue_depth"] == 0 and write_behind["batches"] == 2
+        assert write_behind["flush_latency"]["count"] == 2
+        manager.local_cache.clear()
+        reloaded = await manager.get_context("user1", "session2")
+        assert reloaded.preferences == {"voice": "en-AU"}
+
+    @pytest.mark.asyncio
+    async def test_failed_writes_are_retried_in_full(self):
+        """Test a context whose append failed is rewritten, not appended to"""
+        manager = self._manager()
+        redis_client = manager.redis_client
+        await TestContextPersistence._interact(manager, "session1", 1)
+
+        def unavailable(transaction=True):
+            raise ConnectionError("Redis unavailable")
+
+        redis_client.pipeline = unavailable
+        await TestContextPersistence._interact(manager, "session1", 2)
+        assert manager.get_performance_metrics()["write_behind"]["queue_depth"] == 1
+        assert await manager.flush_dirty_contexts() == 0
+        assert manager.get_performance_metrics()["write_behind"]["failures"] == 1
+
+        del redis_client.pipeline
+        await TestContextPersistence._interact(manager, "session1", 3)
+        assert manager.get_performance_metrics()["write_behind"]["queue_depth"] == 0
+        assert len(redis_client.store["context_history:user1:session1"]) == 3
+
+        context = manager.local_cache.pop("user1_session1")
+        assert await manager.get_context("user1", "session1") == context
+
+    @pytest.mark.asyncio
+    async def test_unencodable_contexts_do_not_block_the_queue(self):
+        """Test a context the codec rejects is dropped and the rest still flush"""
+        manager = self._manager()
+        redis_client = manager.redis_client
+        bad, good, other = await manager.get_contexts_many(
+            [("u", "bad"), ("u", "good"), ("u", "other")]
+        )
+        await manager.update_context_interaction(
+            "u", "bad", "count", "Counting", CommandCategory.WEB_SEARCH, {"n": 2**70}
+        )
+        good.preferences["voice"] = "en-AU"
+        other.add_interaction(42, "Not a string input", CommandCategory.WEB_SEARCH)
+        await self._save_while_unavailable(manager, [good, other])
+        assert list(manager._dirty_contexts) == ["u_bad", "u_good", "u_other"]
+
+        await manager.shutdown()
+
+        write_behind = manager.get_performance_metrics()["write_behind"]
+        assert write_behind["queue_depth"] == 0 and write_behind["dropped"] == 2
+        assert redis_client.store["context_state:u:good"][b"preferences"]
+        manager.local_cache.clear()
+        reloaded = await manager.get_context("u", "good")
+        assert reloaded.preferences == {"voice": "en-AU"}
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_do_not_block_later_ones(self):
+        """Test a batch Redis rejects is requeued while later batches flush"""
+        manager = self._manager()
+        contexts = await manager.get_contexts_many(
+            [("user1", f"session{i}") for i in range(4)]
+        )
+        await self._save_while_unavailable(manager, contexts)
+        write_contexts = manager._write_contexts
+        calls = []
+
+        async def first_batch_fails(writes):
+            calls.append(len(writes))
+            if len(calls) == 1:
+                raise ConnectionError("Redis unavailable")
+            await write_contexts(writes)
+
+        manager._write_contexts = first_batch_fails
+        assert await manager.flush_dirty_contexts() == 2
+        assert calls == [2, 2]
+        assert list(manager._dirty_contexts) == ["user1_session0", "user1_session1"]
+        assert manager.get_performance_metrics()["write_behind"]["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shutdown_flushes_queued_changes(self):
+        """Test idle syncs write nothing and shutdown drains both queues"""
+        manager = self._manager()
+        manager.cache_sync_interval = 0.01
+        manager.write_coalesce_window = 60
+        context = await manager.get_context("user1", "session1")
+        manager._sync_task = asyncio.create_task(manager._background_cache_sync())
+
+        round_trips = manager.redis_client.round_trips
+        await asyncio.sleep(0.05)
+        assert manager.redis_client.round_trips == round_trips
+
+        manager.cache_sync_interval = 60
+        await asyncio.sleep(0.02)  # Only shutdown can flush from here on
+        await TestContextPersistence._interact(manager, "session2", 1)
+        context.current_topic = "quarterly report"
+        await self._save_while_unavailable(manager, [context])
+        metrics = manager.get_performance_metrics()
+        assert metrics["pending_writes"] == 1
+        assert metrics["write_behind"]["queue_depth"] == 1
+        await manager.shutdown()
+
+        assert manager._sync_task is None and manager._flush_task is None
+        metrics = manager.get_performance_metrics()
+        assert metrics["pending_writes"] == 0
+        assert metrics["write_behind"]["queue_depth"] == 0
+        store = manager.redis_client.store
+        assert store["context_state:user1:session1"][b"topic"] == b"quarterly report"
+        assert len(store["context_history:user1:session2"]) == 1
+
+
+class TestContextLocalCache:
+    """Test cases for ContextManager's local LRU cache"""
+
+    @pytest.mark.asyncio
+    async def test_reads_refresh_recency(self):
+        """Test a context that keeps being read survives eviction"""
+        manager = ContextManager(max_local_cache_entries=3)
+        hot = await manager.get_context("user1", "hot")
+        for i in range(10):
+            await manager.get_context("user1", f"session{i}")
+            assert await manager.get_context("user1", "hot") is hot
+
+        metrics = manager.get_performance_metrics()
+        assert metrics["local_cache_size"] == 3
+        assert metrics["local_cache"]["evictions"] == 8
+        assert metrics["local_cache"]["hits"] == 10
+
+    @pytest.mark.asyncio
+    async def test_byte_budget(self):
+        """Test the estimated byte budget evicts the least recently used contexts"""
+        manager = ContextManager(max_local_cache_bytes=20000)
+        for i in range(10):
+            for turn in range(20):
+                await manager.update_context_interaction(
+                    "user1",
+                    f"session{i}",
+                    f"search for item {turn}",
+                    f"Results for item {turn}",
+                    CommandCategory.WEB_SEARCH,
+                    {"query": f"item {turn}"},
+                )
+
+        stats = manager.get_performance_metrics()["local_cache"]
+        assert 0 < stats["bytes"] <= 20000
+        assert stats["evictions"] > 0
+        assert "user1_session9" in manager.local_cache
+        assert "user1_session0" not in manager.local_cache
+
+    def test_configure_keeps_most_recent(self):
+        """Test shrinking the cache keeps the most recently used contexts"""
+        manager = ContextManager()
+        for i in range(5):
+            manager.local_cache.put(
+                f"user1_session{i}",
+                ConversationContext(user_id="user1", session_id=f"session{i}"),
+            )
+        manager.local_cache.get("user1_session0")
+
+        manager.configure_local_cache(max_entries=2, max_bytes=100000)
+        assert list(manager.local_cache) == ["user1_session4", "user1_session0"]
+        assert manager.local_cache.get_stats()["bytes"] > 0
+
+
 class TestClassificationResult:
     """Test cases for ClassificationResult class"""
 
@@ -358,6 +2216,25 @@ class TestClassificationResult:
         assert result.confidence_level == IntentConfidence.LOW
         assert result.requires_confirmation is True
 
+    def test_positional_field_order(self):
+        """Original positional fields keep their order; new fields come last"""
+        result = ClassificationResult(
+            CommandCategory.WEB_SEARCH,
+            "web_search_intent",
+            0.9,
+            {},
+            False,
+            0.001,
+            0.002,
+            [],
+            "Search for news",
+            "search for news",
+        )
+
+        assert result.raw_text == "Search for news"
+        assert result.normalized_text == "search for news"
+        assert result.categories_pruned == 0
+
     def test_confidence_levels(self):
         """Test confidence level mapping"""
         result = ClassificationResult(